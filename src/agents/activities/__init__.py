@@ -1,8 +1,14 @@
 """Shared helpers for activity agents."""
 
+import asyncio
+
+from ...services.image_cache import get_image_cache, make_image_cache_key
+from ...services.image_scheduler import ImagePriority
+from ...utils.config import get_settings
 from ...utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+settings = get_settings()
 
 
 # Per-metric pass thresholds. A metric is treated as "needs fixing" only when
@@ -23,6 +29,62 @@ _METRIC_THRESHOLDS: dict[str, float] = {
 }
 
 
+def _is_retry(state: dict, activity_type: str) -> bool:
+    """True when this activity has already been generated once in this run.
+
+    The generator node bumps retry_count after each attempt, so anything
+    above zero means we are regenerating — callers pass this as bypass_cache
+    so a rejected output is not served straight back from the LLM cache.
+    """
+    return (state.get("retry_count") or {}).get(activity_type, 0) > 0
+
+
+def _image_priority(state: dict, activity_type: str) -> ImagePriority:
+    """FLUX queue class for this activity's image: regenerated activities
+    yield to first-pass activity images (and both yield to story covers)."""
+    return ImagePriority.REGENERATION if _is_retry(state, activity_type) else ImagePriority.ACTIVITY
+
+
+async def _attach_image(ai_service, item: dict, state: dict, activity_type: str) -> None:
+    """Set item["image"] (WebP master filename, or None if FLUX returned
+    nothing) and item["image_variants"] (thumbnail filenames by size name).
+
+    Only GCS filenames enter LangGraph state, never image bytes. An identical
+    prompt drawn before — by this story or any other — is reused from the
+    image cache without touching the FLUX gate, unless the state asks for a
+    fresh draw via force_fresh_image.
+    """
+    cache = get_image_cache()
+    prompt = item.get("image_generation_prompt", "")
+    key = make_image_cache_key(prompt, settings.FLUX_IMAGE_MODEL)
+    force_fresh = bool(state.get("force_fresh_image"))
+    filename = None if force_fresh else await cache.lookup(key)
+    if not filename:
+        image_bytes = await ai_service.generate_image(prompt, priority=_image_priority(state, activity_type))
+        if image_bytes:
+            filename = await cache.store(key, image_bytes, forced=force_fresh)
+    item["image"] = filename
+    item["image_variants"] = cache.variant_names(filename) if filename else {}
+
+
+async def _attach_images(ai_service, items: list[dict], state: dict, activity_type: str) -> None:
+    """_attach_image for every item at once.
+
+    All items enter the image scheduler together (the FLUX gate still paces
+    them), and each item's WebP encode + upload runs while the next item is
+    generating, so the node takes roughly max-of rather than sum-of the
+    per-item times. Siblings are never cancelled mid-upload: the first
+    failure is re-raised only after every item has finished.
+    """
+    results = await asyncio.gather(
+        *(_attach_image(ai_service, item, state, activity_type) for item in items),
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+
 def _prepend_retry_feedback(prompt: str, state: dict, activity_type: str) -> str:
     """If the prior eval pass failed for this activity, prepend a corrective
     block listing ONLY the metrics that scored below their threshold — and
@@ -1,17 +1,14 @@
-import json
-import uuid
+from ...models.response_schemas import ART_SCHEMA
 from ...services.ai_service import AIService
-from ...services.database.storage_bucket import StorageBucketService
 from ...utils.logger import setup_logger
 from ...prompts import get_registry
-from . import _prepend_retry_feedback
+from . import _attach_image, _is_retry, _prepend_retry_feedback
 
 logger = setup_logger(__name__)
 
 class ArtAgent:
     def __init__(self, prompt_version: str = "latest"):
         self.ai_service = AIService()
-        self.storage = StorageBucketService()
         self.prompt_version = prompt_version
 
     async def generate(self, state: dict):
@@ -37,18 +34,12 @@ class ArtAgent:
         prompt = _prepend_retry_feedback(prompt, state, "art")
 
         try:
-            response = await self.ai_service.generate_content(prompt)
-            try:
-                activity_data = json.loads(response)
-            except json.JSONDecodeError:
-                # Robust JSON extraction
-                start_index = response.find('[')
-                end_index = response.rfind(']')
-                if start_index != -1 and end_index != -1:
-                    cleaned_text = response[start_index:end_index+1]
-                else:
-                    cleaned_text = response.replace("```json", "").replace("```", "").strip()
-                activity_data = json.loads(cleaned_text)
+            activity_data = await self.ai_service.generate_structured(
+                prompt,
+                ART_SCHEMA,
+                prompt_version=self.prompt_version,
+                bypass_cache=_is_retry(state, "art"),
+            )
             # Image generation is deferred to a post-evaluation node so we don't
             # burn FLUX credits on activities that fail eval and get regenerated.
             return {
@@ -60,20 +51,14 @@ class ArtAgent:
             return {"errors": {**state.get("errors", {}), "art": str(e)}}
 
     async def generate_image(self, state: dict):
-        """Generate + upload the art activity image. Runs only after the
+        """Generate (or reuse a cached) art activity image. Runs only after the
         evaluation pass succeeds, so credits aren't spent on retried items."""
         activities = state.get("activities", {})
         activity_data = activities.get("art")
         if not activity_data:
             return {}
         try:
-            image_bytes = await self.ai_service.generate_image(activity_data.get("image_generation_prompt", ""))
-            if image_bytes:
-                filename = f"images/{uuid.uuid4()}.png"
-                await self.storage.upload_file(filename, image_bytes, content_type="image/png")
-                activity_data["image"] = filename
-            else:
-                activity_data["image"] = None
+            await _attach_image(self.ai_service, activity_data, state, "art")
             return {"activities": {**activities, "art": activity_data}}
         except Exception as e:
             logger.error(f"Art image generation failed: {e}")
@@ -1,8 +1,8 @@
-import json
+from ...models.response_schemas import MCQ_SCHEMA
 from ...services.ai_service import AIService
 from ...utils.logger import setup_logger
 from ...prompts import get_registry
-from . import _prepend_retry_feedback
+from . import _is_retry, _prepend_retry_feedback
 
 logger = setup_logger(__name__)
 
@@ -41,9 +41,12 @@ class MCQAgent:
         prompt = _prepend_retry_feedback(prompt, state, "mcq")
 
         try:
-            response = await self.ai_service.generate_content(prompt)
-            cleaned_text = response.replace("```json", "").replace("```", "").strip()
-            mcq_data = json.loads(cleaned_text)
+            mcq_data = await self.ai_service.generate_structured(
+                prompt,
+                MCQ_SCHEMA,
+                prompt_version=self.prompt_version,
+                bypass_cache=_is_retry(state, "mcq"),
+            )
 
             return {
                 "activity_type": "mcq",
@@ -1,29 +1,16 @@
-import json
-import uuid
+from ...models.response_schemas import MORAL_SCHEMA
 from ...services.ai_service import AIService
-from ...services.database.storage_bucket import StorageBucketService
 from ...utils.logger import setup_logger
 from ...prompts import get_registry
-from . import _prepend_retry_feedback
+from . import _attach_images, _is_retry, _prepend_retry_feedback
 
 logger = setup_logger(__name__)
 
 class MoralAgent:
     def __init__(self, prompt_version: str = "latest"):
         self.ai_service = AIService()
-        self.storage = StorageBucketService()
         self.prompt_version = prompt_version
 
-    async def _gen_and_upload(self, prompt_text: str) -> str | None:
-        """Generate an image and upload it to GCS. Returns the GCS filename
-        (or None on failure) so raw PNG bytes never enter LangGraph state."""
-        image_bytes = await self.ai_service.generate_image(prompt_text)
-        if not image_bytes:
-            return None
-        filename = f"images/{uuid.uuid4()}.png"
-        await self.storage.upload_file(filename, image_bytes, content_type="image/png")
-        return filename
-
     async def generate(self, state: dict):
         logger.info("Starting Moral activity generation...")
         # Use moral (the story's moral lesson string) when available
@@ -47,18 +34,12 @@ class MoralAgent:
         prompt = _prepend_retry_feedback(prompt, state, "moral")
 
         try:
-            response = await self.ai_service.generate_content(prompt)
-            # Response is a dict: {"text": "...", "images": [...]}
-            
-            # Robust JSON extraction
-            start_index = response.find('[')
-            end_index = response.rfind(']')
-            if start_index != -1 and end_index != -1:
-                cleaned_text = response[start_index:end_index+1]
-            else:
-                cleaned_text = response.replace("```json", "").replace("```", "").strip()
-
-            activity_data = json.loads(cleaned_text)
+            activity_data = await self.ai_service.generate_structured(
+                prompt,
+                MORAL_SCHEMA,
+                prompt_version=self.prompt_version,
+                bypass_cache=_is_retry(state, "moral"),
+            )
             # Image generation is deferred to a post-evaluation node so we don't
             # burn FLUX credits on activities that fail eval and get regenerated.
             return {
@@ -70,18 +51,15 @@ class MoralAgent:
             return {"errors": {**state.get("errors", {}), "moral": str(e)}}
 
     async def generate_image(self, state: dict):
-        """Generate + upload moral activity images (one per item). Runs only
-        after the evaluation pass succeeds, so credits aren't spent on retried
-        items."""
+        """Generate + upload moral activity images (one per item, in
+        parallel). Runs only after the evaluation pass succeeds, so credits
+        aren't spent on retried items."""
         activities = state.get("activities", {})
         activity_data = activities.get("moral")
         if not activity_data:
             return {}
         try:
-            for item in activity_data:
-                item["image"] = await self._gen_and_upload(
-                    item.get("image_generation_prompt", "")
-                )
+            await _attach_images(self.ai_service, activity_data, state, "moral")
             return {"activities": {**activities, "moral": activity_data}}
         except Exception as e:
             logger.error(f"Moral image generation failed: {e}")
@@ -1,10 +1,8 @@
+from ...models.response_schemas import SCIENCE_SCHEMA
 from ...services.ai_service import AIService
-from ...services.database.storage_bucket import StorageBucketService
 from ...utils.logger import setup_logger
 from ...prompts import get_registry
-from . import _prepend_retry_feedback
-import json
-import uuid
+from . import _attach_images, _is_retry, _prepend_retry_feedback
 
 logger = setup_logger(__name__)
 
@@ -12,7 +10,6 @@ class ScienceAgent:
 
     def __init__(self, prompt_version: str = "latest"):
         self.ai_service = AIService()
-        self.storage = StorageBucketService()
         self.prompt_version = prompt_version
     
     async def generate(self, state: dict):
@@ -52,17 +49,12 @@ class ScienceAgent:
         prompt = _prepend_retry_feedback(prompt, state, "science")
 
         try:
-            response = await self.ai_service.generate_content(prompt)
-            
-            # Robust JSON extraction
-            start_index = response.find('[')
-            end_index = response.rfind(']')
-            if start_index != -1 and end_index != -1:
-                cleaned_text = response[start_index:end_index+1]
-            else:
-                cleaned_text = response.replace("```json", "").replace("```", "").strip()
-
-            science_data = json.loads(cleaned_text)
+            science_data = await self.ai_service.generate_structured(
+                prompt,
+                SCIENCE_SCHEMA,
+                prompt_version=self.prompt_version,
+                bypass_cache=_is_retry(state, "science"),
+            )
             # Image generation is deferred to a post-evaluation node so we don't
             # burn FLUX credits on activities that fail eval and get regenerated.
             return {
@@ -77,20 +69,15 @@ class ScienceAgent:
             }
 
     async def generate_image(self, state: dict):
-        """Generate + upload the science activity image. Runs only after the
-        evaluation pass succeeds, so credits aren't spent on retried items."""
+        """Generate (or reuse cached) science activity images, one per item in
+        parallel. Runs only after the evaluation pass succeeds, so credits
+        aren't spent on retried items."""
         activities = state.get("activities", {})
         science_data = activities.get("science")
         if not science_data:
             return {}
         try:
-            image_bytes = await self.ai_service.generate_image(science_data[0].get("image_generation_prompt", ""))
-            if image_bytes:
-                filename = f"images/{uuid.uuid4()}.png"
-                await self.storage.upload_file(filename, image_bytes, content_type="image/png")
-                science_data[0]["image"] = filename
-            else:
-                science_data[0]["image"] = None
+            await _attach_images(self.ai_service, science_data, state, "science")
             return {"activities": {**activities, "science": science_data}}
         except Exception as e:
             logger.error(f"Science image generation failed: {e}")
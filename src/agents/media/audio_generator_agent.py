@@ -2,12 +2,14 @@
 AudioGeneratorAgent — generates WAV narration for a children's story.
 
 Splits the story into paragraphs, synthesizes each separately via Google TTS,
-records per-paragraph timestamps, then combines into a single WAV file.
+records per-paragraph timestamps, then combines into a single WAV file and
+optionally encodes it to NARRATION_FORMAT (Opus/MP3) before it enters state.
 
 Voice and language are read from config (TTS_VOICE_NAME, TTS_LANGUAGE_CODE)
 but can be overridden via the workflow config.
 """
 
+from ...services.audio_encoding import encode_narration
 from ...services.audio_service import AudioService
 from ...utils.logger import setup_logger
 from ...utils.config import get_settings
@@ -50,7 +52,8 @@ class AudioGeneratorAgent:
             voice: str     — TTS voice name (optional, falls back to config)
 
         Returns partial state update with:
-            audio_bytes       — combined WAV bytes (or None on failure)
+            audio_bytes       — narration bytes in audio_format (or None on failure)
+            audio_format      — "wav", "opus" or "mp3"
             audio_timepoints  — list of per-paragraph timing dicts (or None on failure)
         """
         story_text = state.get("story_text", "")
@@ -82,9 +85,14 @@ class AudioGeneratorAgent:
                 "errors": {**state.get("errors", {}), "audio_generator": "TTS returned None"},
             }
 
-        logger.info(f"[AudioGenerator] Generated audio: {len(audio_bytes)} bytes, {len(audio_timepoints)} paragraphs")
+        # Timepoints were measured on the PCM; encoding only shrinks what is
+        # kept in state and uploaded.
+        audio_bytes, audio_format = await encode_narration(audio_bytes)
+
+        logger.info(f"[AudioGenerator] Generated audio: {len(audio_bytes)} bytes {audio_format}, {len(audio_timepoints)} paragraphs")
         return {
             "audio_bytes": audio_bytes,
+            "audio_format": audio_format,
             "audio_timepoints": audio_timepoints,
             "validated": False,
             "evaluation": None,
@@ -7,12 +7,22 @@ Model: FLUX.1-schnell via HuggingFace InferenceClient
 
 Uses the image_prompt from the story creator response directly, appending
 age-appropriate animated style suffixes before passing to FLUX.1-schnell.
+
+Renders are content-addressed (see services/image_cache): a first attempt
+whose prompt + model + style was drawn before reuses that render without
+touching FLUX. Retries and force_fresh_image always draw fresh.
 """
 
 from ...services.ai_service import AIService
+from ...services.image_cache import get_image_cache, make_image_cache_key
+from ...services.image_scheduler import ImagePriority
+from ...utils.config import get_settings
 from ...utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+settings = get_settings()
+
+_STYLE_SUFFIX = "3D animated movie style"
 
 
 class ImageGeneratorAgent:
@@ -28,7 +38,9 @@ class ImageGeneratorAgent:
             image_prompt (optional) — from story creator; used directly if present
 
         Returns partial state update with:
-            state["image_bytes"] — raw PNG bytes (or None on failure)
+            state["image_bytes"] — raw image bytes (or None on failure)
+            state["image_format"] — "png" for a fresh FLUX render, "webp" for
+                                    the cached master reused on a cache hit
             state["image_prompt"] — the prompt used for image generation (for evaluation)
         """
         story_text = state.get("story_text", "")
@@ -41,9 +53,33 @@ class ImageGeneratorAgent:
         # else fall back to LLM generation. Then append age/style suffixes.
         image_prompt = self._build_image_prompt(base_prompt, story_title, age)
 
-        # Step 2: Generate the image using FLUX.1-schnell
+        # Step 2: Reuse an identical earlier render unless this is a re-roll.
+        # A first cover is what the user is waiting on, so it jumps the FLUX
+        # queue; re-rolls after a failed evaluation queue behind activity images.
+        retrying = bool(state.get("retry_count", 0))
+        forced = retrying or bool(state.get("force_fresh_image"))
+        cache_key = make_image_cache_key(
+            self._base_prompt(base_prompt, story_title), settings.FLUX_IMAGE_MODEL, _STYLE_SUFFIX
+        )
+        image_cache = {"key": cache_key, "object": None, "forced": forced}
+        if not forced:
+            cached = await get_image_cache().load(cache_key)
+            if cached:
+                image_cache["object"], image_bytes = cached
+                logger.info(f"[ImageGenerator] Reusing cached render {image_cache['object']}")
+                return {
+                    "image_bytes": image_bytes,
+                    "image_format": "webp",
+                    "image_prompt": image_prompt,
+                    "image_cache": image_cache,
+                    "validated": False,
+                    "evaluation": None,
+                }
+
+        # Step 3: Generate the image using FLUX.1-schnell
+        priority = ImagePriority.REGENERATION if retrying else ImagePriority.COVER
         try:
-            image_bytes = await self.ai_service.generate_image(image_prompt)
+            image_bytes = await self.ai_service.generate_image(image_prompt, priority=priority)
             if image_bytes is None:
                 logger.warning("[ImageGenerator] generate_image returned None")
                 return {
@@ -54,7 +90,9 @@ class ImageGeneratorAgent:
             logger.info("[ImageGenerator] Image generated successfully")
             return {
                 "image_bytes": image_bytes,
+                "image_format": "png",
                 "image_prompt": image_prompt,
+                "image_cache": image_cache,
                 "validated": False,
                 "evaluation": None,
             }
@@ -66,15 +104,14 @@ class ImageGeneratorAgent:
                 "errors": {**state.get("errors", {}), "image_generator": str(e)},
             }
 
+    def _base_prompt(self, base_prompt: str, story_title: str) -> str:
+        return base_prompt.strip() if base_prompt else (
+            f"A children's book illustration for a story titled '{story_title}'"
+        )
+
     def _build_image_prompt(self, base_prompt: str, story_title: str, age: str) -> str:
         """
         Takes the story's image_prompt and appends age-appropriate animated style suffixes.
         Falls back to a minimal prompt if base_prompt is empty.
         """
-        base = base_prompt.strip() if base_prompt else (
-            f"A children's book illustration for a story titled '{story_title}'"
-        )
-        style = (
-            "3D animated movie style"
-        )
-        return f"{base}, {style}"
+        return f"{self._base_prompt(base_prompt, story_title)}, {_STYLE_SUFFIX}"
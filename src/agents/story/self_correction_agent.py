@@ -13,6 +13,7 @@ The calling workflow passes the appropriate model_override and prompt_key.
 """
 
 import json
+from ...models.response_schemas import STORY_SCHEMA
 from ...services.ai_service import AIService
 from ...utils.logger import setup_logger
 from ...utils.config import get_settings
@@ -72,11 +73,21 @@ class SelfCorrectionAgent:
         )
 
         try:
-            response = await self.ai_service.generate_content(
-                prompt,
-                model_override=self.model_override,
-                fallback_override=self.fallback_override,
-            )
+            if content_key == "story":
+                # Same schema as StoryCreatorAgent, so the corrected story
+                # cannot come back malformed and bounce off validation.
+                response = await self.ai_service.generate_structured(
+                    prompt,
+                    STORY_SCHEMA,
+                    model_override=self.model_override,
+                    fallback_override=self.fallback_override,
+                )
+            else:
+                response = await self.ai_service.generate_content(
+                    prompt,
+                    model_override=self.model_override,
+                    fallback_override=self.fallback_override,
+                )
             corrected = self._parse_response(response, original_content)
             logger.info(f"[SelfCorrection] Corrected '{content_key}' (attempt {attempts + 1})")
             return {
@@ -182,28 +193,34 @@ class SelfCorrectionAgent:
             f"Do not add any explanation or preamble."
         )
 
-    def _parse_response(self, response: str, original_content):
+    def _parse_response(self, response, original_content):
         """
         Parse the corrected response, falling back to original on parse error.
-        If the original was JSON (dict/list), try to parse the response as JSON.
+        If the original was JSON (dict/list), try to parse the response as JSON
+        (schema-constrained responses arrive already parsed).
         If the original was a string, return the response as-is.
         """
         if isinstance(original_content, (dict, list)):
-            try:
-                cleaned = response.replace("```json", "").replace("```", "").strip()
-                parsed = json.loads(cleaned)
-            except (json.JSONDecodeError, ValueError):
-                logger.warning("[SelfCorrection] Could not parse corrected response as JSON, using raw text.")
-                return response
+            if isinstance(response, (dict, list)):
+                parsed = response
+            else:
+                try:
+                    cleaned = response.replace("```json", "").replace("```", "").strip()
+                    parsed = json.loads(cleaned)
+                except (json.JSONDecodeError, ValueError):
+                    logger.warning("[SelfCorrection] Could not parse corrected response as JSON, using raw text.")
+                    return response
 
             # Story prompts return the body under "story"; downstream pipeline expects
             # "story_text". Mirror StoryCreatorAgent._parse_story so the corrected
             # output passes structural validation.
             if isinstance(parsed, dict) and "story" in parsed and "story_text" not in parsed:
                 parsed["story_text"] = parsed.pop("story")
+            # The schema only covers the generated keys; carry everything else
+            # (title, age_group, science_angle, ...) over from the original.
             if isinstance(original_content, dict) and isinstance(parsed, dict):
-                for k in ("age_group", "language", "title"):
-                    if not parsed.get(k) and original_content.get(k):
-                        parsed[k] = original_content[k]
+                for k, v in original_content.items():
+                    if parsed.get(k) in (None, "") and v not in (None, ""):
+                        parsed[k] = v
             return parsed
         return response
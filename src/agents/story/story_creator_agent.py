@@ -4,19 +4,20 @@ StoryCreatorAgent — generates a full children's story from a selected topic.
 Model: gemini-2.5-flash-preview-04-17 (higher quality; story generation benefits from
        a stronger model to produce coherent, engaging narratives)
 Prompt: src/prompts/story_creator/v1.txt (user-supplied)
-Output format expected from LLM:
+Output format: constrained by models.response_schemas.STORY_SCHEMA
     {
         "title": "...",
-        "story_text": "...",
-        "moral": "...",
-        "age_group": "...",
-        "language": "...",
-        "character_names": [...],
-        "setting": "..."
+        "story": "...",            # renamed to story_text
+        "image_prompt": "...",
+        "mcq_seeds": [...],
+        "art_seed": "...",
+        "science_concepts": [{"concept": "...", "explanation": "..."}],
+        "moral": "..."
     }
+age_group / language are filled in from the request.
 """
 
-import json
+from ...models.response_schemas import STORY_SCHEMA
 from ...services.ai_service import AIService
 from ...utils.logger import setup_logger
 from ...utils.config import get_settings
@@ -94,12 +95,17 @@ class StoryCreatorAgent:
         )
 
         try:
-            response = await self.ai_service.generate_content(
+            response = await self.ai_service.generate_structured(
                 prompt,
+                STORY_SCHEMA,
                 model_override=settings.STORY_CREATOR_MODEL,
                 fallback_override=settings.STORY_CREATOR_FALLBACK_MODEL,
+                prompt_version=self.prompt_version,
+                # Regeneration after a failed validation must not get the
+                # rejected story back from the LLM cache.
+                bypass_cache=state.get("correction_attempts", 0) > 0,
             )
-            story = self._parse_story(response)
+            story = self._normalise_story(response)
             # Fall back to the topic title if the LLM didn't include one
             if not story.get("title") and topic_title:
                 story["title"] = topic_title
@@ -126,85 +132,13 @@ class StoryCreatorAgent:
             logger.error(f"[StoryCreator] Failed: {e}")
             return {"errors": {"story_creator": str(e)}}
 
-    def _parse_story(self, response: str) -> dict:
-        """Parse JSON dict from LLM response."""
-        try:
-            cleaned = response.replace("```json", "").replace("```", "").strip()
-            data = json.loads(cleaned)
-        except json.JSONDecodeError:
-            # LLM sometimes embeds raw newlines/control chars inside JSON string values.
-            # Escape them so the parser can proceed.
-            sanitized = self._escape_control_chars(cleaned)
-            try:
-                data = json.loads(sanitized)
-            except json.JSONDecodeError:
-                # Model sometimes returns two JSON objects back-to-back ("Extra
-                # data" error). Extract only the FIRST complete top-level object
-                # by walking forward from the first `{` and tracking brace depth
-                # while respecting string boundaries.
-                first_obj = self._extract_first_json_object(sanitized)
-                if first_obj is None:
-                    raise ValueError(f"Could not parse story from response: {response[:200]}")
-                data = json.loads(first_obj)
-
-        # Prompts use "story" key; normalise to "story_text" expected by the rest of the pipeline
+    @staticmethod
+    def _normalise_story(data: dict) -> dict:
+        """Rename the prompts' "story" key to the "story_text" the pipeline expects.
+
+        No JSON repair needed: the response is schema-constrained (STORY_SCHEMA)
+        and already parsed by AIService.generate_structured.
+        """
         if "story" in data and "story_text" not in data:
             data["story_text"] = data.pop("story")
-
         return data
-
-    @staticmethod
-    def _extract_first_json_object(s: str) -> str | None:
-        """Return the substring covering the first complete top-level JSON
-        object in `s`, or None if no balanced object is found. Tracks string
-        boundaries so braces inside strings don't throw off the depth count."""
-        start = s.find("{")
-        if start == -1:
-            return None
-        depth = 0
-        in_string = False
-        i = start
-        while i < len(s):
-            c = s[i]
-            if c == "\\" and in_string:
-                # skip the escaped char so an escaped quote does not flip in_string
-                i += 2
-                continue
-            if c == '"':
-                in_string = not in_string
-            elif not in_string:
-                if c == "{":
-                    depth += 1
-                elif c == "}":
-                    depth -= 1
-                    if depth == 0:
-                        return s[start : i + 1]
-            i += 1
-        return None
-
-    @staticmethod
-    def _escape_control_chars(s: str) -> str:
-        """Escape raw control characters that appear inside JSON string values."""
-        _escapes = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
-        result = []
-        in_string = False
-        i = 0
-        while i < len(s):
-            c = s[i]
-            if c == '\\' and in_string:
-                # Already-escaped sequence — pass both chars through unchanged
-                result.append(c)
-                i += 1
-                if i < len(s):
-                    result.append(s[i])
-                i += 1
-                continue
-            if c == '"':
-                in_string = not in_string
-                result.append(c)
-            elif in_string and ord(c) < 0x20:
-                result.append(_escapes.get(c, f'\\u{ord(c):04x}'))
-            else:
-                result.append(c)
-            i += 1
-        return ''.join(result)
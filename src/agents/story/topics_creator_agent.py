@@ -15,11 +15,10 @@ Output state["topics"] — flat list of dicts:
 """
 
 import asyncio
-import json
 import random
-import re
 import uuid
 
+from ...models.response_schemas import TOPICS_SCHEMA
 from ...services.ai_service import AIService
 from ...services.database.firestore_service import FirestoreService
 from ...utils.logger import setup_logger
@@ -139,74 +138,38 @@ def _chill_prompt_text(lifestyle_area: str, age: str, n: int) -> str:
 # Response parser
 # ---------------------------------------------------------------------------
 
-def _parse_pipe_response(
-    response: str, theme: str, filter_type: str, filter_value: str
-) -> list:
-    """
-    Parses LLM response into topic dicts.
-    Handles two formats the model may return:
-
-    1. JSON array (actual):
-       [{"title": "...", "description": "..."}, ...]
-       Also handles ```json ... ``` code fences.
-
-    2. Pipe-separated lines (prompt asks for):
-       Title text|Description text
-    """
-    def _make_topic(
-        title: str,
-        description: str,
-        science_angle: str = "",
-        daily_life_application: str = "",
-    ) -> dict:
-        return {
-            "topic_id":               str(uuid.uuid4()),
-            "title":                  title.strip(),
-            "description":            description.strip(),
-            "science_angle":          science_angle.strip(),
-            "daily_life_application": daily_life_application.strip(),
-            "theme":                  theme,
-            "moral":                  "",
-            "filter_type":            filter_type,
-            "filter_value":           filter_value,
-        }
-
-    text = response.strip()
-
-    # --- Try JSON first (strip optional ```json ... ``` fences) ---
-    json_text = re.sub(r"^```(?:json)?\s*", "", text, flags=re.IGNORECASE)
-    json_text = re.sub(r"\s*```$", "", json_text).strip()
-
-    if json_text.startswith("["):
-        try:
-            items = json.loads(json_text)
-            topics = []
-            for item in items:
-                title = item.get("title", "").strip()
-                desc  = item.get("description", "").strip()
-                sci   = item.get("science_angle", "").strip()
-                app   = item.get("daily_life_application", "").strip()
-                if title and desc:
-                    topics.append(_make_topic(title, desc, sci, app))
-            if topics:
-                return topics
-        except (json.JSONDecodeError, AttributeError):
-            pass  # fall through to pipe parser
-
-    # --- Fallback: pipe-separated lines (legacy 2-field; new 4-field also supported) ---
+def _make_topic(
+    theme: str,
+    filter_type: str,
+    filter_value: str,
+    title: str,
+    description: str,
+    science_angle: str = "",
+    daily_life_application: str = "",
+) -> dict:
+    return {
+        "topic_id":               str(uuid.uuid4()),
+        "title":                  title.strip(),
+        "description":            description.strip(),
+        "science_angle":          science_angle.strip(),
+        "daily_life_application": daily_life_application.strip(),
+        "theme":                  theme,
+        "moral":                  "",
+        "filter_type":            filter_type,
+        "filter_value":           filter_value,
+    }
+
+
+def _topics_from_items(items: list, theme: str, filter_type: str, filter_value: str) -> list:
+    """Build topic dicts from TOPICS_SCHEMA items, dropping any without a title/description."""
     topics = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "|" in line:
-            parts = [p.strip() for p in line.split("|")]
-            if len(parts) >= 2 and parts[0] and parts[1]:
-                title = parts[0]
-                desc  = parts[1]
-                sci   = parts[2] if len(parts) >= 3 else ""
-                app   = parts[3] if len(parts) >= 4 else ""
-                topics.append(_make_topic(title, desc, sci, app))
+    for item in items:
+        title = (item.get("title") or "").strip()
+        desc  = (item.get("description") or "").strip()
+        sci   = (item.get("science_angle") or "").strip()
+        app   = (item.get("daily_life_application") or "").strip()
+        if title and desc:
+            topics.append(_make_topic(theme, filter_type, filter_value, title, desc, sci, app))
     return topics
 
 
@@ -501,8 +464,10 @@ class TopicsCreatorAgent:
 
         # 4. LLM call
         try:
-            response = await self.ai_service.generate_content(
+            # Schema-constrained: comes back as a parsed list of topic items.
+            items = await self.ai_service.generate_structured(
                 prompt,
+                TOPICS_SCHEMA,
                 model_override=settings.STORY_TOPICS_MODEL,
                 fallback_override=settings.STORY_TOPICS_FALLBACK_MODEL,
                 use_cache=False,
@@ -511,8 +476,8 @@ class TopicsCreatorAgent:
             logger.error(f"[TopicsCreator] LLM failed for {theme_name}/{filter_value}: {e}")
             return []
 
-        # 5. Parse
-        gen_title = _parse_pipe_response(response, theme_name, filter_type, filter_value)
+        # 5. Build topic dicts
+        gen_title = _topics_from_items(items, theme_name, filter_type, filter_value)
         new_titles = gen_title[:prompt_kwargs['length']]
         logger.info(f"[TopicsCreator] {theme_name}/{filter_value}: {len(new_titles)} new titles")
         
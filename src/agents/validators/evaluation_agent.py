@@ -25,11 +25,11 @@ import asyncio
 import hashlib
 import json
 import re
+from collections import OrderedDict
 from deepeval.metrics import GEval
 from deepeval.models.base_model import DeepEvalBaseLLM
 from deepeval.test_case import LLMTestCase, LLMTestCaseParams
-from google import genai
-
+from ...services.ai_providers import get_provider_registry
 from ...utils.logger import setup_logger
 from ...utils.config import get_settings
 
@@ -52,9 +52,13 @@ class _GeminiEvalModel(DeepEvalBaseLLM):
     """Routes DeepEval GEval LLM calls to Google Gemini via google.genai."""
 
     def __init__(self, model_name: str | None = None) -> None:
-        self._client = genai.Client(api_key=settings.GOOGLE_API_KEY)
         self._model_name = model_name or settings.EVALUATION_MODEL
 
+    @property
+    def _client(self):
+        # Pooled process-wide client — shares connections with AIService.
+        return get_provider_registry().genai_client
+
     def load_model(self):
         return self._client
 
@@ -78,7 +82,7 @@ class _GeminiEvalModel(DeepEvalBaseLLM):
         return self._model_name
 
 
-# One shared instance per process — avoids re-creating the client on every metric.
+# One shared instance per process — avoids re-building the adapter on every metric.
 # Both topic and activity evaluations primary on gemini-2.5-flash-lite (cheapest).
 # The retry ladder falls back to gemini-2.5-flash (3-6× pricier but with higher
 # capacity / different load characteristics) ONLY on transient errors. In steady
@@ -739,6 +743,28 @@ def _shared_eval_cache_set(key: str, value: dict) -> None:
         _SHARED_EVAL_CACHE.pop(evict, None)
 
 
+# ---------------------------------------------------------------------------
+# Process-level cache of passing WF4 text verdicts. The TTS-suitability
+# metrics only read story_text, so a WF4 retry or a /generate-audio re-trigger
+# on an unchanged story reuses the verdict instead of re-running GEval.
+# ---------------------------------------------------------------------------
+
+_AUDIO_TEXT_EVAL_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+_AUDIO_TEXT_EVAL_CACHE_MAX = 256
+
+
+def _audio_text_eval_cache_key(story_text: str, language: str, age: str) -> str:
+    payload = json.dumps([story_text, language, age, _EVAL_RUBRIC_VERSION], sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _audio_text_eval_cache_set(key: str, value: dict) -> None:
+    _AUDIO_TEXT_EVAL_CACHE[key] = value
+    _AUDIO_TEXT_EVAL_CACHE.move_to_end(key)
+    while len(_AUDIO_TEXT_EVAL_CACHE) > _AUDIO_TEXT_EVAL_CACHE_MAX:
+        _AUDIO_TEXT_EVAL_CACHE.popitem(last=False)
+
+
 async def _run_geval_with_retry(
     name: str,
     criteria: str,
@@ -818,7 +844,8 @@ class EvaluationAgent:
     Evaluates generated content quality using DeepEval's GEval metric.
 
     Args:
-        workflow_type: One of "story_topics", "story", "image", "audio", "activities".
+        workflow_type: One of "story_topics", "story", "image", "audio_text", "audio",
+                       "activities".
                        Determines which evaluation criteria to use.
         pass_threshold: Score >= this value is considered passing. Default 0.6.
     """
@@ -844,6 +871,8 @@ class EvaluationAgent:
             return await self._evaluate_story(state)
         if self.workflow_type == "image":
             return await self._evaluate_image_prompt(state)
+        if self.workflow_type == "audio_text":
+            return await self._evaluate_audio_text(state)
         if self.workflow_type == "audio":
             return await self._evaluate_audio(state)
         if self.workflow_type == "activities":
@@ -1175,56 +1204,51 @@ class EvaluationAgent:
         }
 
     # ------------------------------------------------------------------
-    # audio — Python coverage/duration checks + GEval TTS-suitability checks
+    # audio_text — TTS-suitability of the story text (runs BEFORE synthesis)
     # ------------------------------------------------------------------
 
-    async def _evaluate_audio(self, state: dict) -> dict:
+    async def _evaluate_audio_text(self, state: dict) -> dict:
+        """
+        Python + GEval checks that only read story_text. WF4 runs these before
+        paying for TTS; passing verdicts are cached per (text, language, age)
+        so a retry or re-trigger on the same story never re-judges it.
+        """
         story_text = state.get("story_text") or ""
-        audio_bytes = state.get("audio_bytes")
-        audio_timepoints = state.get("audio_timepoints")
         language = state.get("language", "English")
         age = state.get("age", "3-4")
 
-        # --- Hard metrics: deterministic Python checks ---
-        cov_score, cov_reason = _python_paragraph_coverage(story_text, audio_timepoints)
-        bytes_score, bytes_reason = _python_audio_bytes_present(audio_bytes)
-        dur_score, dur_reason = _python_duration_plausibility(story_text, audio_timepoints)
-        intg_score, intg_reason = _python_paragraph_integrity(audio_timepoints)
+        # If we have no story text at all, skip GEval — nothing meaningful to judge.
+        if not story_text.strip():
+            logger.warning("[audio] No story_text to evaluate TTS suitability.")
+            return {
+                "evaluation": {
+                    "passed": False,
+                    "score": 0.0,
+                    "reason": "No story_text available; cannot evaluate audio.",
+                    "metrics": {},
+                    "metric_reasons": {},
+                }
+            }
+
+        cache_key = _audio_text_eval_cache_key(story_text, language, age)
+        cached = _AUDIO_TEXT_EVAL_CACHE.get(cache_key)
+        if cached is not None:
+            _AUDIO_TEXT_EVAL_CACHE.move_to_end(cache_key)
+            logger.info(f"[audio] Text eval cache HIT — skipping GEval. score={cached['score']}")
+            return {"evaluation": cached}
 
         # Python-computed soft metrics (TTS-text quality)
         tts_score, tts_reason = _python_tts_friendliness(story_text)
         pacing_score, pacing_reason = _python_narration_pacing(story_text)
-
         metric_scores: dict[str, float] = {
-            "paragraph_coverage":    cov_score,
-            "audio_bytes_present":   bytes_score,
-            "duration_plausibility": dur_score,
-            "paragraph_integrity":   intg_score,
             "tts_friendliness":      tts_score,
             "narration_pacing":      pacing_score,
         }
         metric_reasons: dict[str, str] = {
-            "paragraph_coverage":    cov_reason,
-            "audio_bytes_present":   bytes_reason,
-            "duration_plausibility": dur_reason,
-            "paragraph_integrity":   intg_reason,
             "tts_friendliness":      tts_reason,
             "narration_pacing":      pacing_reason,
         }
 
-        # If we have no story text at all, skip GEval — nothing meaningful to judge.
-        if not story_text.strip():
-            logger.warning("[audio] No story_text to evaluate TTS suitability.")
-            return {
-                "evaluation": {
-                    "passed": False,
-                    "score": 0.0,
-                    "reason": "No story_text available; cannot evaluate audio.",
-                    "metrics": metric_scores,
-                    "metric_reasons": metric_reasons,
-                }
-            }
-
         # --- Soft metrics: GEval text-suitability checks ---
         reference_input = (
             f"Story text intended for TTS narration. Language: {language}. Age: {age}."
@@ -1232,9 +1256,9 @@ class EvaluationAgent:
         test_case = LLMTestCase(input=reference_input, actual_output=story_text)
         sem = _get_eval_semaphore()
 
-        # Audio LLM metrics are all soft (the hard tier is Python-computed
-        # coverage/duration/integrity above), so skip-as-pass on transient eval
-        # errors is safe — the safety gate doesn't depend on Gemini.
+        # Audio LLM metrics are all soft (the hard tier is the Python-computed
+        # coverage/duration/integrity after synthesis), so skip-as-pass on
+        # transient eval errors is safe — the safety gate doesn't depend on Gemini.
         soft_results = await asyncio.gather(
             *[
                 _run_geval_with_retry(
@@ -1253,35 +1277,96 @@ class EvaluationAgent:
             metric_scores[name] = score
             metric_reasons[name] = reason
 
+        soft_scores = [metric_scores[n] for n in _AUDIO_SOFT_METRICS if n in metric_scores]
+        soft_avg = sum(soft_scores) / len(soft_scores) if soft_scores else 0.0
+        passed = soft_avg >= self.pass_threshold
+        if passed:
+            reason = f"Story text suitable for TTS; soft-avg={soft_avg:.3f}"
+        else:
+            reason = f"Soft-average {soft_avg:.3f} below threshold {self.pass_threshold}"
+
+        logger.info(
+            f"[audio] Text evaluation {'PASSED' if passed else 'FAILED'} "
+            f"soft_avg={soft_avg:.3f} metrics={metric_scores}"
+        )
+        evaluation = {
+            "passed": passed,
+            "score": round(soft_avg, 3),
+            "reason": reason,
+            "metrics": metric_scores,
+            "metric_reasons": metric_reasons,
+        }
+        # A failed verdict is NOT cached — re-eval gives the LLM judge another chance.
+        # Neither is a pass that rests on metrics skipped after GEval errors.
+        judged = not any(r.startswith("skipped-after-retries") for r in metric_reasons.values())
+        if passed and judged:
+            _audio_text_eval_cache_set(cache_key, evaluation)
+        return {"evaluation": evaluation}
+
+    # ------------------------------------------------------------------
+    # audio — Python coverage/duration checks on the synthesized narration
+    # ------------------------------------------------------------------
+
+    async def _evaluate_audio(self, state: dict) -> dict:
+        """
+        Audio-dependent hard checks only. The text verdict comes from
+        state["text_evaluation"] (WF4's evaluate_text node); if it is missing
+        the (cached) text evaluation runs here so the rubric stays complete.
+        """
+        story_text = state.get("story_text") or ""
+        audio_bytes = state.get("audio_bytes")
+        audio_timepoints = state.get("audio_timepoints")
+
+        text_evaluation = state.get("text_evaluation")
+        if text_evaluation is None:
+            text_evaluation = (await self._evaluate_audio_text(state))["evaluation"]
+
+        # --- Hard metrics: deterministic Python checks ---
+        cov_score, cov_reason = _python_paragraph_coverage(story_text, audio_timepoints)
+        bytes_score, bytes_reason = _python_audio_bytes_present(audio_bytes)
+        dur_score, dur_reason = _python_duration_plausibility(story_text, audio_timepoints)
+        intg_score, intg_reason = _python_paragraph_integrity(audio_timepoints)
+
+        metric_scores: dict[str, float] = {
+            "paragraph_coverage":    cov_score,
+            "audio_bytes_present":   bytes_score,
+            "duration_plausibility": dur_score,
+            "paragraph_integrity":   intg_score,
+            **(text_evaluation.get("metrics") or {}),
+        }
+        metric_reasons: dict[str, str] = {
+            "paragraph_coverage":    cov_reason,
+            "audio_bytes_present":   bytes_reason,
+            "duration_plausibility": dur_reason,
+            "paragraph_integrity":   intg_reason,
+            **(text_evaluation.get("metric_reasons") or {}),
+        }
+
         # --- Gating ---
         hard_failures = [
             (n, metric_scores[n], floor)
             for n, floor in _AUDIO_HARD_FLOORS.items()
             if metric_scores.get(n, 0.0) < floor
         ]
-        soft_scores = [metric_scores[n] for n in _AUDIO_SOFT_METRICS if n in metric_scores]
-        soft_avg = sum(soft_scores) / len(soft_scores) if soft_scores else 0.0
-        soft_pass = soft_avg >= self.pass_threshold
-        passed = (not hard_failures) and soft_pass
+        passed = not hard_failures and bool(text_evaluation.get("passed"))
 
         if hard_failures:
             reason = "Hard-metric failures: " + ", ".join(
                 f"{n}={s:.2f}<{floor}" for n, s, floor in hard_failures
             )
-        elif not soft_pass:
-            reason = f"Soft-average {soft_avg:.3f} below threshold {self.pass_threshold}"
+        elif not text_evaluation.get("passed"):
+            reason = text_evaluation.get("reason", "Story text failed evaluation")
         else:
-            reason = f"All hard metrics cleared; soft-avg={soft_avg:.3f}"
+            reason = f"All hard metrics cleared; soft-avg={text_evaluation.get('score', 0.0):.3f}"
 
         logger.info(
-            f"[audio] Evaluation {'PASSED' if passed else 'FAILED'} "
-            f"soft_avg={soft_avg:.3f} metrics={metric_scores}"
+            f"[audio] Evaluation {'PASSED' if passed else 'FAILED'} metrics={metric_scores}"
         )
 
         return {
             "evaluation": {
                 "passed": passed,
-                "score": round(soft_avg, 3),
+                "score": text_evaluation.get("score", 0.0),
                 "reason": reason,
                 "metrics": metric_scores,
                 "metric_reasons": metric_reasons,
@@ -1588,6 +1673,6 @@ class EvaluationAgent:
         """Extract the relevant content field from state depending on workflow type."""
         if self.workflow_type == "image":
             return state.get("image_prompt")
-        if self.workflow_type == "audio":
+        if self.workflow_type in ("audio", "audio_text"):
             return state.get("story_text")
         return state.get("topics") or state.get("story")
@@ -2,8 +2,37 @@ from ...utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Structural validation outcomes per content kind (mcq/art/moral/science/
+# story/topics) since process start. Every failure sends the workflow back
+# for a full regeneration, so failed/checked is the regeneration rate that
+# schema-constrained output (models/response_schemas.py) is meant to drive
+# to zero; exposed on /metrics as regenerations per 100 generations.
+_validation_stats: dict[str, dict[str, int]] = {}
+
+
+def record_validation(kind: str, passed: bool) -> None:
+    stats = _validation_stats.setdefault(kind, {"checked": 0, "failed": 0})
+    stats["checked"] += 1
+    stats["failed"] += int(not passed)
+
+
+def validation_metrics() -> dict:
+    return {
+        kind: {
+            **stats,
+            "regenerations_per_100": round(100 * stats["failed"] / stats["checked"], 1),
+        }
+        for kind, stats in _validation_stats.items()
+    }
+
+
+def reset_validation_metrics() -> None:
+    _validation_stats.clear()
+
+
 class ValidatorAgent:
     def _increment_retry(self, state: dict, activity_type: str):
+        record_validation(activity_type, passed=False)
         current_retries = state.get("retry_count", {}).get(activity_type, 0)
         new_retry_count = {**state.get("retry_count", {}), activity_type: current_retries + 1}
         return {"retry_count": new_retry_count}
@@ -17,6 +46,7 @@ class ValidatorAgent:
             return self._increment_retry(state, "mcq")
             
         logger.info("MCQ validation passed.")
+        record_validation("mcq", passed=True)
         return {
                 "activities": {**state.get("activities", {}), "mcq": data},
                 # "images": {**state.get("images", {}), "art": response["images"]},
@@ -35,6 +65,7 @@ class ValidatorAgent:
             return self._increment_retry(state, "art")
 
         logger.info("Art validation passed.")
+        record_validation("art", passed=True)
         return {
                 "activities": {**state.get("activities", {}), "art": data},
                "completed": ["art"]
@@ -58,6 +89,7 @@ class ValidatorAgent:
             return self._increment_retry(state, "moral")
 
         logger.info("Moral validation passed.")
+        record_validation("moral", passed=True)
         return {
                 "activities": {**state.get("activities", {}), "moral": data},
                 "completed": ["moral"]
@@ -81,6 +113,7 @@ class ValidatorAgent:
             return self._increment_retry(state, "science")
             
         logger.info("Science validation passed.")
+        record_validation("science", passed=True)
         return {
                 "activities": {**state.get("activities", {}), "science": data},
                 "completed": ["science"]
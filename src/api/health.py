@@ -1,8 +1,34 @@
 from fastapi import APIRouter
 
+from ..agents.validators.validator_agent import validation_metrics
+from ..services.ai_providers import get_provider_registry
+from ..services.database.checkpoint_service import checkpoint_write_stats, sweep_checkpoints
+from ..services.database.storage_bucket import upload_stats
+from ..services.image_cache import get_image_cache
+from ..services.tts_cache import get_tts_cache
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/metrics")
+async def metrics():
+    """Process-local AI/TTS cache, request-coalescing, storage dedupe, checkpoint write and validation counters."""
+    return {
+        **get_provider_registry().metrics(),
+        "checkpoints": dict(checkpoint_write_stats),
+        "image_cache": dict(get_image_cache().stats),
+        "storage": dict(upload_stats),
+        "tts_cache": dict(get_tts_cache().stats),
+        "validation": validation_metrics(),
+    }
+
+
+@router.post("/checkpoints/sweep")
+async def checkpoints_sweep():
+    """Retention sweep for workflow checkpoints; point a scheduler (e.g. daily) at it."""
+    return {"deleted": await sweep_checkpoints()}
@@ -31,6 +31,7 @@ class ResumeWorkflowRequest(BaseModel):
 class RegenerateImageRequest(BaseModel):
     age: Optional[str] = "3-4"
     language: Optional[str] = "en"
+    force_fresh: bool = False   # draw a new image even if this prompt was rendered before
 
 
 class RegenerateAudioRequest(BaseModel):
@@ -96,7 +97,7 @@ async def generate_media(story_id: str, request: GenerateMediaRequest, backgroun
 # Individual image retrigger (human-in-loop bypass for WF3)
 # ---------------------------------------------------------------------------
 
-async def _run_image_workflow(story_id: str, age: str, language: str):
+async def _run_image_workflow(story_id: str, age: str, language: str, force_fresh: bool = False):
     try:
         db = FirestoreService()
         story = await db.get_story(story_id)
@@ -124,6 +125,7 @@ async def _run_image_workflow(story_id: str, age: str, language: str):
         initial_state = {
             "story_text":  story.get("story_text", ""),
             "story_title": story.get("title", ""),
+            "force_fresh_image": force_fresh,
             "retry_count": 0,
             "status":      "pending",
             "completed":   [],
@@ -149,7 +151,7 @@ async def generate_image(
     """
     logger.info(f"Image retrigger for story_id={story_id}")
     background_tasks.add_task(
-        _run_image_workflow, story_id, request.age, request.language
+        _run_image_workflow, story_id, request.age, request.language, request.force_fresh
     )
     return {"status": "accepted", "message": "Image generation started", "story_id": story_id}
 
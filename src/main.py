@@ -3,6 +3,9 @@ import uvicorn
 from fastapi import FastAPI
 
 from src.api import stories, media, activities, health
+from src.services.ai_providers import get_provider_registry
+from src.services.database.checkpoint_service import flush_write_behind
+from src.services.image_variants import shutdown_image_pool
 from src.utils.logger import setup_logger
 from src.utils.tracing import flush as flush_traces
 
@@ -19,6 +22,9 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     flush_traces()   # ensure last Langfuse events reach the server before shutdown
+    await flush_write_behind()               # persist buffered workflow checkpoints
+    await get_provider_registry().aclose()   # close pooled image-provider connections
+    shutdown_image_pool()                    # stop WebP encoding worker processes
     logger.info("Application shutdown complete.")
 
 
@@ -0,0 +1,87 @@
+"""
+Gemini response schemas for every JSON-producing agent.
+
+Passed as GenerateContentConfig.response_schema (OpenAPI-subset dicts, see
+AIService.generate_structured) so the model is constrained to emit exactly the
+shape the validators check for. This replaces the hand repair the agents used
+to do — slicing between `[` and `]`, escaping control characters, brace-walking
+for the first object — and removes the "missing key" class of validation
+failures that used to trigger a full regeneration.
+
+Field names and required keys mirror the prompt OUTPUT blocks in src/prompts
+and the structural checks in ValidatorAgent / validate_story_node /
+validate_topics_node; keep the three in step when a prompt changes.
+property_ordering keeps the model's output order identical to the prompt.
+"""
+
+_STRING = {"type": "STRING"}
+_STRING_LIST = {"type": "ARRAY", "items": _STRING}
+
+
+def _object(properties: dict, required: list[str] | None = None) -> dict:
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": required if required is not None else list(properties),
+        "property_ordering": list(properties),
+    }
+
+
+def _array_of(item: dict, min_items: int = 1) -> dict:
+    return {"type": "ARRAY", "items": item, "min_items": min_items}
+
+
+# WF5 — MCQ: list of {question, options, correct, fun_fact}
+MCQ_SCHEMA = _array_of(_object({
+    "question": _STRING,
+    "options": _STRING_LIST,
+    "correct": _STRING,
+    "fun_fact": _STRING,
+}))
+
+# WF5 — Art: a single craft dict
+ART_SCHEMA = _object({
+    "title": _STRING,
+    "age_appropriateness": _STRING,
+    "materials": _STRING_LIST,
+    "steps": _STRING_LIST,
+    "image_generation_prompt": _STRING,
+})
+
+_HANDS_ON_ACTIVITY = _object({
+    "title": _STRING,
+    "age_appropriateness": _STRING,
+    "What it Teaches": _STRING,
+    "materials": _STRING_LIST,
+    "Instructions": _STRING_LIST,
+    "image_generation_prompt": _STRING,
+})
+
+# WF5 — Moral (2 items) and Science (1 item) share the item shape.
+MORAL_SCHEMA = _array_of(_HANDS_ON_ACTIVITY)
+SCIENCE_SCHEMA = _array_of(_HANDS_ON_ACTIVITY)
+
+# WF2 — Story. "story" is renamed to "story_text" by the agent. No title: the
+# prompts don't ask for one, the agent uses the selected topic's title.
+STORY_SCHEMA = _object({
+    "story": _STRING,
+    "image_prompt": _STRING,
+    "mcq_seeds": _STRING_LIST,
+    "art_seed": _STRING,
+    "science_concepts": _array_of(_object({
+        "concept": _STRING,
+        "explanation": _STRING,
+    })),
+    "moral": _STRING,
+})
+
+# WF1 — Topics: list of {title, description, science_angle, daily_life_application}
+TOPICS_SCHEMA = _array_of(_object(
+    {
+        "title": _STRING,
+        "description": _STRING,
+        "science_angle": _STRING,
+        "daily_life_application": _STRING,
+    },
+    required=["title", "description"],
+))
@@ -81,13 +81,25 @@ class ImageWorkflowState(TypedDict):
     story_text: str
     story_title: str
 
-    # Raw PNG bytes from FLUX.1-schnell, or None if generation failed / not yet run.
+    # Raw image bytes, or None if generation failed / not yet run: PNG from
+    # FLUX.1-schnell, or the WebP master when the render came from the image
+    # cache. image_format says which ("png" / "webp").
     image_bytes: Optional[bytes]
+    image_format: Optional[str]
 
-    # GCS path after upload (e.g. "story-images/{uuid}.png").
+    # GCS URL of the WebP master (e.g. ".../image-cache/{sha256}.webp");
+    # thumbnails sit next to it as "{sha256}_{size}.webp".
     # This is what gets stored in Firestore — not the raw bytes.
     image_url: Optional[str]
 
+    # Image cache bookkeeping from the generator: {"key", "object", "forced"}.
+    # "object" is set on a cache hit so save_image reuses it instead of
+    # uploading; "forced" marks a fresh draw that must not reuse the cache.
+    image_cache: Optional[dict]
+
+    # Caller-requested re-roll (e.g. POST /generate-image with force_fresh).
+    force_fresh_image: bool
+
     validated: bool
     evaluation: Optional[dict]
 
@@ -114,16 +126,21 @@ class AudioWorkflowState(TypedDict):
     # TTS voice name from config (e.g. "en-US-Standard-A").
     voice: str
 
-    # Raw audio bytes (MP3) from TTS API.
+    # Narration from TTS: assembled WAV, or Opus/MP3 per NARRATION_FORMAT.
     audio_bytes: Optional[bytes]
 
-    # GCS path after upload (e.g. "story-audio/{uuid}.wav").
+    # "wav" | "opus" | "mp3" — format of audio_bytes.
+    audio_format: Optional[str]
+
+    # GCS path after upload (e.g. "story-audio/{sha256}.wav").
     audio_url: Optional[str]
 
     # Per-paragraph timing: [{ParagraphNumber, StartTimestamp, EndTimestamp, Duration}]
     audio_timepoints: Optional[List[dict]]
 
     validated: bool
+    # TTS-suitability verdict on story_text, decided before synthesis.
+    text_evaluation: Optional[dict]
     evaluation: Optional[dict]
 
     retry_count: int
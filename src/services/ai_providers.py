@@ -0,0 +1,220 @@
+"""
+Process-wide AI provider registry.
+
+Every agent builds its own AIService, but upstream quotas (Gemini per-model
+RPM, Together AI's FLUX cap) are enforced per API key, not per agent. When
+each AIService owned a private genai.Client, RateLimiter and response cache,
+the configured rate limit was silently multiplied by the number of agents and
+an identical prompt from two agents was paid for twice.
+
+The registry is the single owner of those resources:
+    - one pooled genai.Client for the process (HTTP connections are reused)
+    - one keep-alive AsyncInferenceClient per image provider (FLUX)
+    - one RateLimiter per upstream model, sized from Settings
+    - one AIMD token-per-minute budget per Gemini model
+    - one layered text response cache shared by every AIService
+      (memory → SQLite → optional Firestore, see llm_cache)
+    - single-flight groups that coalesce identical in-flight text/image calls
+    - per-model latency windows and the hedge budget (see hedging)
+    - the FLUX request gate, local or fleet-wide (see flux_gate), and the
+      priority scheduler that decides who passes it next (see image_scheduler)
+
+Usage:
+    from src.services.ai_providers import get_provider_registry
+
+    providers = get_provider_registry()
+    await providers.rate_limiter("gemini-2.5-flash-lite").acquire()
+    response = await providers.genai_client.aio.models.generate_content(...)
+"""
+
+from typing import Optional
+
+from google import genai
+from huggingface_hub import AsyncInferenceClient
+
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+from ..utils.resilience import AdaptiveRateLimiter, RateLimiter, SingleFlight
+from .flux_gate import build_flux_gate
+from .hedging import HedgeBudget, LatencyTracker
+from .image_scheduler import ImageScheduler
+from .llm_cache import LLMResponseCache, build_llm_response_cache
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Output-token estimate for a model before any call has been observed, and the
+# weight given to each new observation in the running average.
+_INITIAL_OUTPUT_TOKEN_ESTIMATE = 1000
+_OUTPUT_TOKEN_EWMA_ALPHA = 0.2
+
+
+class AIProviderRegistry:
+    """
+    Hands out pooled AI clients and per-model rate-limit budgets.
+
+    Quotas come from Settings.MODEL_RATE_LIMITS / MODEL_BURST_CAPACITY; models
+    that are not listed fall back to RATE_LIMIT_TOKENS_PER_SECOND /
+    RATE_LIMIT_BURST_CAPACITY.
+    """
+
+    def __init__(self):
+        self._genai_client: Optional[genai.Client] = None
+        self._image_clients: dict[str, AsyncInferenceClient] = {}
+        self._rate_limiters: dict[str, RateLimiter] = {}
+        self._token_limiters: dict[str, AdaptiveRateLimiter] = {}
+        self._avg_output_tokens: dict[str, float] = {}
+        self._response_cache: Optional[LLMResponseCache] = None
+        self._flux_gate = None
+        self.image_scheduler = ImageScheduler("flux_image")
+        # Concurrent identical requests (batch fan-out, Pub/Sub redelivery)
+        # share one upstream call instead of each being billed.
+        self.text_flight = SingleFlight("gemini_text")
+        self.image_flight = SingleFlight("flux_image")
+        self._latency: dict[str, LatencyTracker] = {}
+        # generate_structured outcomes: parsed OK vs. unparseable (truncated).
+        self.structured_output_stats: dict[str, int] = {"parsed": 0, "parse_failures": 0}
+        self.hedge_budget = HedgeBudget(settings.LLM_HEDGE_MAX_PER_WORKFLOW)
+
+    @property
+    def genai_client(self) -> genai.Client:
+        """Lazily build the one genai.Client shared by every agent."""
+        if self._genai_client is None:
+            self._genai_client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+        return self._genai_client
+
+    def image_client(self, provider: str = "together") -> AsyncInferenceClient:
+        """
+        Get the long-lived async image client for an inference provider.
+
+        Each AsyncInferenceClient keeps one httpx connection pool, so reusing
+        it skips the TCP/TLS handshake that a fresh InferenceClient paid on
+        every image.
+        """
+        client = self._image_clients.get(provider)
+        if client is None:
+            client = AsyncInferenceClient(provider=provider, api_key=settings.HF_TOKEN)
+            self._image_clients[provider] = client
+            logger.info(f"Created pooled image client for provider '{provider}'")
+        return client
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections (app shutdown)."""
+        for client in self._image_clients.values():
+            await client.close()
+        self._image_clients.clear()
+
+    def quota_for(self, model_name: str) -> tuple[float, float]:
+        """Return (requests per second, burst capacity) for an upstream model."""
+        rate = settings.MODEL_RATE_LIMITS.get(model_name, settings.RATE_LIMIT_TOKENS_PER_SECOND)
+        capacity = settings.MODEL_BURST_CAPACITY.get(model_name, settings.RATE_LIMIT_BURST_CAPACITY)
+        return rate, capacity
+
+    def rate_limiter(self, model_name: str) -> RateLimiter:
+        """Get the process-wide RateLimiter for a model, creating it on first use."""
+        limiter = self._rate_limiters.get(model_name)
+        if limiter is None:
+            rate, capacity = self.quota_for(model_name)
+            limiter = RateLimiter(rate=rate, capacity=capacity)
+            self._rate_limiters[model_name] = limiter
+            logger.info(f"Rate limiter for {model_name}: {rate}/s, burst {capacity}")
+        return limiter
+
+    def token_limiter(self, model_name: str) -> AdaptiveRateLimiter:
+        """Get the process-wide tokens-per-minute budget for a model."""
+        limiter = self._token_limiters.get(model_name)
+        if limiter is None:
+            tpm = settings.MODEL_TOKENS_PER_MINUTE.get(model_name, settings.DEFAULT_TOKENS_PER_MINUTE)
+            limiter = AdaptiveRateLimiter(
+                max_rate=tpm / 60,
+                min_rate=tpm * settings.TPM_MIN_FRACTION / 60,
+                decrease_factor=settings.TPM_DECREASE_FACTOR,
+            )
+            self._token_limiters[model_name] = limiter
+            logger.info(f"Token budget for {model_name}: {tpm} tokens/min (AIMD)")
+        return limiter
+
+    def estimate_tokens(self, model_name: str, prompt: str) -> int:
+        """
+        Input tokens (~4 chars each) plus the model's running-average output
+        size. Only an estimate — callers settle against usage_metadata.
+        """
+        output = self._avg_output_tokens.get(model_name, _INITIAL_OUTPUT_TOKEN_ESTIMATE)
+        return len(prompt) // 4 + int(output)
+
+    def record_output_tokens(self, model_name: str, output_tokens: int) -> None:
+        previous = self._avg_output_tokens.get(model_name)
+        if previous is None:
+            self._avg_output_tokens[model_name] = float(output_tokens)
+        else:
+            self._avg_output_tokens[model_name] = (
+                (1 - _OUTPUT_TOKEN_EWMA_ALPHA) * previous + _OUTPUT_TOKEN_EWMA_ALPHA * output_tokens
+            )
+
+    def latency(self, model_name: str) -> LatencyTracker:
+        """Rolling latency window for a model, created on first use."""
+        tracker = self._latency.get(model_name)
+        if tracker is None:
+            tracker = LatencyTracker(settings.LLM_HEDGE_LATENCY_WINDOW, settings.LLM_HEDGE_MIN_SAMPLES)
+            self._latency[model_name] = tracker
+        return tracker
+
+    @property
+    def response_cache(self) -> LLMResponseCache:
+        """Lazily build the layered text response cache from Settings."""
+        if self._response_cache is None:
+            self._response_cache = build_llm_response_cache()
+        return self._response_cache
+
+    @property
+    def flux_gate(self):
+        """Lazily build the FLUX request gate selected by FLUX_GATE_BACKEND."""
+        if self._flux_gate is None:
+            self._flux_gate = build_flux_gate()
+        return self._flux_gate
+
+    def metrics(self) -> dict:
+        """Snapshot of cache and coalescing counters, for /metrics and logs."""
+        metrics = {
+            "text_single_flight": dict(self.text_flight.stats),
+            "image_single_flight": dict(self.image_flight.stats),
+            "image_queue": self.image_scheduler.stats(),
+            "hedging": dict(self.hedge_budget.stats),
+            "structured_output": dict(self.structured_output_stats),
+            "token_budgets": {
+                model: {
+                    "tokens_per_minute": round(limiter.rate * 60),
+                    "max_tokens_per_minute": round(limiter.max_rate * 60),
+                    "queue_depth": limiter.queue_depth,
+                    **limiter.stats,
+                }
+                for model, limiter in self._token_limiters.items()
+            },
+            "latency_p95_seconds": {
+                model: tracker.percentile(0.95) for model, tracker in self._latency.items()
+            },
+        }
+        if self._response_cache is not None:
+            metrics["llm_cache"] = {
+                **self._response_cache.stats,
+                "hit_rate": round(self._response_cache.hit_rate(), 3),
+            }
+        return metrics
+
+
+# Singleton instance for the process
+_provider_registry: Optional[AIProviderRegistry] = None
+
+
+def get_provider_registry() -> AIProviderRegistry:
+    """Get the singleton AIProviderRegistry instance."""
+    global _provider_registry
+    if _provider_registry is None:
+        _provider_registry = AIProviderRegistry()
+    return _provider_registry
+
+
+def reset_provider_registry() -> None:
+    """Drop the shared registry (clients, limiters, cache). Used by tests."""
+    global _provider_registry
+    _provider_registry = None
@@ -4,16 +4,17 @@ from ..utils.resilience import (
     circuit_breaker,
     retry_with_backoff,
     CircuitBreakerError,
-    RateLimiter,
 )
-from google import genai
+from .ai_providers import AIProviderRegistry, get_provider_registry
+from .hedging import HedgeFailed, current_workflow_id, hedged_call
+from .image_scheduler import ImagePriority, current_story_key
+from .llm_cache import make_cache_key
 from google.genai import types
 import asyncio
-import hashlib
+import json
+from typing import AsyncIterator, Optional
 import time
-from functools import lru_cache
 import io
-from huggingface_hub import InferenceClient
 
 
 # settings = get_settings()
@@ -23,39 +24,17 @@ settings = get_settings()
 logger = setup_logger(__name__)
 
 
-# ---------------------------------------------------------------------------
-# Module-level FLUX request gate.
-#
-# Together AI's free-tier route (used via HuggingFace InferenceClient with
-# provider="together") limits FLUX image generation to 50 RPM = 0.83 QPS.
-# A single story pipeline fans out 5–6 image requests in parallel (WF3 cover
-# + WF5 art/moral×2/science), which trivially overshoots the per-minute window
-# and trips 429s. The per-instance RateLimiter on AIService can't help because
-# each agent instantiates its own AIService.
-#
-# This gate is process-wide: every generate_image() call across every agent
-# serialises through it with a ~1.5s minimum interval (~40 RPM with headroom).
-# ---------------------------------------------------------------------------
-# 5s = 12 RPM, well under whatever cap Together AI is actually enforcing on
-# this plan (the published 50 RPM appears to be enforced tighter — error
-# responses show "0 TPM", suggesting a restricted tier). Widen if 429s
-# disappear; tighten only if image throughput becomes the bottleneck.
-_FLUX_MIN_INTERVAL_SECONDS = 5.0
-_flux_gate_lock = asyncio.Lock()
-_flux_last_request_at: float = 0.0
-
-
-async def _flux_gate() -> None:
-    """Block until at least _FLUX_MIN_INTERVAL_SECONDS have passed since the
-    last FLUX request from any agent in this process."""
-    global _flux_last_request_at
-    async with _flux_gate_lock:
-        now = time.monotonic()
-        wait = _flux_last_request_at + _FLUX_MIN_INTERVAL_SECONDS - now
-        if wait > 0:
-            logger.debug(f"FLUX gate: waiting {wait:.2f}s to stay under rate cap")
-            await asyncio.sleep(wait)
-        _flux_last_request_at = time.monotonic()
+# FLUX pacing lives in services/flux_gate.py: a token bucket shared by every
+# agent in the process (default) or, with FLUX_GATE_BACKEND=firestore, by
+# every instance in the fleet. See AIProviderRegistry.flux_gate.
+
+
+def _encode_png(image) -> bytes:
+    # Lossless hand-off format only: what gets stored and served is the WebP
+    # produced by image_variants, so favour encode speed over PNG size.
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format='PNG', compress_level=1)
+    return img_byte_arr.getvalue()
 
 
 def _is_rate_limit_error(exc: Exception) -> bool:
@@ -66,21 +45,47 @@ def _is_rate_limit_error(exc: Exception) -> bool:
     return "429" in msg or "rate_limit" in msg.lower() or "too many requests" in msg.lower()
 
 
+def _is_quota_error(exc: Exception) -> bool:
+    """Gemini 429 (RESOURCE_EXHAUSTED) / 503 (UNAVAILABLE, overloaded). The
+    genai SDK raises errors.APIError with an integer .code; fall back to the
+    message for anything wrapped on the way up."""
+    if getattr(exc, "code", None) in (429, 503):
+        return True
+    msg = str(exc)
+    return _is_rate_limit_error(exc) or "503" in msg or "RESOURCE_EXHAUSTED" in msg or "UNAVAILABLE" in msg
+
+
+def _usage_tokens(response) -> tuple[int | None, int | None]:
+    """(total, output) token counts from response.usage_metadata, if reported."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    output = getattr(usage, "candidates_token_count", None)
+    return (
+        total if isinstance(total, int) else None,
+        output if isinstance(output, int) else None,
+    )
+
+
 class AIService:
     def __init__(self):
-        # Initialize the new Client from google-genai
+        # Clients, rate limiters and the response cache are process-wide (see
+        # ai_providers); _client is only set directly by tests.
         self._client = None
         # Ensure we use a model that supports image generation if requested
         # e.g., "gemini-2.0-flash-exp" or "gemini-2.5-flash-image"
         self.model_name = settings.GEMINI_MODEL 
         self.fallback_model_name = settings.GEMINI_FALLBACK_MODEL
         self.multimodal_model_name = settings.MULTIMODAL_MODEL
-        self.rate_limiter = RateLimiter(
-            rate=settings.RATE_LIMIT_TOKENS_PER_SECOND,
-            capacity=settings.RATE_LIMIT_BURST_CAPACITY,
-        )
 
-    def _build_generate_content_config(self) -> types.GenerateContentConfig:
+    @property
+    def providers(self) -> AIProviderRegistry:
+        return get_provider_registry()
+
+    def _rate_limiter(self, model_name: str):
+        """Shared per-model budget — every agent draws from the same bucket."""
+        return self.providers.rate_limiter(model_name)
+
+    def _build_generate_content_config(self, response_schema: dict = None) -> types.GenerateContentConfig:
         return types.GenerateContentConfig(
             temperature=0.7,
             max_output_tokens=4000,
@@ -103,28 +108,93 @@ class AIService:
                 ),
             ],
             response_mime_type="application/json",
+            # Constrained decoding: the model can only emit JSON of this shape
+            # (see models/response_schemas.py). None = free-form JSON.
+            response_schema=response_schema,
         )
 
     @property
     def client(self):
-        if self._client is None:
-            self._client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-        return self._client
+        if self._client is not None:
+            return self._client
+        return self.providers.genai_client
 
-    @lru_cache(maxsize=100)
-    def _generate_cached(self, prompt_hash: str, prompt: str, model_name: str):
+    async def _generate_uncached(self, prompt: str, model_name: str, response_schema: dict = None) -> str:
         """
-        Internal method to cache AI text responses.
+        Single Gemini text round-trip on the async (client.aio) API so the
+        event loop keeps serving other pipelines while the model responds.
         """
-        logger.info(f"Generating new content for hash: {prompt_hash[:8]} using {model_name}...")
-        
-        response = self.client.models.generate_content(
-            model=model_name,
-            contents=prompt,
-            config=self._build_generate_content_config(),
-        )
+        # Charge the model's tokens-per-minute budget up front with an
+        # estimate, then settle against the real usage once it is known.
+        token_limiter = self.providers.token_limiter(model_name)
+        estimated_tokens = self.providers.estimate_tokens(model_name, prompt)
+        await token_limiter.acquire(estimated_tokens)
+
+        started = time.monotonic()
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=model_name,
+                contents=prompt,
+                config=self._build_generate_content_config(response_schema),
+            )
+        except Exception as e:
+            if _is_quota_error(e):
+                token_limiter.on_rate_limited()
+            raise
+        # Feeds the p95 used to decide when to hedge (see _call_primary).
+        self.providers.latency(model_name).record(time.monotonic() - started)
+
+        token_limiter.on_success()
+        total_tokens, output_tokens = _usage_tokens(response)
+        if total_tokens is not None:
+            token_limiter.adjust(total_tokens - estimated_tokens)
+        if output_tokens is not None:
+            self.providers.record_output_tokens(model_name, output_tokens)
         return response.text
 
+    async def _call_primary(self, primary_model: str, fallback_model: str, primary_call, fallback_call) -> str:
+        """
+        Run the primary-model call, hedging to the fallback model when hedging
+        is enabled and the primary outlives its observed p95 latency (see
+        services/hedging.py). Without hedging this is just `await primary_call()`.
+        """
+        if not settings.LLM_HEDGING_ENABLED or fallback_model == primary_model:
+            return await primary_call()
+        workflow_id = current_workflow_id()
+        hedge_after = self.providers.latency(primary_model).percentile(settings.LLM_HEDGE_PERCENTILE)
+        if workflow_id is None or hedge_after is None:
+            return await primary_call()
+        return await hedged_call(primary_call, fallback_call, hedge_after, self.providers.hedge_budget, workflow_id)
+
+    async def _generate_cached(
+        self,
+        prompt: str,
+        model_name: str,
+        prompt_version: str = None,
+        bypass_cache: bool = False,
+        response_schema: dict = None,
+    ) -> str:
+        """
+        Serve from the shared LLM response cache, or generate and write through.
+
+        bypass_cache skips the lookup but still stores the fresh result — retry
+        paths use it so a regeneration is a new sample rather than the cached
+        output that just failed validation/evaluation.
+        """
+        cache = self.providers.response_cache
+        config_fingerprint = self._build_generate_content_config(response_schema).model_dump_json(exclude_none=True)
+        key = make_cache_key(model_name, prompt, config_fingerprint, prompt_version)
+
+        cached = await cache.get(key, bypass=bypass_cache)
+        if cached is not None:
+            return cached
+
+        logger.info(f"Generating new content for key: {key[:8]} using {model_name}...")
+        text = await self._generate_uncached(prompt, model_name, response_schema)
+
+        await cache.set(key, text, model_name)
+        return text
+
     @circuit_breaker(
         name="gemini_primary",
         failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
@@ -134,10 +204,11 @@ class AIService:
         max_retries=settings.MAX_RETRIES,
         base_delay=settings.RETRY_DELAY_SECONDS,
     )
-    async def _generate_with_primary(self, prompt: str) -> str:
-        await self.rate_limiter.acquire()
-        prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-        return self._generate_cached(prompt_hash, prompt, self.model_name)
+    async def _generate_with_primary(
+        self, prompt: str, prompt_version: str = None, bypass_cache: bool = False, response_schema: dict = None
+    ) -> str:
+        await self._rate_limiter(self.model_name).acquire()
+        return await self._generate_cached(prompt, self.model_name, prompt_version, bypass_cache, response_schema)
 
     @circuit_breaker(
         name="gemini_fallback",
@@ -148,15 +219,29 @@ class AIService:
         max_retries=settings.MAX_RETRIES,
         base_delay=settings.RETRY_DELAY_SECONDS,
     )
-    async def _generate_with_fallback(self, prompt: str) -> str:
-        await self.rate_limiter.acquire()
-        prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-        return self._generate_cached(prompt_hash, prompt, self.fallback_model_name)
-
-    async def generate_content(self, prompt: str, model_override: str = None, fallback_override: str = None, use_cache: bool = True) -> str:
+    async def _generate_with_fallback(
+        self, prompt: str, prompt_version: str = None, bypass_cache: bool = False, response_schema: dict = None
+    ) -> str:
+        await self._rate_limiter(self.fallback_model_name).acquire()
+        return await self._generate_cached(prompt, self.fallback_model_name, prompt_version, bypass_cache, response_schema)
+
+    async def generate_content(
+        self,
+        prompt: str,
+        model_override: str = None,
+        fallback_override: str = None,
+        use_cache: bool = True,
+        prompt_version: str = None,
+        bypass_cache: bool = False,
+        response_schema: dict = None,
+    ) -> str:
         """
         Public method to generate text content with primary model and fallback model.
 
+        Concurrent calls with the same prompt, models, config and cache flags
+        are coalesced: one upstream call runs and every caller gets its result
+        (see AIProviderRegistry.text_flight).
+
         Args:
             prompt: The prompt to send to the model.
             model_override: If provided, use this model instead of self.model_name.
@@ -165,12 +250,54 @@ class AIService:
                             the default gemini-2.0-flash-lite.
             fallback_override: If provided, use this as the fallback model.
                                Defaults to self.fallback_model_name if not set.
+            use_cache: False skips the response cache entirely (no read, no write).
+            prompt_version: Part of the cache key, so a prompt bump never serves
+                            answers generated from the old template.
+            bypass_cache: Skip the cache read but write the fresh result through.
+                          Set by retry paths (regeneration after a failed check).
+            response_schema: Constrain the JSON output to this schema; prefer
+                             generate_structured, which also parses it.
         """
+        primary = model_override or self.model_name
+        fallback = fallback_override or self.fallback_model_name
+        config_fingerprint = self._build_generate_content_config(response_schema).model_dump_json(exclude_none=True)
+        flight_key = ":".join([
+            make_cache_key(f"{primary}|{fallback}", prompt, config_fingerprint, prompt_version),
+            str(model_override is None and fallback_override is None),
+            str(use_cache),
+            str(bypass_cache),
+        ])
+        return await self.providers.text_flight.do(
+            flight_key,
+            lambda: self._generate_content(
+                prompt, model_override, fallback_override, use_cache, prompt_version, bypass_cache,
+                response_schema,
+            ),
+        )
+
+    async def _generate_content(
+        self,
+        prompt: str,
+        model_override: str,
+        fallback_override: str,
+        use_cache: bool,
+        prompt_version: str,
+        bypass_cache: bool,
+        response_schema: dict = None,
+    ) -> str:
         # Default path: use decorated _generate_with_primary/_generate_with_fallback
         # which have @circuit_breaker + @retry_with_backoff protection.
         if model_override is None and fallback_override is None:
             try:
-                return await self._generate_with_primary(prompt)
+                return await self._call_primary(
+                    self.model_name,
+                    self.fallback_model_name,
+                    lambda: self._generate_with_primary(prompt, prompt_version, bypass_cache, response_schema),
+                    lambda: self._generate_with_fallback(prompt, prompt_version, bypass_cache, response_schema),
+                )
+            except HedgeFailed as hedge_error:
+                logger.error(f"Primary and hedged fallback model both failed: {hedge_error}")
+                raise
             except CircuitBreakerError as primary_cb_error:
                 logger.warning(f"Primary model circuit breaker open: {primary_cb_error}")
             except Exception as primary_error:
@@ -180,27 +307,29 @@ class AIService:
                 logger.error("Fallback model is same as primary model and primary failed")
                 raise RuntimeError("No distinct fallback model available")
 
-            return await self._generate_with_fallback(prompt)
+            return await self._generate_with_fallback(prompt, prompt_version, bypass_cache, response_schema)
 
         # Override path: per-workflow agents explicitly select a model.
         primary = model_override or self.model_name
         fallback = fallback_override or self.fallback_model_name
 
-        def _call(model: str) -> str:
+        async def _call(model: str) -> str:
             if use_cache:
-                prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-                return self._generate_cached(prompt_hash, prompt, model)
-            # Bypass lru_cache — call the underlying API directly
-            response = self.client.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=self._build_generate_content_config(),
-            )
-            return response.text
+                return await self._generate_cached(prompt, model, prompt_version, bypass_cache, response_schema)
+            # Bypass the response cache — call the underlying API directly
+            return await self._generate_uncached(prompt, model, response_schema)
+
+        async def _limited_call(model: str) -> str:
+            await self._rate_limiter(model).acquire()
+            return await _call(model)
 
         try:
-            await self.rate_limiter.acquire()
-            return _call(primary)
+            return await self._call_primary(
+                primary, fallback, lambda: _limited_call(primary), lambda: _limited_call(fallback)
+            )
+        except HedgeFailed as hedge_error:
+            logger.error(f"Primary ({primary}) and hedged fallback ({fallback}) both failed: {hedge_error}")
+            raise
         except CircuitBreakerError as primary_cb_error:
             logger.warning(f"Primary model ({primary}) unavailable due to circuit breaker: {primary_cb_error}")
         except Exception as primary_error:
@@ -211,8 +340,7 @@ class AIService:
             raise RuntimeError("No distinct fallback model available")
 
         try:
-            await self.rate_limiter.acquire()
-            return _call(fallback)
+            return await _limited_call(fallback)
         except CircuitBreakerError as fallback_cb_error:
             logger.error(f"Fallback model ({fallback}) unavailable due to circuit breaker: {fallback_cb_error}")
             raise
@@ -220,74 +348,110 @@ class AIService:
             logger.error(f"Fallback model ({fallback}) failed: {fallback_error}")
             raise
 
-    async def generate_multimodal_content(self, prompt: str) -> dict:
+    async def generate_structured(self, prompt: str, response_schema: dict, **kwargs):
         """
-        Generates both TEXT and IMAGES from a single prompt using the new SDK.
-        Returns a dict with 'text' and 'images' (list of dictionaries with 'mime_type' and 'data').
+        Schema-constrained generation that returns the parsed JSON object
+        (list/dict) rather than text. kwargs are passed to generate_content.
+
+        Constrained decoding means the only way this fails to parse is a
+        truncated response (max_output_tokens hit), raised as ValueError.
         """
-        logger.info(f"Generating multimodal content for: {prompt[:30]}...")
-        
+        text = await self.generate_content(prompt, response_schema=response_schema, **kwargs)
         try:
-            await self.rate_limiter.acquire()
-            contents = [
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part.from_text(text=prompt),
-                    ],
+            parsed = json.loads(text)
+        except (json.JSONDecodeError, TypeError) as e:
+            self.providers.structured_output_stats["parse_failures"] += 1
+            raise ValueError(f"Structured response was not valid JSON: {str(text)[:200]}") from e
+        self.providers.structured_output_stats["parsed"] += 1
+        return parsed
+
+    def _build_multimodal_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            temperature=0.7,
+            max_output_tokens=1000, 
+            safety_settings=[
+                types.SafetySetting(
+                    category="HARM_CATEGORY_HARASSMENT",
+                    threshold="BLOCK_LOW_AND_ABOVE",  # Block few
                 ),
-            ]
-            generate_content_config = types.GenerateContentConfig(
-                temperature=0.7,
-                max_output_tokens=1000, 
-                safety_settings=[
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HARASSMENT",
-                        threshold="BLOCK_LOW_AND_ABOVE",  # Block few
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HATE_SPEECH",
-                        threshold="BLOCK_LOW_AND_ABOVE",  # Block few
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        threshold="BLOCK_LOW_AND_ABOVE",  # Block few
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_DANGEROUS_CONTENT",
-                        threshold="BLOCK_LOW_AND_ABOVE",  # Block few
-                    ),
-                ],
-                response_mime_type="application/json",
-                response_modalities=["IMAGE", "TEXT"],
-            )
+                types.SafetySetting(
+                    category="HARM_CATEGORY_HATE_SPEECH",
+                    threshold="BLOCK_LOW_AND_ABOVE",  # Block few
+                ),
+                types.SafetySetting(
+                    category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                    threshold="BLOCK_LOW_AND_ABOVE",  # Block few
+                ),
+                types.SafetySetting(
+                    category="HARM_CATEGORY_DANGEROUS_CONTENT",
+                    threshold="BLOCK_LOW_AND_ABOVE",  # Block few
+                ),
+            ],
+            response_mime_type="application/json",
+            response_modalities=["IMAGE", "TEXT"],
+        )
+
+    async def stream_multimodal_content(self, prompt: str) -> AsyncIterator[dict]:
+        """
+        Streams TEXT and IMAGE parts of a multimodal response as they arrive,
+        on the async (client.aio) streaming API so the event loop is never held.
 
-            text_parts = []
-            images = []
-            
-            # Using streaming to handle mixed content
-            # Note: This is synchronous in the SDK currently, but wrapped in async method
-            for chunk in self.client.models.generate_content_stream(
-                model=self.multimodal_model_name,
-                contents=contents,
-                config=generate_content_config,
-            ):
-                if not chunk.candidates or not chunk.candidates[0].content or not chunk.candidates[0].content.parts:
-                    continue
-
-                part = chunk.candidates[0].content.parts[0]
-                
-                # Handle Image
+        Yields, in arrival order:
+            {"type": "text",  "text": "<delta>"}
+            {"type": "image", "mime_type": "image/png", "data": b"..."}
+
+        Callers can start uploading the first image while later parts are
+        still streaming:
+
+            async for part in ai_service.stream_multimodal_content(prompt):
+                if part["type"] == "image":
+                    uploads.append(asyncio.create_task(storage.upload_file(...)))
+        """
+        logger.info(f"Streaming multimodal content for: {prompt[:30]}...")
+        await self._rate_limiter(self.multimodal_model_name).acquire()
+        contents = [
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_text(text=prompt),
+                ],
+            ),
+        ]
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.multimodal_model_name,
+            contents=contents,
+            config=self._build_multimodal_config(),
+        )
+        async for chunk in stream:
+            if not chunk.candidates or not chunk.candidates[0].content or not chunk.candidates[0].content.parts:
+                continue
+            # A chunk can carry several parts (e.g. a caption and an image).
+            for part in chunk.candidates[0].content.parts:
                 if part.inline_data and part.inline_data.data:
-                    images.append({
+                    yield {
+                        "type": "image",
                         "mime_type": part.inline_data.mime_type,
-                        "data": part.inline_data.data # Raw binary data
-                    })
-                
-                # Handle Text
+                        "data": part.inline_data.data,  # Raw binary data
+                    }
                 if part.text:
-                    text_parts.append(part.text)
+                    yield {"type": "text", "text": part.text}
 
+    async def generate_multimodal_content(self, prompt: str) -> dict:
+        """
+        Generates both TEXT and IMAGES from a single prompt using the new SDK.
+        Returns a dict with 'text' and 'images' (list of dictionaries with 'mime_type' and 'data').
+
+        Collects stream_multimodal_content; use that directly to act on parts
+        as they arrive.
+        """
+        text_parts = []
+        images = []
+        try:
+            async for part in self.stream_multimodal_content(prompt):
+                if part["type"] == "image":
+                    images.append({"mime_type": part["mime_type"], "data": part["data"]})
+                else:
+                    text_parts.append(part["text"])
             return {
                 "text": "".join(text_parts).strip(),
                 "images": images
@@ -297,16 +461,47 @@ class AIService:
             logger.error(f"Multimodal Generation failed: {str(e)}")
             raise e
 
-    @circuit_breaker(name="flux_image", failure_threshold=3, recovery_timeout=120)
-    @retry_with_backoff(max_retries=4, base_delay=30.0)
-    async def generate_image(self, prompt: str, fallback_on_failure: bool = True):
+    async def generate_image(
+        self,
+        prompt: str,
+        fallback_on_failure: bool = True,
+        priority: ImagePriority = ImagePriority.ACTIVITY,
+        story_key: Optional[str] = None,
+    ):
         """
         Generates an image from a prompt using the Together API.
-        Wrapped with circuit breaker and retry with exponential backoff.
+
+        Concurrent requests for the same prompt share one FLUX call (and one
+        slot of the FLUX rate budget) via AIProviderRegistry.image_flight.
 
         Args:
             prompt: Image generation prompt
             fallback_on_failure: If True, return None instead of raising on failure
+            priority: Scheduling class in front of the FLUX gate (cover images
+                jump ahead of activity images, which jump ahead of re-rolls)
+            story_key: Story to share FLUX turns fairly across; defaults to
+                the story of the current workflow run
+        """
+        if story_key is None:
+            story_key = current_story_key()
+        flight_key = f"{make_cache_key(settings.FLUX_IMAGE_MODEL, prompt)}:{fallback_on_failure}"
+        return await self.providers.image_flight.do(
+            flight_key,
+            lambda: self._generate_image(prompt, fallback_on_failure, priority, story_key),
+        )
+
+    @circuit_breaker(name="flux_image", failure_threshold=3, recovery_timeout=120)
+    @retry_with_backoff(max_retries=4, base_delay=30.0)
+    async def _generate_image(
+        self,
+        prompt: str,
+        fallback_on_failure: bool = True,
+        priority: ImagePriority = ImagePriority.ACTIVITY,
+        story_key: str = "",
+    ):
+        """
+        Single FLUX generation, wrapped with circuit breaker and retry with
+        exponential backoff.
 
         Notes on retry timing:
         - Together AI's image endpoint rate-limits per-minute. A plain 2s/4s backoff
@@ -318,25 +513,24 @@ class AIService:
         """
         try:
             logger.info(f"Generating image for: {prompt[:30]}...")
-            # Process-wide FLUX gate first (cross-agent serialisation for the
-            # Together AI rate cap), then the per-instance rate limiter.
-            await _flux_gate()
-            await self.rate_limiter.acquire()
-            client = InferenceClient(
-                provider="together",
-                api_key=settings.HF_TOKEN,
-            )
+            # The scheduler picks who goes to the FLUX gate next (priority,
+            # then round-robin across stories); the gate paces the Together AI
+            # rate cap; then the shared per-model rate limiter.
+            async with self.providers.image_scheduler.turn(priority, story_key):
+                await self.providers.flux_gate.acquire()
+            await self._rate_limiter(settings.FLUX_IMAGE_MODEL).acquire()
+            # Pooled async client: connections to the provider are kept alive
+            # across images and the request never blocks the event loop.
+            client = self.providers.image_client("together")
 
             # output is a PIL.Image object
             # Model from config: defaults to FLUX.1-schnell (10x cheaper, same quality for children's art)
-            image = client.text_to_image(
+            image = await client.text_to_image(
                 prompt,
                 model=settings.FLUX_IMAGE_MODEL,
             )
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
-            return img_byte_arr
+            # PNG encoding is CPU-bound; keep it off the loop too.
+            return await asyncio.to_thread(_encode_png, image)
         except CircuitBreakerError:
             logger.error("FLUX circuit breaker is OPEN - image generation unavailable")
             if fallback_on_failure:
@@ -350,10 +544,10 @@ class AIService:
             # per-minute window to clear. Suppressing 429 here (returning None
             # under fallback_on_failure) would skip retries entirely.
             if _is_rate_limit_error(e):
-                global _flux_last_request_at
-                _flux_last_request_at = time.monotonic() + 60.0
+                await self.providers.flux_gate.penalize(settings.FLUX_RATE_LIMIT_PENALTY_SECONDS)
                 logger.warning(
-                    "FLUX rate-limited (429) — paused module gate 60s; re-raising for retry"
+                    f"FLUX rate-limited (429) — paused FLUX gate "
+                    f"{settings.FLUX_RATE_LIMIT_PENALTY_SECONDS}s; re-raising for retry"
                 )
                 raise
             logger.error(f"Image Generation failed: {str(e)}")
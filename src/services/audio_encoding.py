@@ -0,0 +1,173 @@
+"""
+PCM assembly and compressed encoding for WF4 narration.
+
+Story audio used to be assembled with the `wave` module: every paragraph
+chunk was re-opened, its frames copied out, and copied again into a growing
+BytesIO — and each chunk's header was parsed a second time just to read its
+duration. The result was an uncompressed LINEAR16 WAV that sat in workflow
+state and was uploaded as-is (~2.9 MB per minute at 24 kHz mono).
+
+Now:
+    - parse_wav_header() walks the RIFF chunks once with struct; durations
+      come straight from the data chunk size (wav_duration)
+    - concat_wav() preallocates one buffer for header + all frame data and
+      copies each chunk's payload in through a memoryview slice
+    - encode_narration() optionally re-encodes the final narration to Opus
+      or MP3 (NARRATION_FORMAT) in an ffmpeg worker process, so the event
+      loop and this process's memory are untouched; without ffmpeg on PATH
+      (or if it fails) the WAV is kept
+
+Usage:
+    combined = concat_wav(chunks)                      # bytearray WAV
+    audio, fmt = await encode_narration(combined)      # fmt: wav/mp3/opus
+    content_type, extension = NARRATION_FORMATS[fmt]
+"""
+
+import asyncio
+import shutil
+import struct
+from typing import NamedTuple
+
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# format -> (content type, object extension)
+NARRATION_FORMATS: dict[str, tuple[str, str]] = {
+    "wav": ("audio/wav", ".wav"),
+    "mp3": ("audio/mpeg", ".mp3"),
+    "opus": ("audio/ogg", ".opus"),
+}
+
+# ffmpeg codec arguments per compressed format. Narration is mono speech, so
+# low bitrates are transparent; Opus is tuned for voice.
+_FFMPEG_CODECS: dict[str, list[str]] = {
+    "mp3": ["-codec:a", "libmp3lame", "-f", "mp3"],
+    "opus": ["-codec:a", "libopus", "-application", "voip", "-f", "ogg"],
+}
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")  # canonical 44-byte PCM header
+
+
+class WavLayout(NamedTuple):
+    channels: int
+    sample_width: int
+    frame_rate: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.channels * self.sample_width * self.frame_rate
+
+    @property
+    def duration(self) -> float:
+        return self.data_size / self.bytes_per_second
+
+
+def parse_wav_header(wav: bytes | bytearray | memoryview) -> WavLayout:
+    """Locate the fmt and data chunks of a PCM WAV without copying frames."""
+    view = memoryview(wav)
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE byte string")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(view):
+        chunk_id = bytes(view[pos:pos + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, frame_rate, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if audio_format != 1:
+                raise ValueError(f"unsupported WAV encoding {audio_format} (PCM only)")
+            fmt = (channels, bits // 8, frame_rate)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            # Streaming writers may leave the size unset; trust the buffer.
+            size = min(chunk_size, len(view) - body)
+            return WavLayout(*fmt, data_offset=body, data_size=size)
+        pos = body + chunk_size + (chunk_size & 1)  # chunks are word-aligned
+    raise ValueError("WAV has no data chunk")
+
+
+def wav_duration(wav: bytes | bytearray | memoryview) -> float:
+    """Duration in seconds, from the data chunk size."""
+    return parse_wav_header(wav).duration
+
+
+def concat_wav(chunks: list[bytes]) -> bytearray:
+    """
+    Join PCM WAV chunks with identical formats into one WAV.
+
+    Frame data is copied exactly once, into a buffer preallocated for the
+    whole narration. Returns a bytearray (no final bytes() copy).
+    """
+    if not chunks:
+        return bytearray()
+    layouts = [parse_wav_header(chunk) for chunk in chunks]
+    first = layouts[0]
+    for layout in layouts[1:]:
+        if layout[:3] != first[:3]:
+            raise ValueError(f"cannot join WAV chunks with different formats: {first[:3]} vs {layout[:3]}")
+
+    data_size = sum(layout.data_size for layout in layouts)
+    out = bytearray(_WAV_HEADER.size + data_size)
+    block_align = first.channels * first.sample_width
+    _WAV_HEADER.pack_into(
+        out, 0,
+        b"RIFF", _WAV_HEADER.size - 8 + data_size, b"WAVE",
+        b"fmt ", 16, 1, first.channels, first.frame_rate,
+        first.frame_rate * block_align, block_align, first.sample_width * 8,
+        b"data", data_size,
+    )
+    pos = _WAV_HEADER.size
+    for chunk, layout in zip(chunks, layouts):
+        end = pos + layout.data_size
+        out[pos:end] = memoryview(chunk)[layout.data_offset:layout.data_offset + layout.data_size]
+        pos = end
+    return out
+
+
+async def encode_narration(wav: bytes | bytearray, fmt: str | None = None) -> tuple[bytes | bytearray, str]:
+    """
+    Encode a WAV narration to NARRATION_FORMAT in an ffmpeg subprocess.
+    Returns (audio, format); falls back to (wav, "wav") if the format is
+    "wav", ffmpeg is unavailable, or encoding fails.
+    """
+    fmt = (fmt or settings.NARRATION_FORMAT).lower()
+    if fmt == "wav":
+        return wav, "wav"
+    if fmt not in _FFMPEG_CODECS:
+        logger.warning(f"Unknown NARRATION_FORMAT '{fmt}'; keeping WAV")
+        return wav, "wav"
+    ffmpeg = shutil.which(settings.FFMPEG_BINARY)
+    if ffmpeg is None:
+        logger.warning(f"{settings.FFMPEG_BINARY} not found on PATH; keeping WAV narration")
+        return wav, "wav"
+
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg, "-hide_banner", "-loglevel", "error",
+        "-f", "wav", "-i", "pipe:0",
+        "-ac", "1", "-b:a", f"{settings.NARRATION_BITRATE_KBPS}k",
+        *_FFMPEG_CODECS[fmt], "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        encoded, stderr = await asyncio.wait_for(
+            proc.communicate(wav), timeout=settings.NARRATION_ENCODE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        logger.warning(f"Narration {fmt} encoding timed out; keeping WAV")
+        return wav, "wav"
+    if proc.returncode != 0 or not encoded:
+        logger.warning(f"Narration {fmt} encoding failed ({proc.returncode}): {stderr.decode(errors='replace')[:300]}")
+        return wav, "wav"
+    logger.info(f"Encoded narration to {fmt}: {len(wav)} → {len(encoded)} bytes")
+    return encoded, fmt
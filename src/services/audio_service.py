@@ -12,12 +12,12 @@ Why Google TTS?
 """
 
 import asyncio
-import io
-import struct
-import wave
 from google.cloud import texttospeech
 
+from .ai_providers import get_provider_registry
 from .database.firestore_service import FirestoreService  # for credential pattern reference
+from .audio_encoding import concat_wav, wav_duration
+from .tts_cache import get_tts_cache, make_tts_cache_key
 from ..utils.config import get_settings
 from ..utils.logger import setup_logger
 from ..utils.resilience import circuit_breaker, retry_with_backoff, CircuitBreakerError
@@ -25,6 +25,10 @@ from ..utils.resilience import circuit_breaker, retry_with_backoff, CircuitBreak
 logger = setup_logger(__name__)
 settings = get_settings()
 
+# Rate-limit bucket shared by every TTS call in the process; size it with
+# MODEL_RATE_LIMITS / MODEL_BURST_CAPACITY like any other upstream model.
+TTS_RATE_LIMIT_KEY = "google-tts"
+
 
 class AudioService:
     def __init__(self):
@@ -115,36 +119,63 @@ class AudioService:
 
     @staticmethod
     def _wav_duration(wav_bytes: bytes) -> float:
-        """Returns the duration in seconds of a WAV byte string."""
-        with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
-            return wf.getnframes() / wf.getframerate()
+        """Returns the duration in seconds of a WAV byte string (from its header)."""
+        return wav_duration(wav_bytes)
 
     @staticmethod
-    def _combine_wav(wav_chunks: list[bytes]) -> bytes:
-        """Concatenates multiple WAV byte strings into a single WAV."""
-        if not wav_chunks:
-            return b""
-        # Read params from first chunk
-        with wave.open(io.BytesIO(wav_chunks[0]), "rb") as first:
-            params = first.getparams()
-
-        buf = io.BytesIO()
-        with wave.open(buf, "wb") as out:
-            out.setparams(params)
-            for chunk in wav_chunks:
-                with wave.open(io.BytesIO(chunk), "rb") as wf:
-                    out.writeframes(wf.readframes(wf.getnframes()))
-        return buf.getvalue()
+    def _combine_wav(wav_chunks: list[bytes]) -> bytearray:
+        """Concatenates multiple WAV byte strings into a single WAV (see audio_encoding.concat_wav)."""
+        return concat_wav(wav_chunks)
+
+    @circuit_breaker(
+        name="google_tts",
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT_SECONDS,
+    )
+    @retry_with_backoff(
+        max_retries=settings.MAX_RETRIES,
+        base_delay=settings.RETRY_DELAY_SECONDS,
+    )
+    async def _synthesize_paragraph(self, text: str, lang: str, voice: str) -> bytes:
+        """One paragraph as LINEAR16 WAV. Retried on its own, so a flaky call
+        does not restart the whole story."""
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        voice_params = texttospeech.VoiceSelectionParams(
+            language_code=lang,
+            name=voice,
+        )
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,  # WAV
+        )
+        # Every attempt spends a token from the process-wide TTS budget.
+        await get_provider_registry().rate_limiter(TTS_RATE_LIMIT_KEY).acquire()
+        response = await asyncio.to_thread(
+            self.client.synthesize_speech,
+            input=synthesis_input,
+            voice=voice_params,
+            audio_config=audio_config,
+        )
+        return response.audio_content
 
     async def synthesize_paragraphs(
         self,
         paragraphs: list[str],
         language_code: str = None,
         voice_name: str = None,
-    ) -> tuple[bytes, list[dict]] | tuple[None, None]:
+    ) -> tuple[bytearray, list[dict]] | tuple[None, None]:
         """
         Synthesizes each paragraph separately, then combines into one WAV.
 
+        Paragraphs are synthesized concurrently (at most
+        TTS_MAX_CONCURRENT_REQUESTS at a time per story, all stories sharing
+        the "google-tts" rate limit), then reassembled and timed in paragraph
+        order. If any paragraph still fails after its retries, the rest are
+        cancelled.
+
+        Each paragraph is looked up in the TTS cache first (see tts_cache), so
+        a WF4 retry or re-trigger with the same voice only synthesizes the
+        paragraphs whose text changed.
+
         Returns:
             (combined_wav_bytes, audio_timepoints) on success
             (None, None) on any failure
@@ -156,39 +187,40 @@ class AudioService:
         lang = language_code or settings.TTS_LANGUAGE_CODE
         voice = voice_name or settings.TTS_VOICE_NAME
 
+        numbered = [(idx, p) for idx, p in enumerate(paragraphs, start=1) if p.strip()]
+        slots = asyncio.Semaphore(settings.TTS_MAX_CONCURRENT_REQUESTS)
+        cache = get_tts_cache() if settings.TTS_CACHE_ENABLED else None
+
+        async def _paragraph(text: str) -> tuple[bytes, float]:
+            key = make_tts_cache_key(text, lang, voice, "LINEAR16")
+            cached = await cache.get(key) if cache else None
+            if cached:
+                return cached
+            async with slots:
+                chunk_bytes = await self._synthesize_paragraph(text, lang, voice)
+            if cache:
+                return chunk_bytes, await cache.put(key, chunk_bytes)
+            return chunk_bytes, self._wav_duration(chunk_bytes)
+
+        tasks = [asyncio.create_task(_paragraph(text)) for _, text in numbered]
+        try:
+            chunks: list[tuple[bytes, float]] = await asyncio.gather(*tasks)
+        except CircuitBreakerError:
+            logger.error("[AudioService] TTS circuit breaker OPEN")
+            return None, None
+        except Exception as e:
+            logger.error(f"[AudioService] synthesize_paragraphs failed: {e}")
+            return None, None
+        finally:
+            # A failed paragraph makes the story unusable — stop paying for the rest.
+            for task in tasks:
+                task.cancel()
+
         try:
-            wav_chunks: list[bytes] = []
             timepoints: list[dict] = []
             cursor = 0.0
-
-            for idx, paragraph in enumerate(paragraphs, start=1):
-                if not paragraph.strip():
-                    continue
-
-                synthesis_input = texttospeech.SynthesisInput(text=paragraph)
-                voice_params = texttospeech.VoiceSelectionParams(
-                    language_code=lang,
-                    name=voice,
-                )
-                audio_config = texttospeech.AudioConfig(
-                    audio_encoding=texttospeech.AudioEncoding.LINEAR16,  # WAV
-                )
-
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda ap=audio_config, vi=voice_params, si=synthesis_input: self.client.synthesize_speech(
-                        input=si,
-                        voice=vi,
-                        audio_config=ap,
-                    ),
-                )
-
-                chunk_bytes = response.audio_content
-                duration = self._wav_duration(chunk_bytes)
+            for (idx, _), (_, duration) in zip(numbered, chunks):
                 end = round(cursor + duration, 4)
-
-                wav_chunks.append(chunk_bytes)
                 timepoints.append({
                     "ParagraphNumber": idx,
                     "StartTimestamp": round(cursor, 4),
@@ -198,13 +230,10 @@ class AudioService:
                 cursor = end
                 logger.info(f"[AudioService] Paragraph {idx}: {duration:.4f}s")
 
-            combined = self._combine_wav(wav_chunks)
+            combined = self._combine_wav([chunk_bytes for chunk_bytes, _ in chunks])
             logger.info(f"[AudioService] Combined WAV: {len(combined)} bytes, {cursor:.4f}s total")
             return combined, timepoints
 
-        except CircuitBreakerError:
-            logger.error("[AudioService] TTS circuit breaker OPEN")
-            return None, None
         except Exception as e:
             logger.error(f"[AudioService] synthesize_paragraphs failed: {e}")
             return None, None
@@ -0,0 +1,245 @@
+"""
+Out-of-line storage for large binary values in LangGraph checkpoints.
+
+WF3/WF4 carry the raw image / narration bytes (image_bytes, audio_bytes)
+through every superstep, so each checkpoint embedded them again: a
+multi-megabyte WAV overflows Firestore's 1 MiB document limit, and every
+write re-sent the same bytes. Before a checkpoint is serialized, every
+bytes value of at least CHECKPOINT_BLOB_THRESHOLD_BYTES (at any depth of
+channel_values) is replaced by a reference
+
+    {"__checkpoint_blob__": "<sha256>", "size": <bytes>}
+
+and the bytes are written once, content-addressed, to a blob store:
+    - "gcs":   checkpoint-blobs/<sha256> in the media bucket (create-only)
+    - "local": CHECKPOINT_BLOB_SPOOL_DIR/<sha256> (dev / single instance)
+    - "none":  disabled, bytes stay inline
+
+Hashes already stored by this process are not uploaded again, so a value
+that rides along for several supersteps costs one upload. Blobs are fetched
+lazily — only when a checkpoint is actually read — from an in-process LRU
+first (bounded by CHECKPOINT_BLOB_MEMORY_MAX_BYTES), then the store. Blobs
+are shared between threads and never deleted with a checkpoint; expire the
+prefix with a bucket lifecycle rule.
+
+Usage:
+    blobs = CheckpointBlobs(LocalBlobStore("/tmp/spool"))
+    values = await blobs.spill(checkpoint["channel_values"])
+    values = await blobs.rehydrate(values)
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from .storage_bucket import StorageBucketService
+from ...utils.config import get_settings
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+BLOB_REF_KEY = "__checkpoint_blob__"
+CHECKPOINT_BLOB_PREFIX = "checkpoint-blobs"
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def _rebuild(original: list | tuple, items: list) -> list | tuple:
+    """items in the sequence type of original (lists, tuples, namedtuples)."""
+    if isinstance(original, list):
+        return items
+    if hasattr(original, "_fields"):
+        return type(original)(*items)
+    return type(original)(items)
+
+
+class LocalBlobStore:
+    """Blobs as files in a spool directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        if path.exists():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{digest}.")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        try:
+            return self._path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def put(self, digest: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, digest, data)
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, digest)
+
+
+class GCSBlobStore:
+    """Blobs as create-only objects under checkpoint-blobs/ in the bucket."""
+
+    def __init__(self, storage: Optional[StorageBucketService] = None):
+        self.storage = storage or StorageBucketService()
+
+    @staticmethod
+    def object_name(digest: str) -> str:
+        return f"{CHECKPOINT_BLOB_PREFIX}/{digest}"
+
+    async def put(self, digest: str, data: bytes) -> None:
+        url, _ = await self.storage.upload_file_if_absent(
+            self.object_name(digest), data, content_type="application/octet-stream"
+        )
+        if url is None:
+            raise RuntimeError(f"could not store checkpoint blob {digest}")
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        return await self.storage.download_file(self.object_name(digest))
+
+
+class CheckpointBlobs:
+    """Spills large bytes out of checkpoint values and rehydrates them on read."""
+
+    def __init__(
+        self,
+        store,
+        threshold_bytes: Optional[int] = None,
+        memory_max_bytes: Optional[int] = None,
+    ):
+        self.store = store
+        self.threshold_bytes = (
+            settings.CHECKPOINT_BLOB_THRESHOLD_BYTES if threshold_bytes is None else threshold_bytes
+        )
+        self.memory_max_bytes = (
+            settings.CHECKPOINT_BLOB_MEMORY_MAX_BYTES if memory_max_bytes is None else memory_max_bytes
+        )
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._stored: set[str] = set()
+        # digest -> upload in progress, shared by concurrent spills (a task's
+        # pending write and the next checkpoint often carry the same bytes)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats: dict[str, int] = {"spilled": 0, "uploaded": 0, "fetched": 0, "bytes_uploaded": 0}
+
+    async def spill(self, value: Any) -> Any:
+        """value with large bytes replaced by references; blobs are stored first."""
+        found: dict[str, bytes] = {}
+        spilled = self._replace_bytes(value, found)
+        pending = [self._put(digest, data) for digest, data in found.items() if digest not in self._stored]
+        if pending:
+            await asyncio.gather(*pending)
+        for digest, data in found.items():
+            self._remember(digest, data)
+        return spilled
+
+    async def rehydrate(self, value: Any) -> Any:
+        """value with blob references replaced by their bytes."""
+        digests: set[str] = set()
+        self._collect_refs(value, digests)
+        if not digests:
+            return value
+        missing = [d for d in digests if d not in self._memory]
+        fetched = await asyncio.gather(*(self.store.get(d) for d in missing))
+        blobs = {d: self._memory[d] for d in digests if d in self._memory}
+        for digest, data in zip(missing, fetched):
+            if data is None:
+                raise LookupError(f"checkpoint blob {digest} is missing from the blob store")
+            self.stats["fetched"] += 1
+            self._stored.add(digest)
+            self._remember(digest, data)
+            blobs[digest] = data
+        for digest in blobs:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+        return self._substitute(value, blobs)
+
+    def _put(self, digest: str, data: bytes) -> asyncio.Future:
+        upload = self._inflight.get(digest)
+        if upload is None:
+            upload = asyncio.ensure_future(self._upload(digest, data))
+            self._inflight[digest] = upload
+        return upload
+
+    async def _upload(self, digest: str, data: bytes) -> None:
+        try:
+            await self.store.put(digest, data)
+            self._stored.add(digest)
+            self.stats["uploaded"] += 1
+            self.stats["bytes_uploaded"] += len(data)
+        finally:
+            self._inflight.pop(digest, None)
+
+    def _replace_bytes(self, value: Any, found: dict[str, bytes]) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            if len(value) < self.threshold_bytes:
+                return value
+            data = bytes(value)
+            digest = hashlib.sha256(data).hexdigest()
+            found[digest] = data
+            self.stats["spilled"] += 1
+            return {BLOB_REF_KEY: digest, "size": len(data)}
+        if isinstance(value, dict):
+            replaced = {k: self._replace_bytes(v, found) for k, v in value.items()}
+            return replaced if any(replaced[k] is not value[k] for k in value) else value
+        if isinstance(value, (list, tuple)):
+            replaced = [self._replace_bytes(v, found) for v in value]
+            if all(r is v for r, v in zip(replaced, value)):
+                return value
+            return _rebuild(value, replaced)
+        return value
+
+    def _collect_refs(self, value: Any, digests: set[str]) -> None:
+        if is_blob_ref(value):
+            digests.add(value[BLOB_REF_KEY])
+        elif isinstance(value, dict):
+            for v in value.values():
+                self._collect_refs(v, digests)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                self._collect_refs(v, digests)
+
+    def _substitute(self, value: Any, blobs: dict[str, bytes]) -> Any:
+        if is_blob_ref(value):
+            return blobs[value[BLOB_REF_KEY]]
+        if isinstance(value, dict):
+            return {k: self._substitute(v, blobs) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return _rebuild(value, [self._substitute(v, blobs) for v in value])
+        return value
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        if len(data) > self.memory_max_bytes or digest in self._memory:
+            return
+        self._memory[digest] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+
+def make_checkpoint_blobs(backend: Optional[str] = None) -> Optional[CheckpointBlobs]:
+    """CheckpointBlobs for CHECKPOINT_BLOB_STORE, or None when spilling is disabled."""
+    backend = (backend or settings.CHECKPOINT_BLOB_STORE).lower()
+    if backend == "gcs":
+        return CheckpointBlobs(GCSBlobStore())
+    if backend == "local":
+        return CheckpointBlobs(LocalBlobStore(settings.CHECKPOINT_BLOB_SPOOL_DIR))
+    if backend != "none":
+        logger.warning(f"Unknown CHECKPOINT_BLOB_STORE '{backend}'; keeping bytes inline")
+    return None
@@ -11,26 +11,59 @@ Usage:
 """
 
 from typing import Any, Optional, Iterator, List, Tuple
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import asyncio
 import json
-import pickle
-import base64
+import weakref
 
 from langgraph.checkpoint.base import (
     BaseCheckpointSaver,
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    ERROR,
+    INTERRUPT,
+    WRITES_IDX_MAP,
+    writes_sort_key,
 )
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from google.cloud import firestore
 
+from .checkpoint_blobs import CheckpointBlobs, make_checkpoint_blobs
+from .checkpoint_serde import CheckpointCodec
 from ...utils.config import get_settings
 from ...utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 settings = get_settings()
 
+# Process-wide checkpoint write counters (exposed on /metrics):
+#   put       - aput calls from LangGraph
+#   written   - checkpoint documents actually written to Firestore
+#   coalesced - buffered checkpoints superseded before they were flushed,
+#               i.e. Firestore writes saved by write-behind mode
+#   trimmed   - checkpoints deleted by the keep-last retention on write
+checkpoint_write_stats: dict[str, int] = {"put": 0, "written": 0, "coalesced": 0, "trimmed": 0}
+
+# Firestore caps a batch at 500 writes and an "in" filter at 30 values.
+FIRESTORE_BATCH_LIMIT = 500
+FIRESTORE_IN_FILTER_LIMIT = 30
+
+# Write-behind savers, so shutdown can flush what they still buffer.
+_write_behind_savers: "weakref.WeakSet[FirestoreCheckpointer]" = weakref.WeakSet()
+
+# LangGraph schedules the next superstep's nodes by writing these channels.
+# A checkpoint whose updated channels include none of them schedules
+# nothing: the run is over.
+_TRIGGER_CHANNEL_PREFIXES = ("branch:to:", "join:", "__start__", "__pregel_tasks")
+
+
+def _is_terminal(checkpoint: Checkpoint) -> bool:
+    updated = checkpoint.get("updated_channels")
+    if not updated:
+        return True  # unknown: flush rather than risk staleness
+    return not any(channel.startswith(_TRIGGER_CHANNEL_PREFIXES) for channel in updated)
+
 
 class FirestoreCheckpointer(BaseCheckpointSaver):
     """
@@ -43,30 +76,106 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
     
     Document fields:
         - thread_id: str
+        - checkpoint_ns: str
         - checkpoint_id: str
         - parent_checkpoint_id: Optional[str]
-        - checkpoint: str (base64 encoded pickle)
+        - checkpoint: bytes (versioned, compressed typed serialization —
+          see checkpoint_serde; legacy documents hold a base64 pickle str).
+          Large bytes values in channel_values are kept out of line in a
+          blob store and referenced by content hash (see checkpoint_blobs).
         - metadata: dict
         - created_at: timestamp
+        - expires_at: timestamp (created_at + ttl_days; configure a Firestore
+          TTL policy on it to have abandoned threads purged server-side)
+
+    Pending writes — the channel writes of tasks that finished inside a
+    superstep whose checkpoint is not saved yet — go to a second collection,
+    one document per (thread, checkpoint, task):
+
+    Collection: workflow_checkpoint_writes
+    Document ID: {thread_id}_{checkpoint_id}_{task_id}[_{special channel}]
+
+    Document fields:
+        - thread_id, checkpoint_ns, checkpoint_id, task_id, task_path: str
+        - writes: [{idx: int, channel: str, value: bytes}]
+        - created_at, expires_at: timestamp
+
+    aget_tuple / alist return them as pending_writes, so a resumed run only
+    re-executes the tasks of the interrupted superstep that had not finished.
+
+    Write-behind mode (CHECKPOINT_WRITE_BEHIND) makes aput return without a
+    Firestore round-trip: only the newest checkpoint per thread is buffered
+    and earlier unflushed ones are dropped. The buffer is flushed
+        - at most CHECKPOINT_WRITE_BEHIND_MAX_STALENESS_SECONDS after the
+          oldest unflushed checkpoint (bounded staleness)
+        - before interrupt() / HITL and on task errors (interrupt/error writes)
+        - at the end of a run (a checkpoint that schedules no further nodes)
+        - before reads of the thread, and on shutdown (flush_write_behind)
+    A crash loses at most the staleness window; pending writes are still
+    stored immediately. Flushed checkpoints point at the last flushed
+    parent, so the stored history stays a chain.
+
+    Retention: only the newest CHECKPOINT_KEEP_LAST checkpoints of a thread
+    are kept. Each durable write deletes the ones that fell out of the
+    window, with their pending writes, so a thread that never reaches
+    finalize (HITL, crash) still holds a bounded number of documents.
+    Anything older than ttl_days is removed by the expires_at TTL policy or
+    by cleanup_old_checkpoints (see sweep_checkpoints).
     
     Args:
         collection_name: Firestore collection name for checkpoints
-        ttl_days: Auto-delete checkpoints after N days (default: 7)
+        writes_collection_name: Firestore collection name for pending writes
+        ttl_days: Auto-delete checkpoints after N days (default: CHECKPOINT_TTL_DAYS)
+        keep_last: Checkpoints kept per thread, 0 = all (default: CHECKPOINT_KEEP_LAST)
+        blobs: Out-of-line store for large bytes (default: CHECKPOINT_BLOB_STORE)
+        write_behind: Buffer and coalesce checkpoint writes (default: CHECKPOINT_WRITE_BEHIND)
+        max_staleness_seconds: Flush deadline for buffered checkpoints
     """
     
-    serde = JsonPlusSerializer()
+    # msgpack for everything it can represent; pickle only as a fallback so
+    # arbitrary state values still round-trip as they did before.
+    serde = JsonPlusSerializer(pickle_fallback=True)
     
     def __init__(
         self,
         collection_name: str = "workflow_checkpoints",
-        ttl_days: int = 7
+        writes_collection_name: str = "workflow_checkpoint_writes",
+        ttl_days: Optional[int] = None,
+        keep_last: Optional[int] = None,
+        blobs: Optional[CheckpointBlobs] = None,
+        write_behind: Optional[bool] = None,
+        max_staleness_seconds: Optional[float] = None,
     ):
         super().__init__()
+        self.codec = CheckpointCodec(self.serde)
+        self.blobs = blobs if blobs is not None else make_checkpoint_blobs()
         self.collection_name = collection_name
-        self.ttl_days = ttl_days
+        self.writes_collection_name = writes_collection_name
+        self.ttl_days = settings.CHECKPOINT_TTL_DAYS if ttl_days is None else ttl_days
+        self.keep_last = settings.CHECKPOINT_KEEP_LAST if keep_last is None else keep_last
+        # (thread_id, checkpoint_ns) -> stored checkpoint ids, oldest first
+        self._retained: dict[tuple[str, str], list[str]] = {}
         self._client: Optional[firestore.AsyncClient] = None
         self._client_loop = None  # event loop the client was created on
 
+        self.write_behind = settings.CHECKPOINT_WRITE_BEHIND if write_behind is None else write_behind
+        self.max_staleness_seconds = (
+            settings.CHECKPOINT_WRITE_BEHIND_MAX_STALENESS_SECONDS
+            if max_staleness_seconds is None else max_staleness_seconds
+        )
+        # (thread_id, checkpoint_ns) -> (doc_id, doc_data) of the newest unflushed checkpoint
+        self._buffer: dict[tuple[str, str], tuple[str, dict]] = {}
+        # (thread_id, checkpoint_ns) -> parent id for the next flushed checkpoint
+        self._durable_parent: dict[tuple[str, str], Optional[str]] = {}
+        # (thread_id, checkpoint_ns) -> ids of coalesced checkpoints that were
+        # never written; their pending writes are deleted on the next flush
+        self._superseded: dict[tuple[str, str], list[str]] = {}
+        self._flush_timers: dict[tuple[str, str], asyncio.Task] = {}
+        # One flush per thread at a time, so parents are assigned in order
+        self._flush_locks: dict[tuple[str, str], asyncio.Lock] = {}
+        if self.write_behind:
+            _write_behind_savers.add(self)
+
     @property
     def client(self) -> firestore.AsyncClient:
         """Lazy initialization of Firestore client. Recreates if the bound event loop is closed
@@ -103,19 +212,87 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
         """Get the checkpoints collection reference."""
         return self.client.collection(self.collection_name)
     
+    def _get_writes_collection(self):
+        """Get the pending writes collection reference."""
+        return self.client.collection(self.writes_collection_name)
+    
     def _make_doc_id(self, thread_id: str, checkpoint_id: str) -> str:
         """Create a unique document ID."""
         return f"{thread_id}_{checkpoint_id}"
+
+    def _make_writes_doc_id(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, task_id: str, channel: str = ""
+    ) -> str:
+        """Document ID for one task's writes (special channels get their own)."""
+        parts = [thread_id, checkpoint_ns, checkpoint_id, task_id, channel]
+        return "_".join(part for part in parts if part)
     
-    def _serialize_checkpoint(self, checkpoint: Checkpoint) -> str:
-        """Serialize checkpoint to base64 string for Firestore storage."""
-        pickled = pickle.dumps(checkpoint)
-        return base64.b64encode(pickled).decode("utf-8")
+    def _serialize_checkpoint(self, checkpoint: Checkpoint) -> bytes:
+        """Serialize checkpoint to compressed bytes for Firestore storage."""
+        return self.codec.dumps(checkpoint)
     
-    def _deserialize_checkpoint(self, data: str) -> Checkpoint:
-        """Deserialize checkpoint from base64 string."""
-        pickled = base64.b64decode(data.encode("utf-8"))
-        return pickle.loads(pickled)
+    def _deserialize_checkpoint(self, data: bytes | str) -> Checkpoint:
+        """Deserialize checkpoint bytes (or a legacy base64 pickle string)."""
+        return self.codec.loads(data)
+
+    async def _load_checkpoint(self, data: bytes | str) -> Checkpoint:
+        """Deserialize a stored checkpoint and fetch any out-of-line blobs."""
+        checkpoint = self._deserialize_checkpoint(data)
+        if self.blobs is not None:
+            checkpoint["channel_values"] = await self.blobs.rehydrate(checkpoint["channel_values"])
+        return checkpoint
+
+    async def _encode_write_value(self, value: Any) -> bytes:
+        if self.blobs is not None:
+            value = await self.blobs.spill(value)
+        return self.codec.dumps(value)
+
+    async def _decode_write_value(self, data: bytes) -> Any:
+        value = self.codec.loads(data)
+        if self.blobs is not None:
+            value = await self.blobs.rehydrate(value)
+        return value
+
+    async def _load_pending_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str] = None
+    ) -> dict[str, list[tuple[str, str, Any]]]:
+        """
+        checkpoint_id -> [(task_id, channel, value)] in superstep order, for
+        one checkpoint or (checkpoint_id=None) the whole thread. A failed read
+        only loses the replay: the tasks are re-executed as before.
+        """
+        try:
+            query = self._get_writes_collection().where(
+                filter=firestore.FieldFilter("thread_id", "==", thread_id)
+            )
+            if checkpoint_id:
+                query = query.where(filter=firestore.FieldFilter("checkpoint_id", "==", checkpoint_id))
+            docs = await query.get()
+
+            entries: dict[str, list[tuple]] = {}
+            for doc in docs:
+                data = doc.to_dict() or {}
+                if data.get("checkpoint_ns", "") != checkpoint_ns:
+                    continue
+                for write in data.get("writes", []):
+                    entries.setdefault(data["checkpoint_id"], []).append((
+                        writes_sort_key(data.get("task_path", ""), data["task_id"], write["idx"]),
+                        data["task_id"],
+                        write["channel"],
+                        write["value"],
+                    ))
+
+            pending: dict[str, list[tuple[str, str, Any]]] = {}
+            for cp_id, items in entries.items():
+                items.sort(key=lambda item: item[0])
+                pending[cp_id] = [
+                    (task_id, channel, await self._decode_write_value(value))
+                    for _, task_id, channel, value in items
+                ]
+            return pending
+        except Exception as e:
+            logger.warning(f"Could not load pending writes for thread {thread_id}: {e}")
+            return {}
     
     async def aget_tuple(self, config: dict) -> Optional[CheckpointTuple]:
         """
@@ -128,9 +305,13 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
             CheckpointTuple or None if no checkpoint exists
         """
         thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
         checkpoint_id = config["configurable"].get("checkpoint_id")
         
         try:
+            if self.write_behind:
+                await self.aflush(thread_id)
+
             if checkpoint_id:
                 # Get specific checkpoint
                 doc_id = self._make_doc_id(thread_id, checkpoint_id)
@@ -181,8 +362,9 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
                     newest_doc = max(docs, key=_created_at)
                     data = newest_doc.to_dict()
             
-            checkpoint = self._deserialize_checkpoint(data["checkpoint"])
+            checkpoint = await self._load_checkpoint(data["checkpoint"])
             metadata = CheckpointMetadata(**data.get("metadata", {}))
+            pending = await self._load_pending_writes(thread_id, checkpoint_ns, data["checkpoint_id"])
             
             return CheckpointTuple(
                 config={
@@ -199,6 +381,7 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
                         "checkpoint_id": data.get("parent_checkpoint_id"),
                     }
                 } if data.get("parent_checkpoint_id") else None,
+                pending_writes=pending.get(data["checkpoint_id"], []),
             )
         except Exception as e:
             logger.error(f"Error getting checkpoint for thread {thread_id}: {e}")
@@ -225,8 +408,12 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
             return
         
         thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
         
         try:
+            if self.write_behind:
+                await self.aflush(thread_id)
+
             query = (
                 self._get_collection()
                 .where(filter=firestore.FieldFilter("thread_id", "==", thread_id))
@@ -258,10 +445,13 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
                 )
                 if limit:
                     docs = docs[:limit]
+
+            # One query for the whole thread rather than one per checkpoint.
+            pending = await self._load_pending_writes(thread_id, checkpoint_ns) if docs else {}
             
             for doc in docs:
                 data = doc.to_dict()
-                checkpoint = self._deserialize_checkpoint(data["checkpoint"])
+                checkpoint = await self._load_checkpoint(data["checkpoint"])
                 metadata = CheckpointMetadata(**data.get("metadata", {}))
                 
                 yield CheckpointTuple(
@@ -279,6 +469,7 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
                             "checkpoint_id": data.get("parent_checkpoint_id"),
                         }
                     } if data.get("parent_checkpoint_id") else None,
+                    pending_writes=pending.get(data["checkpoint_id"], []),
                 )
         except Exception as e:
             logger.error(f"Error listing checkpoints for thread {thread_id}: {e}")
@@ -303,26 +494,43 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
             Updated config with checkpoint_id
         """
         thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
         parent_checkpoint_id = config["configurable"].get("checkpoint_id")
         
         # Generate new checkpoint ID
         checkpoint_id = checkpoint["id"]
+        checkpoint_write_stats["put"] += 1
         
         try:
             doc_id = self._make_doc_id(thread_id, checkpoint_id)
+
+            if self.blobs is not None:
+                checkpoint = {
+                    **checkpoint,
+                    "channel_values": await self.blobs.spill(checkpoint["channel_values"]),
+                }
             
+            now = datetime.now(timezone.utc)
             doc_data = {
                 "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
                 "checkpoint_id": checkpoint_id,
                 "parent_checkpoint_id": parent_checkpoint_id,
                 "checkpoint": self._serialize_checkpoint(checkpoint),
                 "metadata": metadata.__dict__ if hasattr(metadata, "__dict__") else dict(metadata),
-                "created_at": datetime.now(timezone.utc),
+                "created_at": now,
+                "expires_at": now + timedelta(days=self.ttl_days),
             }
             
-            await self._get_collection().document(doc_id).set(doc_data)
-            
-            logger.debug(f"Saved checkpoint {checkpoint_id} for thread {thread_id}")
+            if self.write_behind:
+                self._buffer_checkpoint((thread_id, checkpoint_ns), doc_id, doc_data)
+                if _is_terminal(checkpoint):
+                    await self.aflush(thread_id)
+            else:
+                await self._get_collection().document(doc_id).set(doc_data)
+                checkpoint_write_stats["written"] += 1
+                logger.debug(f"Saved checkpoint {checkpoint_id} for thread {thread_id}")
+                await self._retain((thread_id, checkpoint_ns), checkpoint_id)
             
             return {
                 "configurable": {
@@ -334,20 +542,200 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
             logger.error(f"Error saving checkpoint for thread {thread_id}: {e}")
             raise
     
+    def _buffer_checkpoint(self, key: tuple[str, str], doc_id: str, doc_data: dict) -> None:
+        """Keep only the newest checkpoint of a thread; arm its flush deadline."""
+        if key in self._buffer:
+            checkpoint_write_stats["coalesced"] += 1
+            self._superseded.setdefault(key, []).append(self._buffer[key][1]["checkpoint_id"])
+        else:
+            # The first unflushed checkpoint's parent is durable (flushed or
+            # loaded); later buffered ones chain back to it when flushed.
+            self._durable_parent.setdefault(key, doc_data["parent_checkpoint_id"])
+        self._buffer[key] = (doc_id, doc_data)
+        timer = self._flush_timers.get(key)
+        if timer is None or timer.done():
+            self._flush_timers[key] = asyncio.create_task(self._flush_after_deadline(key))
+
+    async def _flush_after_deadline(self, key: tuple[str, str]) -> None:
+        await asyncio.sleep(self.max_staleness_seconds)
+        self._flush_timers.pop(key, None)
+        try:
+            await self._flush_key(key)
+        except Exception as e:
+            logger.error(f"Write-behind flush failed for thread {key[0]}: {e}")
+
+    async def _flush_key(self, key: tuple[str, str]) -> None:
+        async with self._flush_locks.setdefault(key, asyncio.Lock()):
+            entry = self._buffer.pop(key, None)
+            if entry is None:
+                return
+            doc_id, doc_data = entry
+            doc_data = {**doc_data, "parent_checkpoint_id": self._durable_parent.get(key)}
+            try:
+                await self._get_collection().document(doc_id).set(doc_data)
+            except BaseException:
+                if key in self._buffer:  # a newer checkpoint arrived meanwhile
+                    self._superseded.setdefault(key, []).append(doc_data["checkpoint_id"])
+                else:
+                    self._buffer[key] = entry  # retried by the next flush
+                raise
+            checkpoint_write_stats["written"] += 1
+            self._durable_parent[key] = doc_data["checkpoint_id"]
+            logger.debug(f"Flushed checkpoint {doc_data['checkpoint_id']} for thread {key[0]}")
+            await self._drop_superseded(key)
+            await self._retain(key, doc_data["checkpoint_id"])
+
+    async def _drop_superseded(self, key: tuple[str, str]) -> None:
+        """
+        Delete the pending writes of coalesced checkpoints. Those checkpoints
+        were never stored, so nothing can resume from them and retention
+        would never reach their writes.
+        """
+        superseded = self._superseded.pop(key, None)
+        if not superseded:
+            return
+        try:
+            await self._delete_refs(await self._pending_write_refs(key[0], key[1], superseded))
+        except Exception as e:
+            logger.warning(f"Could not delete writes of coalesced checkpoints for thread {key[0]}: {e}")
+
+    async def aflush(self, thread_id: Optional[str] = None) -> None:
+        """Durably write buffered checkpoints (of one thread, or all)."""
+        keys = [key for key in self._buffer if thread_id is None or key[0] == thread_id]
+        for key in keys:
+            timer = self._flush_timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+        await asyncio.gather(*(self._flush_key(key) for key in keys))
+
+    async def _retain(self, key: tuple[str, str], checkpoint_id: str) -> None:
+        """
+        Record a durable checkpoint and delete those that fell out of the
+        keep-last window. Best effort: whatever a failure leaves behind
+        expires with the TTL.
+        """
+        if self.keep_last <= 0:
+            return
+        try:
+            retained = self._retained.get(key)
+            if retained is None:
+                # First write for this thread in this process: pick up what
+                # earlier runs (or pods) left behind.
+                retained = self._retained[key] = await self._stored_checkpoint_ids(*key)
+            if checkpoint_id not in retained:
+                retained.append(checkpoint_id)
+            if len(retained) <= self.keep_last:
+                return
+            expired = retained[:-self.keep_last]
+            del retained[:-self.keep_last]
+            await self._delete_checkpoints(key[0], key[1], expired)
+            checkpoint_write_stats["trimmed"] += len(expired)
+        except Exception as e:
+            logger.warning(f"Could not trim old checkpoints for thread {key[0]}: {e}")
+
+    async def _stored_checkpoint_ids(self, thread_id: str, checkpoint_ns: str) -> list[str]:
+        """Checkpoint ids stored for a thread, oldest first."""
+        docs = await self._get_collection().where(
+            filter=firestore.FieldFilter("thread_id", "==", thread_id)
+        ).get()
+        rows = [doc.to_dict() or {} for doc in docs]
+        rows = [row for row in rows if row.get("checkpoint_ns", "") == checkpoint_ns]
+        rows.sort(key=lambda row: row["created_at"])
+        return [row["checkpoint_id"] for row in rows]
+
+    async def _delete_checkpoints(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: list[str]) -> int:
+        """Delete checkpoints of a thread together with their pending writes."""
+        refs = [
+            self._get_collection().document(self._make_doc_id(thread_id, checkpoint_id))
+            for checkpoint_id in checkpoint_ids
+        ]
+        refs += await self._pending_write_refs(thread_id, checkpoint_ns, checkpoint_ids)
+        return await self._delete_refs(refs)
+
+    async def _pending_write_refs(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: list[str]) -> list:
+        """References to the pending-write documents of the given checkpoints."""
+        refs = []
+        for start in range(0, len(checkpoint_ids), FIRESTORE_IN_FILTER_LIMIT):
+            chunk = checkpoint_ids[start:start + FIRESTORE_IN_FILTER_LIMIT]
+            docs = await (
+                self._get_writes_collection()
+                .where(filter=firestore.FieldFilter("thread_id", "==", thread_id))
+                .where(filter=firestore.FieldFilter("checkpoint_id", "in", chunk))
+                .get()
+            )
+            refs += [
+                doc.reference for doc in docs
+                if (doc.to_dict() or {}).get("checkpoint_ns", "") == checkpoint_ns
+            ]
+        return refs
+
+    async def _delete_refs(self, refs: list) -> int:
+        """Delete documents in batches of at most FIRESTORE_BATCH_LIMIT."""
+        for start in range(0, len(refs), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for ref in refs[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.delete(ref)
+            await batch.commit()
+        return len(refs)
+
     async def aput_writes(
         self,
         config: dict,
         writes: List[Tuple[str, Any]],
         task_id: str,
+        task_path: str = "",
     ) -> None:
         """
         Store intermediate writes (for pending operations).
         
-        This is used for storing writes that haven't been committed to a checkpoint yet.
+        Called as each task of a superstep finishes, before the superstep's
+        checkpoint exists. Regular writes of a task share one document;
+        special channels (error, interrupt, resume, ...) get their own so a
+        later special write never clobbers the task's output. Failures are
+        logged, not raised: the task is simply re-executed on recovery.
         """
-        # For simplicity, we don't persist intermediate writes
-        # They will be re-computed on recovery
-        pass
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        groups: dict[str, list[tuple[int, str, Any]]] = {}
+        for idx, (channel, value) in enumerate(writes):
+            special = channel in WRITES_IDX_MAP
+            doc_id = self._make_writes_doc_id(
+                thread_id, checkpoint_ns, checkpoint_id, task_id, channel if special else ""
+            )
+            groups.setdefault(doc_id, []).append((WRITES_IDX_MAP.get(channel, idx), channel, value))
+
+        now = datetime.now(timezone.utc)
+
+        async def _store(doc_id: str, items: list[tuple[int, str, Any]]) -> None:
+            await self._get_writes_collection().document(doc_id).set({
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+                "task_id": task_id,
+                "task_path": task_path,
+                "writes": [
+                    {"idx": idx, "channel": channel, "value": await self._encode_write_value(value)}
+                    for idx, channel, value in items
+                ],
+                "created_at": now,
+                "expires_at": now + timedelta(days=self.ttl_days),
+            })
+
+        try:
+            await asyncio.gather(*(_store(doc_id, items) for doc_id, items in groups.items()))
+            logger.debug(f"Saved {len(writes)} writes of task {task_id} for thread {thread_id}")
+        except Exception as e:
+            logger.warning(f"Could not save writes of task {task_id} for thread {thread_id}: {e}")
+
+        # interrupt() (HITL) or a failing task ends the run here: make the
+        # checkpoint these writes belong to durable before it returns.
+        if self.write_behind and any(channel in (INTERRUPT, ERROR) for channel, _ in writes):
+            try:
+                await self.aflush(thread_id)
+            except Exception as e:
+                logger.error(f"Could not flush checkpoints for thread {thread_id}: {e}")
     
     # Sync versions (required by base class, but we use async)
     def get_tuple(self, config: dict) -> Optional[CheckpointTuple]:
@@ -380,26 +768,36 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
         config: dict,
         writes: List[Tuple[str, Any]],
         task_id: str,
+        task_path: str = "",
     ) -> None:
         """Sync version - use aput_writes for async."""
         raise NotImplementedError("Use aput_writes for async operations")
     
     async def adelete_thread(self, thread_id: str) -> None:
         """
-        Delete all checkpoints for a thread.
+        Delete all checkpoints and pending writes for a thread.
         
         Args:
             thread_id: The thread ID to delete checkpoints for
         """
+        for key in [key for key in self._buffer if key[0] == thread_id]:
+            self._buffer.pop(key, None)
+            self._durable_parent.pop(key, None)
+            self._superseded.pop(key, None)
+            timer = self._flush_timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+        for key in [key for key in self._retained if key[0] == thread_id]:
+            del self._retained[key]
         try:
             query = self._get_collection().where(filter=firestore.FieldFilter("thread_id", "==", thread_id))
             docs = await query.get()
+            writes_query = self._get_writes_collection().where(
+                filter=firestore.FieldFilter("thread_id", "==", thread_id)
+            )
+            docs += await writes_query.get()
             
-            batch = self.client.batch()
-            for doc in docs:
-                batch.delete(doc.reference)
-            
-            await batch.commit()
+            await self._delete_refs([doc.reference for doc in docs])
             logger.info(f"Deleted {len(docs)} checkpoints for thread {thread_id}")
         except Exception as e:
             logger.error(f"Error deleting checkpoints for thread {thread_id}: {e}")
@@ -407,34 +805,54 @@ class FirestoreCheckpointer(BaseCheckpointSaver):
     
     async def cleanup_old_checkpoints(self, days: Optional[int] = None) -> int:
         """
-        Delete checkpoints older than N days.
+        Delete checkpoints and pending writes older than N days.
+        
+        Pages through each collection FIRESTORE_BATCH_LIMIT documents at a
+        time, so a large backlog never becomes one unbounded read or batch.
         
         Args:
             days: Number of days (default: self.ttl_days)
         
         Returns:
-            Number of deleted checkpoints
+            Number of deleted documents
         """
         days = days or self.ttl_days
-        cutoff = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        cutoff = cutoff.replace(day=cutoff.day - days)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
         
         try:
-            query = self._get_collection().where(filter=firestore.FieldFilter("created_at", "<", cutoff))
-            docs = await query.get()
-            
-            if not docs:
-                return 0
-            
-            batch = self.client.batch()
-            for doc in docs:
-                batch.delete(doc.reference)
+            deleted = 0
+            for collection in (self._get_collection(), self._get_writes_collection()):
+                query = (
+                    collection
+                    .where(filter=firestore.FieldFilter("created_at", "<", cutoff))
+                    .limit(FIRESTORE_BATCH_LIMIT)
+                )
+                while True:
+                    docs = await query.get()
+                    deleted += await self._delete_refs([doc.reference for doc in docs])
+                    if len(docs) < FIRESTORE_BATCH_LIMIT:
+                        break
             
-            await batch.commit()
-            logger.info(f"Cleaned up {len(docs)} old checkpoints")
-            return len(docs)
+            logger.info(f"Cleaned up {deleted} checkpoint documents older than {days} days")
+            return deleted
         except Exception as e:
             logger.error(f"Error cleaning up old checkpoints: {e}")
             raise
+
+async def flush_write_behind() -> None:
+    """Flush every write-behind checkpointer in the process (shutdown hook)."""
+    for saver in list(_write_behind_savers):
+        try:
+            await saver.aflush()
+        except Exception as e:
+            logger.error(f"Write-behind checkpoint flush failed on shutdown: {e}")
+
+
+async def sweep_checkpoints(days: Optional[int] = None) -> int:
+    """
+    Scheduled retention sweep (POST /checkpoints/sweep, e.g. from Cloud
+    Scheduler): removes checkpoints of threads that never finished and
+    whose documents outlived the TTL. Covers documents written before
+    expires_at existed and databases without a TTL policy.
+    """
+    return await FirestoreCheckpointer().cleanup_old_checkpoints(days)
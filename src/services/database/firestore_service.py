@@ -14,6 +14,9 @@ logger = setup_logger(__name__)
 # Activities: activities_v1 (unchanged, tagged with story_id)
 # ---------------------------------------------------------------------------
 
+# Firestore rejects batches of more than 500 writes.
+_BATCH_LIMIT = 500
+
 _TOPIC_COLLECTIONS = {
     "theme1": "planet_protectors_topics",
     "theme2": "mindful_topics",
@@ -272,16 +275,25 @@ class FirestoreService:
             raise
 
     async def save_story_image(
-        self, story_id: str, image_url: str, generation_prompt: str, theme: str
+        self,
+        story_id: str,
+        image_url: str,
+        generation_prompt: str,
+        theme: str,
+        image_variants: dict | None = None,
     ) -> None:
-        """Updates image_url and image_prompt on the story doc."""
+        """Updates image_url, image_variants (thumbnail URLs by size name) and
+        image_prompt on the story doc."""
         try:
             col = self._story_collection(theme)
-            self.db.collection(col).document(story_id).set({
+            story_update = {
                 "image_url":    image_url,
                 "image_prompt": generation_prompt,
                 "updated_at":   firestore.SERVER_TIMESTAMP,
-            }, merge=True)
+            }
+            if image_variants:
+                story_update["image_variants"] = image_variants
+            self.db.collection(col).document(story_id).set(story_update, merge=True)
             logger.info(f"[Firestore] image_url saved on {col}/{story_id}")
         except Exception as e:
             logger.error(f"save_story_image failed: {e}")
@@ -666,24 +678,26 @@ class FirestoreService:
 
     async def delete_workflow_checkpoints(self, thread_ids: list[str]) -> None:
         """
-        Deletes workflow_checkpoints documents for the given thread_ids.
+        Deletes workflow_checkpoints documents (and their pending
+        workflow_checkpoint_writes) for the given thread_ids.
         Called after a full story pipeline completes successfully.
         """
         try:
-            batch = self.db.batch()
-            deleted = 0
+            refs = []
             for thread_id in thread_ids:
-                q = (
-                    self.db.collection("workflow_checkpoints")
-                    .where(filter=FieldFilter("thread_id", "==", thread_id))
-                )
-                docs = list(q.stream())
-                for doc in docs:
-                    batch.delete(doc.reference)
-                    deleted += 1
-            if deleted:
+                for collection in ("workflow_checkpoints", "workflow_checkpoint_writes"):
+                    q = (
+                        self.db.collection(collection)
+                        .where(filter=FieldFilter("thread_id", "==", thread_id))
+                    )
+                    refs += [doc.reference for doc in q.stream()]
+            for start in range(0, len(refs), _BATCH_LIMIT):
+                batch = self.db.batch()
+                for ref in refs[start:start + _BATCH_LIMIT]:
+                    batch.delete(ref)
                 batch.commit()
-                logger.info(f"[Firestore] Cleaned {deleted} checkpoints for {len(thread_ids)} threads")
+            if refs:
+                logger.info(f"[Firestore] Cleaned {len(refs)} checkpoints for {len(thread_ids)} threads")
         except Exception as e:
             logger.error(f"delete_workflow_checkpoints failed (non-fatal): {e}")
 
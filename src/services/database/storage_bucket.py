@@ -1,10 +1,95 @@
+"""
+GCS storage for generated media.
+
+Every google-cloud-storage call is blocking (requests under the hood). They
+used to run directly inside these `async` methods, so a multi-megabyte WAV
+upload in save_audio_node stalled every other coroutine in the process for
+the whole transfer. Now:
+
+    - all GCS calls run in worker threads (asyncio.to_thread)
+    - uploads share a process-wide cap of GCS_MAX_CONCURRENT_UPLOADS, so a
+      burst of image variants + audio cannot open unbounded connections
+    - payloads of GCS_RESUMABLE_THRESHOLD_BYTES or more (story audio) use
+      a resumable, chunked upload instead of one multipart request
+    - upload_stream() accepts a file object or a (sync or async) iterator of
+      byte chunks, so callers never need the whole payload in memory
+    - transient failures (429 / 5xx / connection resets) are retried with
+      exponential backoff before the method gives up and returns None
+
+Media objects are content-addressed: upload_content_addressed() names them
+`<prefix>/<sha256(bytes)><ext>`, so identical bytes are stored once and a
+name never changes meaning. Create-only objects are served with
+GCS_IMMUTABLE_CACHE_CONTROL so browsers and the CDN can keep them forever.
+upload_stats counts uploads skipped because the object already existed.
+"""
+
+import asyncio
+import hashlib
+import io
+import weakref
+from typing import AsyncIterable, BinaryIO, Iterable
+
+import requests
+from google.api_core.exceptions import (
+    BadGateway,
+    GatewayTimeout,
+    InternalServerError,
+    NotFound,
+    PreconditionFailed,
+    ServiceUnavailable,
+    TooManyRequests,
+)
 from google.cloud import storage
 from ...utils.config import get_settings
 from ...utils.logger import setup_logger
+from ...utils.resilience import retry_with_backoff
 
 settings = get_settings()
 logger = setup_logger(__name__)
 
+# Errors worth retrying; anything else (403, 404, 412 ...) fails immediately.
+_TRANSIENT_ERRORS = (
+    TooManyRequests,
+    InternalServerError,
+    BadGateway,
+    ServiceUnavailable,
+    GatewayTimeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+_retry_transient = retry_with_backoff(
+    max_retries=settings.GCS_UPLOAD_MAX_RETRIES,
+    base_delay=settings.GCS_UPLOAD_RETRY_BASE_DELAY_SECONDS,
+    retryable_exceptions=_TRANSIENT_ERRORS,
+)
+
+# One upload semaphore per event loop (in practice: one per process). Kept
+# per loop because asyncio primitives cannot be shared across loops.
+_upload_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _upload_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _upload_slots.get(loop)
+    if semaphore is None:
+        semaphore = _upload_slots[loop] = asyncio.Semaphore(settings.GCS_MAX_CONCURRENT_UPLOADS)
+    return semaphore
+
+
+# Process-wide dedupe counters (exposed on /metrics).
+upload_stats: dict[str, int] = {"created": 0, "deduplicated": 0, "bytes_saved": 0}
+
+
+def content_object_name(prefix: str, content: bytes, extension: str = "") -> str:
+    """`<prefix>/<sha256 of content><extension>` — same bytes, same name."""
+    return f"{prefix}/{hashlib.sha256(content).hexdigest()}{extension}"
+
+
 class StorageBucketService: # Rename from FirestoreService
     def __init__(self):
         self._storage_client = None
@@ -23,6 +108,42 @@ class StorageBucketService: # Rename from FirestoreService
                 self._storage_client = storage.Client(project=project)
         return self._storage_client
 
+    def _url(self, filename: str) -> str:
+        return f"https://storage.googleapis.com/{self._bucket_name}/{filename}"
+
+    @staticmethod
+    def _resumable(size: int | None) -> bool:
+        return size is None or size >= settings.GCS_RESUMABLE_THRESHOLD_BYTES
+
+    def _blob(self, filename: str, resumable: bool = False):
+        blob = self.client.bucket(self._bucket_name).blob(filename)
+        if resumable:
+            # chunk_size makes the session upload in chunks: a dropped
+            # connection resends one chunk, not the whole file.
+            blob.chunk_size = settings.GCS_UPLOAD_CHUNK_SIZE
+        return blob
+
+    @_retry_transient
+    async def _upload_bytes(
+        self, filename: str, file_content: bytes | str, content_type, cache_control=None, **preconditions
+    ):
+        if isinstance(file_content, str):
+            file_content = file_content.encode("utf-8")
+        resumable = self._resumable(len(file_content))
+        blob = self._blob(filename, resumable)
+        blob.cache_control = cache_control
+        async with _upload_semaphore():
+            if resumable:
+                # The client only opens a resumable session for unknown sizes
+                # (or > 8 MiB), so hand it a stream without a size.
+                await asyncio.to_thread(
+                    blob.upload_from_file, io.BytesIO(file_content), content_type=content_type, **preconditions
+                )
+            else:
+                await asyncio.to_thread(
+                    blob.upload_from_string, file_content, content_type=content_type, **preconditions
+                )
+
     async def upload_file(
         self,
         filename: str,
@@ -35,24 +156,160 @@ class StorageBucketService: # Rename from FirestoreService
         URL format: https://storage.googleapis.com/{bucket}/{filename}
         """
         try:
-            bucket = self.client.bucket(self._bucket_name)
-            blob = bucket.blob(filename)
-            blob.upload_from_string(file_content, content_type=content_type)
-            url = f"https://storage.googleapis.com/{self._bucket_name}/{filename}"
+            await self._upload_bytes(filename, file_content, content_type)
+            url = self._url(filename)
             logger.info(f"Uploaded {filename} to {self._bucket_name} → {url}")
             return url
         except Exception as e:
             logger.error(f"Storage upload failed for {filename}: {str(e)}")
             return None
 
+    async def upload_file_if_absent(
+        self,
+        filename: str,
+        file_content: bytes | str,
+        content_type: str | None = None,
+    ) -> tuple[str | None, bool]:
+        """
+        Create-only upload (ifGenerationMatch=0): never overwrites an existing
+        object, so the object is immutable and gets the long-lived
+        Cache-Control header. Returns (url, created) — url is the object's
+        public URL when it exists afterwards (ours or a previous one), None on
+        failure.
+        """
+        url = self._url(filename)
+        try:
+            # Small payloads go straight to the create-only upload: a rejected
+            # multipart request costs about what an existence check would.
+            # Large ones (audio) are worth a metadata round trip first.
+            if not self._resumable(len(file_content)) or not await self.file_exists(filename):
+                await self._upload_bytes(
+                    filename,
+                    file_content,
+                    content_type,
+                    cache_control=settings.GCS_IMMUTABLE_CACHE_CONTROL,
+                    if_generation_match=0,
+                )
+                upload_stats["created"] += 1
+                logger.info(f"Uploaded {filename} to {self._bucket_name} → {url}")
+                return url, True
+        except PreconditionFailed:
+            pass
+        except Exception as e:
+            logger.error(f"Storage upload failed for {filename}: {str(e)}")
+            return None, False
+        upload_stats["deduplicated"] += 1
+        upload_stats["bytes_saved"] += len(file_content)
+        logger.info(f"{filename} already exists in {self._bucket_name}; left untouched")
+        return url, False
+
+    async def upload_content_addressed(
+        self,
+        prefix: str,
+        file_content: bytes,
+        content_type: str | None = None,
+        extension: str = "",
+    ) -> tuple[str, str | None]:
+        """
+        Store `file_content` under its content hash (see content_object_name)
+        unless that object already exists. Returns (filename, url); url is
+        None if the upload failed.
+        """
+        filename = content_object_name(prefix, file_content, extension)
+        url, _ = await self.upload_file_if_absent(filename, file_content, content_type)
+        return filename, url
+
+    async def upload_stream(
+        self,
+        filename: str,
+        source: BinaryIO | Iterable[bytes] | AsyncIterable[bytes],
+        content_type: str | None = None,
+        size: int | None = None,
+    ) -> str | None:
+        """
+        Resumable upload from a readable file object or an iterator of byte
+        chunks (sync or async), without holding the whole payload in memory.
+        Returns the public URL, or None on failure.
+
+        Iterator sources are consumed once, so they are not retried; seekable
+        file objects are rewound and retried like upload_file.
+        """
+        try:
+            if hasattr(source, "read"):
+                await self._upload_fileobj(filename, source, content_type, size)
+            else:
+                async with _upload_semaphore():
+                    await self._upload_chunks(filename, source, content_type)
+            url = self._url(filename)
+            logger.info(f"Streamed {filename} to {self._bucket_name} → {url}")
+            return url
+        except Exception as e:
+            logger.error(f"Storage streaming upload failed for {filename}: {str(e)}")
+            return None
+
+    @_retry_transient
+    async def _upload_fileobj(self, filename: str, file_obj: BinaryIO, content_type, size):
+        resumable = self._resumable(size)
+        blob = self._blob(filename, resumable)
+        async with _upload_semaphore():
+            # rewind=True restarts from the top of the file on every attempt.
+            await asyncio.to_thread(
+                blob.upload_from_file,
+                file_obj,
+                rewind=True,
+                size=None if resumable else size,
+                content_type=content_type,
+            )
+
+    async def _upload_chunks(self, filename: str, chunks, content_type) -> None:
+        blob = self._blob(filename, resumable=True)
+        writer = await asyncio.to_thread(blob.open, "wb", content_type=content_type)
+        try:
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    await asyncio.to_thread(writer.write, chunk)
+            else:
+                for chunk in chunks:
+                    await asyncio.to_thread(writer.write, chunk)
+        except BaseException:
+            # Cancel the resumable session. Merely dropping the writer is not
+            # enough: IOBase.__del__ calls close(), which would finalize the
+            # upload and publish the partial object.
+            logger.warning(f"Abandoned streaming upload of {filename}")
+            try:
+                await asyncio.to_thread(writer.terminate)
+            except Exception as e:
+                logger.warning(f"Could not cancel upload session for {filename}: {e}")
+            raise
+        await asyncio.to_thread(writer.close)
+
+    async def download_file(self, filename: str) -> bytes | None:
+        """Object contents, or None if it does not exist or the read failed."""
+        try:
+            blob = self.client.bucket(self._bucket_name).blob(filename)
+            return await asyncio.to_thread(blob.download_as_bytes)
+        except NotFound:
+            return None
+        except Exception as e:
+            logger.error(f"Storage download failed for {filename}: {str(e)}")
+            return None
+
+    async def file_exists(self, filename: str) -> bool:
+        try:
+            blob = self.client.bucket(self._bucket_name).blob(filename)
+            return await asyncio.to_thread(blob.exists)
+        except Exception as e:
+            logger.error(f"Storage exists check failed for {filename}: {str(e)}")
+            return False
+
     async def delete_file(self, filename: str):
         try:
             logger.info(f"Deleting {filename} from {self._bucket_name}")
             bucket = self.client.bucket(self._bucket_name)
             blob = bucket.blob(filename)
-            blob.delete()
+            await asyncio.to_thread(blob.delete)
             logger.info(f"Deleted {filename} from {self._bucket_name}")
             return True
         except Exception as e:
             logger.error(f"Storage delete failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,199 @@
+"""
+Fleet-wide FLUX request gate.
+
+Together AI enforces its FLUX image cap per API key, not per process. The old
+gate (a module-level asyncio.Lock + last-request timestamp in ai_service) only
+serialised requests inside one process, so two Cloud Run instances or two
+uvicorn workers together overshot the cap and earned the 60 s 429 penalty.
+
+The gate is now a token bucket whose state lives in a pluggable backend:
+
+    InProcessFluxGate  — default; bucket state in this process only
+    LeaseFluxGate      — bucket state in a shared LeaseStore, updated inside
+                         a transaction so every instance draws from the same
+                         bucket:
+                           FirestoreLeaseStore  — one doc per gate
+                           InMemoryLeaseStore   — local stand-in for tests /
+                                                  single-host dev; several
+                                                  gates sharing one store
+                                                  behave like several instances
+
+Both honour `penalize(seconds)`: after a 429, no instance sends FLUX requests
+until the cooldown has passed.
+
+Selected by Settings.FLUX_GATE_BACKEND ("local" | "firestore"); the registry
+builds one gate per process (see AIProviderRegistry.flux_gate).
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from google.cloud import firestore
+
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+
+# =============================================================================
+# Token-bucket arithmetic shared by every backend
+# =============================================================================
+
+def _take_token(state: dict, rate: float, capacity: float, now: float) -> tuple[dict, float]:
+    """
+    Refill `state` to `now` and try to take one token.
+
+    Returns (new_state, wait_seconds). wait_seconds == 0 means the token was
+    taken; otherwise nothing was taken and the caller should retry after
+    waiting that long.
+    """
+    tokens = state.get("tokens", capacity)
+    updated_at = state.get("updated_at", now)
+    blocked_until = state.get("blocked_until", 0.0)
+
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    new_state = {"tokens": tokens, "updated_at": now, "blocked_until": blocked_until}
+
+    if blocked_until > now:
+        return new_state, blocked_until - now
+    if tokens >= 1:
+        new_state["tokens"] = tokens - 1
+        return new_state, 0.0
+    return new_state, (1 - tokens) / rate
+
+
+def _block(state: dict, capacity: float, until: float) -> dict:
+    """Push the cooldown to `until` and drain the bucket, so the restart after
+    it is paced rather than a burst."""
+    return {
+        "tokens": 0.0,
+        "updated_at": max(until, state.get("updated_at", 0.0)),
+        "blocked_until": max(until, state.get("blocked_until", 0.0)),
+    }
+
+
+# =============================================================================
+# In-process gate (default)
+# =============================================================================
+
+class InProcessFluxGate:
+    """Token bucket for one process. rate=1/interval, capacity=1 reproduces
+    the old fixed minimum spacing between requests."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._state: dict = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._state, wait = _take_token(self._state, self.rate, self.capacity, time.time())
+                if wait <= 0:
+                    return
+                logger.debug(f"FLUX gate: waiting {wait:.2f}s to stay under rate cap")
+                await asyncio.sleep(wait)
+
+    async def penalize(self, seconds: float) -> None:
+        self._state = _block(self._state, self.capacity, time.time() + seconds)
+
+
+# =============================================================================
+# Lease (shared-state) gate
+# =============================================================================
+
+class InMemoryLeaseStore:
+    """Local stand-in for a shared lease store. Share one instance between
+    several LeaseFluxGates to simulate several Cloud Run instances."""
+
+    def __init__(self):
+        self._docs: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+
+    async def transact(self, key: str, update: Callable[[dict], tuple[dict, float]]) -> float:
+        async with self._lock:
+            new_state, result = update(dict(self._docs.get(key, {})))
+            self._docs[key] = new_state
+            return result
+
+
+class FirestoreLeaseStore:
+    """Bucket state in a Firestore doc, read-modify-written in a transaction
+    (Firestore retries the transaction on contention)."""
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            project = settings.GOOGLE_CLOUD_PROJECT
+            database = settings.FIRESTORE_DATABASE
+            if settings.GOOGLE_APPLICATION_CREDENTIALS:
+                self._db = firestore.Client.from_service_account_json(
+                    json_credentials_path=settings.GOOGLE_APPLICATION_CREDENTIALS,
+                    project=project,
+                    database=database,
+                )
+            else:
+                self._db = firestore.Client(project=project, database=database)
+        return self._db
+
+    def _transact_sync(self, key: str, update: Callable[[dict], tuple[dict, float]]) -> float:
+        doc_ref = self.db.collection(self.collection_name).document(key)
+
+        @firestore.transactional
+        def _run(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            new_state, result = update((snapshot.to_dict() or {}) if snapshot.exists else {})
+            transaction.set(doc_ref, new_state)
+            return result
+
+        return _run(self.db.transaction())
+
+    async def transact(self, key: str, update: Callable[[dict], tuple[dict, float]]) -> float:
+        return await asyncio.to_thread(self._transact_sync, key, update)
+
+
+class LeaseFluxGate:
+    """Token bucket whose state lives in a LeaseStore shared by every instance."""
+
+    def __init__(self, store, key: str, rate: float, capacity: float = 1):
+        self.store = store
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    async def acquire(self) -> None:
+        while True:
+            wait = await self.store.transact(
+                self.key,
+                lambda state: _take_token(state, self.rate, self.capacity, time.time()),
+            )
+            if wait <= 0:
+                return
+            logger.debug(f"FLUX gate ({self.key}): waiting {wait:.2f}s for a fleet-wide slot")
+            await asyncio.sleep(wait)
+
+    async def penalize(self, seconds: float) -> None:
+        until = time.time() + seconds
+        await self.store.transact(self.key, lambda state: (_block(state, self.capacity, until), 0.0))
+
+
+def build_flux_gate(backend: Optional[str] = None):
+    """Build the gate described by Settings.FLUX_GATE_*."""
+    backend = backend or settings.FLUX_GATE_BACKEND
+    rate = 1 / settings.FLUX_MIN_INTERVAL_SECONDS
+    capacity = settings.FLUX_GATE_BURST
+    if backend == "firestore":
+        store = FirestoreLeaseStore(settings.FLUX_GATE_COLLECTION)
+        logger.info(f"FLUX gate: Firestore lease '{settings.FLUX_GATE_COLLECTION}/flux', {rate:.2f}/s")
+        return LeaseFluxGate(store, "flux", rate, capacity)
+    if backend != "local":
+        logger.warning(f"Unknown FLUX_GATE_BACKEND '{backend}' — using in-process gate")
+    return InProcessFluxGate(rate, capacity)
@@ -0,0 +1,140 @@
+"""
+Latency-based request hedging for Gemini text generation.
+
+Without hedging, generate_content only moves to the fallback model after the
+primary has exhausted its retries, so a primary that is slow (but not failing)
+drags story/activity latency out to tens of seconds.
+
+With LLM_HEDGING_ENABLED, a primary call that is still running after that
+model's observed p95 latency gets a parallel call to the fallback model; the
+first successful answer wins and the other call is cancelled. Hedges cost an
+extra upstream call, so each workflow run (LangGraph thread_id) may only fire
+LLM_HEDGE_MAX_PER_WORKFLOW of them. Calls made outside a workflow run are
+never hedged.
+
+Pieces:
+    - LatencyTracker — rolling window of recent latencies for one model
+    - HedgeBudget    — per-workflow hedge allowance + counters
+    - hedged_call    — the race itself
+    - HedgeFailed    — both racers failed; the fallback has already been tried
+"""
+
+import asyncio
+import math
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# Bound on how many workflow ids HedgeBudget remembers.
+_MAX_TRACKED_WORKFLOWS = 1024
+
+
+class LatencyTracker:
+    """Rolling latency window for one model; percentiles over the last `window` calls."""
+
+    def __init__(self, window: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p in (0, 1]. None until min_samples calls have been observed."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = max(0, math.ceil(p * len(ordered)) - 1)
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgeBudget:
+    """How many hedges each workflow run has fired, capped per run."""
+
+    def __init__(self, max_per_workflow: int):
+        self.max_per_workflow = max_per_workflow
+        self._used: OrderedDict[str, int] = OrderedDict()
+        self.stats: dict[str, int] = {"fired": 0, "fallback_won": 0, "budget_exhausted": 0}
+
+    def try_spend(self, workflow_id: str) -> bool:
+        used = self._used.get(workflow_id, 0)
+        if used >= self.max_per_workflow:
+            self.stats["budget_exhausted"] += 1
+            return False
+        self._used[workflow_id] = used + 1
+        self._used.move_to_end(workflow_id)
+        while len(self._used) > _MAX_TRACKED_WORKFLOWS:
+            self._used.popitem(last=False)
+        self.stats["fired"] += 1
+        return True
+
+    def used(self, workflow_id: str) -> int:
+        return self._used.get(workflow_id, 0)
+
+
+def current_workflow_id() -> Optional[str]:
+    """thread_id of the LangGraph run we are inside, or None outside a run."""
+    try:
+        from langgraph.config import get_config
+        config = get_config()
+    except (ImportError, RuntimeError):
+        return None
+    return (config.get("configurable") or {}).get("thread_id")
+
+
+class HedgeFailed(Exception):
+    """Both the primary and the hedged fallback call failed."""
+
+    def __init__(self, primary_error: BaseException, fallback_error: BaseException):
+        super().__init__(f"primary failed: {primary_error}; hedged fallback failed: {fallback_error}")
+        self.primary_error = primary_error
+        self.fallback_error = fallback_error
+
+
+async def hedged_call(
+    primary: Callable[[], Awaitable[T]],
+    fallback: Callable[[], Awaitable[T]],
+    hedge_after: float,
+    budget: HedgeBudget,
+    workflow_id: str,
+) -> T:
+    """
+    Run `primary`; if it has not finished after `hedge_after` seconds and the
+    workflow still has budget, start `fallback` too and return whichever
+    succeeds first, cancelling the other. Without a hedge the primary's error
+    is raised, so the caller's normal fallback handling still applies; if a
+    hedge was fired and both fail, HedgeFailed is raised so the caller does
+    not call the fallback model again.
+    """
+    primary_task = asyncio.ensure_future(primary())
+    done, _ = await asyncio.wait({primary_task}, timeout=hedge_after)
+    if done or not budget.try_spend(workflow_id):
+        return await primary_task
+
+    logger.info(
+        f"Hedging: primary still running after {hedge_after:.2f}s — firing fallback "
+        f"(workflow {workflow_id}, hedge {budget.used(workflow_id)}/{budget.max_per_workflow})"
+    )
+    fallback_task = asyncio.ensure_future(fallback())
+    pending = {primary_task, fallback_task}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is fallback_task:
+                        budget.stats["fallback_won"] += 1
+                    return task.result()
+        raise HedgeFailed(primary_task.exception(), fallback_task.exception()) from primary_task.exception()
+    finally:
+        for task in (primary_task, fallback_task):
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,181 @@
+"""
+Content-addressed image cache backed by the GCS bucket.
+
+Every FLUX render used to be uploaded under a fresh uuid4() name, so a WF3
+re-trigger via /generate-image/{story_id}, a resumed pipeline, or two stories
+sharing an identical image_generation_prompt each paid FLUX again and stored
+another copy of the same picture.
+
+Renders are now stored under a name derived from what produced them:
+
+    image-cache/<sha256(prompt, model, style)>.webp        (master)
+    image-cache/<sha256(prompt, model, style)>_<size>.webp (thumbnails)
+
+(see image_variants for the WebP post-processing), so "have we drawn this
+before?" is a single GCS lookup that never touches the
+FLUX gate or scheduler. An in-process index remembers keys already seen, so
+repeated lookups in one process cost nothing.
+
+Re-rolls must not get the same picture back: callers pass force_fresh=True
+(WF3 retries after a failed evaluation, or an explicit force_fresh_image in
+state / the API request). A forced render never replaces the cached one — it
+is stored under its own content hash (`<prefix>/<sha256(webp)>.webp`) if the
+cache object already exists. Every object here is create-only, so GCS serves
+it with an immutable Cache-Control header.
+
+Usage:
+    cache = get_image_cache()
+    key = make_image_cache_key(prompt, settings.FLUX_IMAGE_MODEL)
+    filename = await cache.lookup(key)              # None on miss
+    filename = await cache.store(key, image_bytes)  # cache object (or content hash)
+    thumbnails = cache.variant_names(filename)
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Optional
+
+from .database.storage_bucket import StorageBucketService, content_object_name
+from .image_variants import MASTER, WEBP_CONTENT_TYPE, render_variants, variant_names
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IMAGE_CACHE_PREFIX = "image-cache"
+
+
+def make_image_cache_key(prompt: str, model: str, style: str = "") -> str:
+    """Stable key for one render request: prompt + model + style suffix."""
+    payload = json.dumps({"prompt": prompt, "model": model, "style": style}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """GCS-backed prompt-hash → render cache with an in-process index."""
+
+    def __init__(self, storage: Optional[StorageBucketService] = None):
+        self.storage = storage or StorageBucketService()
+        # key -> object name, for keys known to exist in the bucket
+        self._known: dict[str, str] = {}
+        self.stats: dict[str, int] = {
+            "hits": 0, "misses": 0, "writes": 0, "forced": 0,
+            # PNG bytes in vs. WebP bytes (master + thumbnails) uploaded
+            "source_bytes": 0, "uploaded_bytes": 0,
+        }
+
+    @staticmethod
+    def object_name(key: str) -> str:
+        return f"{IMAGE_CACHE_PREFIX}/{key}.webp"
+
+    async def _find(self, key: str) -> Optional[str]:
+        """Object name of the cached render for `key` (not counted in stats)."""
+        filename = self._known.get(key)
+        if filename is None and await self.storage.file_exists(self.object_name(key)):
+            filename = self._known[key] = self.object_name(key)
+        return filename
+
+    def _count(self, filename: Optional[str]) -> None:
+        if filename is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+            logger.info(f"Image cache hit: {filename}")
+
+    async def lookup(self, key: str) -> Optional[str]:
+        """Object name of the cached render for `key`, or None on a miss."""
+        filename = await self._find(key)
+        self._count(filename)
+        return filename
+
+    async def load(self, key: str) -> Optional[tuple[str, bytes]]:
+        """(object name, WebP master bytes) of the cached render, or None on a miss."""
+        filename = await self._find(key)
+        image_bytes = await self.storage.download_file(filename) if filename else None
+        if filename and not image_bytes:
+            # Index was stale (object deleted) — forget it and report a miss.
+            self._known.pop(key, None)
+            filename = None
+        self._count(filename)
+        return (filename, image_bytes) if filename else None
+
+    async def store(
+        self, key: str, image_bytes: bytes, forced: bool = False, fallback_prefix: str = "images"
+    ) -> Optional[str]:
+        """
+        Post-process a PNG render, upload its WebP master + thumbnails, and
+        return the master's object name (None if the upload failed).
+
+        The first render for a key becomes the cache object. If one already
+        exists (a forced re-roll, or a concurrent writer) the existing object
+        is left alone and this render goes under
+        `<fallback_prefix>/<sha256(master)>.webp`.
+        """
+        if forced:
+            self.stats["forced"] += 1
+        variants = await render_variants(image_bytes)
+        self.stats["source_bytes"] += len(image_bytes)
+        master = variants.pop(MASTER)
+
+        filename = self.object_name(key)
+        if not (forced and key in self._known):
+            url, created = await self.storage.upload_file_if_absent(
+                filename, master, content_type=WEBP_CONTENT_TYPE
+            )
+            if url is None:
+                return None
+            self._known[key] = filename
+            if created:
+                self.stats["writes"] += 1
+                self.stats["uploaded_bytes"] += len(master)
+                await self._upload_thumbnails(filename, variants)
+                return filename
+            if not forced:
+                # Same request raced us to the cache; the stored render is equivalent.
+                return filename
+        filename = content_object_name(fallback_prefix, master, ".webp")
+        url, created = await self.storage.upload_file_if_absent(
+            filename, master, content_type=WEBP_CONTENT_TYPE
+        )
+        if not url:
+            return None
+        if created:
+            self.stats["uploaded_bytes"] += len(master)
+        await self._upload_thumbnails(filename, variants)
+        return filename
+
+    async def _upload_thumbnails(self, master_filename: str, thumbnails: dict[str, bytes]) -> None:
+        names = variant_names(master_filename, thumbnails)
+        results = await asyncio.gather(*(
+            self.storage.upload_file_if_absent(names[name], data, content_type=WEBP_CONTENT_TYPE)
+            for name, data in thumbnails.items()
+        ))
+        self.stats["uploaded_bytes"] += sum(
+            len(data) for data, (_, created) in zip(thumbnails.values(), results) if created
+        )
+
+    @staticmethod
+    def variant_names(master_filename: str) -> dict[str, str]:
+        """Thumbnail object names for a master stored by this cache."""
+        return variant_names(master_filename)
+
+    def url_for(self, filename: str) -> str:
+        return f"https://storage.googleapis.com/{self.storage._bucket_name}/{filename}"
+
+
+# Singleton instance for the process
+_image_cache: Optional[ImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+    """Get the singleton ImageCache instance."""
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache()
+    return _image_cache
+
+
+def reset_image_cache() -> None:
+    """Drop the shared cache index. Used by tests."""
+    global _image_cache
+    _image_cache = None
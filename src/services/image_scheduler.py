@@ -0,0 +1,161 @@
+"""
+Priority-aware scheduler in front of the FLUX request gate.
+
+The FLUX gate (see flux_gate) admits one request every few seconds. Before
+this scheduler, every caller queued FIFO on the gate, so a batch of WF5
+activity images for ten stories delayed the next story's WF3 cover — the one
+image a user is actually waiting on — by minutes.
+
+The scheduler decides WHO goes to the gate next; the gate still decides WHEN.
+Only one caller holds a turn at a time, and it holds it just long enough to
+pass the gate, so the gate's own queue never holds more than one waiter.
+
+Order of service:
+    1. priority class: cover > activity > regeneration
+    2. within a class, round-robin across stories, so one story's burst of
+       activity images cannot starve another story's
+    3. within a story, FIFO
+
+Queue-wait time per priority class is exposed via stats() and ends up in
+/metrics under "image_queue".
+
+Usage:
+    async with scheduler.turn(ImagePriority.COVER, story_id):
+        await flux_gate.acquire()
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Optional
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Workflow thread ids are "<story_id>_wf<N>" / "<story_id>_master".
+_THREAD_SUFFIX = re.compile(r"_(wf\d+|master)$")
+
+
+def current_story_key() -> str:
+    """Story the current LangGraph run belongs to, for fair sharing ("" outside a run)."""
+    try:
+        from langgraph.config import get_config
+        configurable = get_config().get("configurable") or {}
+    except (ImportError, RuntimeError):
+        return ""
+    if configurable.get("story_id"):
+        return str(configurable["story_id"])
+    return _THREAD_SUFFIX.sub("", str(configurable.get("thread_id") or ""))
+
+
+class ImagePriority(IntEnum):
+    """Lower value is served first."""
+    COVER = 0          # WF3 story cover — user-visible immediately
+    ACTIVITY = 1       # WF5 activity images (art / moral / science)
+    REGENERATION = 2   # re-rolls after a failed evaluation or manual retry
+
+
+class ImageScheduler:
+    """
+    Priority + per-story round-robin turn queue.
+
+    Waiters are asyncio futures held in one OrderedDict per priority class,
+    mapping story key -> deque of waiters. Serving a story moves it to the end
+    of its class's order, which gives the round-robin.
+    """
+
+    def __init__(self, name: str = "flux_image"):
+        self.name = name
+        self._queues: dict[ImagePriority, OrderedDict[str, deque]] = {
+            priority: OrderedDict() for priority in ImagePriority
+        }
+        self._busy = False
+        self._wait_stats: dict[ImagePriority, dict] = {
+            priority: {"granted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for priority in ImagePriority
+        }
+
+    def queue_depth(self, priority: Optional[ImagePriority] = None) -> int:
+        priorities = [priority] if priority is not None else list(ImagePriority)
+        return sum(
+            sum(1 for waiter in waiters if not waiter.done())
+            for p in priorities
+            for waiters in self._queues[p].values()
+        )
+
+    async def acquire(self, priority: ImagePriority, story_key: str = "") -> None:
+        """Wait for this caller's turn. Must be paired with release()."""
+        started = time.monotonic()
+        if not self._busy and self.queue_depth() == 0:
+            self._busy = True
+            self._record_wait(priority, 0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(story_key, deque()).append(waiter)
+        logger.debug(
+            f"ImageScheduler '{self.name}': queued {priority.name.lower()} for "
+            f"'{story_key}' ({self.queue_depth()} waiting)"
+        )
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Turn was handed to us just as we were cancelled — pass it on.
+                self.release()
+            raise
+        self._record_wait(priority, time.monotonic() - started)
+
+    def release(self) -> None:
+        """End the current turn and hand it to the next waiter, if any."""
+        waiter = self._pop_next()
+        if waiter is None:
+            self._busy = False
+        else:
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def turn(self, priority: ImagePriority, story_key: str = ""):
+        await self.acquire(priority, story_key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _pop_next(self) -> Optional[asyncio.Future]:
+        for priority in ImagePriority:
+            queue = self._queues[priority]
+            while queue:
+                story_key, waiters = next(iter(queue.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(story_key)
+                else:
+                    del queue[story_key]
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _record_wait(self, priority: ImagePriority, waited: float) -> None:
+        stats = self._wait_stats[priority]
+        stats["granted"] += 1
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def stats(self) -> dict:
+        """Per-class queue-wait summary for /metrics."""
+        summary = {}
+        for priority, stats in self._wait_stats.items():
+            granted = stats["granted"]
+            summary[priority.name.lower()] = {
+                "granted": granted,
+                "waiting": self.queue_depth(priority),
+                "avg_wait_seconds": round(stats["total_wait_seconds"] / granted, 3) if granted else 0.0,
+                "max_wait_seconds": round(stats["max_wait_seconds"], 3),
+            }
+        return summary
@@ -0,0 +1,111 @@
+"""
+Image post-processing: WebP master + fixed-size thumbnails.
+
+FLUX renders arrive as full-size PNG (~1-1.5 MB for 1024x1024) and that PNG
+used to be exactly what the app downloaded — for a story card a few hundred
+pixels wide. Every render is now turned into:
+
+    master  — full-size WebP at IMAGE_WEBP_QUALITY (typically 5-10x smaller)
+    <name>  — one WebP thumbnail per Settings.IMAGE_THUMBNAIL_SIZES entry
+              (longest edge in px; aspect ratio kept), e.g. "card", "list"
+
+Decoding, resampling and WebP encoding are CPU-bound, so they run in a small
+process pool (IMAGE_PROCESS_POOL_WORKERS; 0 = a worker thread) instead of on
+the event loop or under the GIL with the rest of the app.
+
+Object names: a master "<base>.webp" has thumbnails "<base>_<name>.webp",
+so any holder of the master name can derive every variant (variant_names).
+"""
+
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Optional
+
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+MASTER = "master"
+WEBP_CONTENT_TYPE = "image/webp"
+
+
+def _webp(image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def encode_variants(image_bytes: bytes, quality: int, sizes: dict[str, int]) -> dict[str, bytes]:
+    """
+    Decode one render and encode the WebP master and thumbnails.
+
+    Module-level (picklable) so it can run in a worker process. Returns
+    {"master": bytes, "<thumbnail name>": bytes, ...}.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+    variants = {MASTER: _webp(image, quality)}
+    for name, edge in sizes.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        variants[name] = _webp(thumbnail, quality)
+    return variants
+
+
+def variant_names(master_filename: str, sizes: Optional[dict[str, int]] = None) -> dict[str, str]:
+    """Thumbnail object names for a master "<base>.webp"."""
+    base = master_filename.rsplit(".", 1)[0]
+    sizes = settings.IMAGE_THUMBNAIL_SIZES if sizes is None else sizes
+    return {name: f"{base}_{name}.webp" for name in sizes}
+
+
+# Process pool shared by every caller, created on first use.
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: forking a process that runs an event loop and
+        # gRPC/HTTP client threads can deadlock the child.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def render_variants(image_bytes: bytes) -> dict[str, bytes]:
+    """Encode the WebP master + thumbnails off the event loop."""
+    job = partial(
+        encode_variants,
+        image_bytes,
+        settings.IMAGE_WEBP_QUALITY,
+        dict(settings.IMAGE_THUMBNAIL_SIZES),
+    )
+    if settings.IMAGE_PROCESS_POOL_WORKERS <= 0:
+        return await asyncio.to_thread(job)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), job)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed). Drop the pool so the next call
+        # builds a fresh one, and finish this image in a thread.
+        logger.warning("Image process pool broke — re-encoding in a thread")
+        shutdown_image_pool()
+        return await asyncio.to_thread(job)
+
+
+def shutdown_image_pool() -> None:
+    """Stop the worker processes (app shutdown / tests)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,294 @@
+"""
+Persistent, content-addressed cache for LLM text responses.
+
+Replaces the per-instance @lru_cache that AIService used to have: that cache
+was keyed on `self`, capped at 100 entries, ignored the generation config and
+died with the process, so every Cloud Run cold start re-paid for identical
+topic/story/activity prompts.
+
+Lookups go through a stack of tiers, fastest first:
+    1. MemoryCacheTier    — in-process LRU (always on)
+    2. SQLiteCacheTier    — local disk, survives restarts of the same instance
+    3. FirestoreCacheTier — optional, shared by every instance in the fleet
+
+A hit in a slower tier is promoted into the faster ones. Writes go to every
+tier. Each tier enforces the TTL; memory and SQLite are size-bounded with
+least-recently-used eviction (Firestore expiry is left to a TTL policy on the
+`expires_at` field).
+
+Cache keys cover everything that changes the output: model, prompt hash,
+serialized generation config and prompt version. Retry paths pass
+bypass=True to skip the read (so a regeneration after a failed evaluation gets
+a fresh sample) while still writing the new result through.
+
+A failing tier never fails a generation — errors are logged and treated as a
+miss.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+from google.cloud import firestore
+
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+
+def make_cache_key(
+    model_name: str,
+    prompt: str,
+    config_fingerprint: str = "",
+    prompt_version: Optional[str] = None,
+) -> str:
+    """Content-addressed key: sha256 over model, prompt hash, config and prompt version."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        [model_name, prompt_hash, config_fingerprint, prompt_version or ""],
+        sort_keys=True,
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# =============================================================================
+# Tiers
+# =============================================================================
+
+class MemoryCacheTier:
+    """In-process LRU with TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (stored_at, value), LRU-ordered
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, model_name: str) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """
+    Local SQLite file. Blocking sqlite3 calls run in a worker thread so the
+    event loop is never held; each call opens its own short-lived connection,
+    which keeps it safe to use from any thread.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialised:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        if not self._initialised:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " model TEXT,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+            conn.commit()
+            self._initialised = True
+        return conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def _set_sync(self, key: str, value: str, model_name: str) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, model, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, model_name, now, now),
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: str, model_name: str) -> None:
+        await asyncio.to_thread(self._set_sync, key, value, model_name)
+
+
+class FirestoreCacheTier:
+    """
+    Fleet-wide tier in a Firestore collection (doc id = cache key). Configure a
+    Firestore TTL policy on `expires_at` to have expired docs purged server-side;
+    reads also ignore expired docs.
+    """
+
+    name = "firestore"
+
+    def __init__(self, collection_name: str, ttl_seconds: float):
+        self.collection_name = collection_name
+        self.ttl_seconds = ttl_seconds
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            project = settings.GOOGLE_CLOUD_PROJECT
+            database = settings.FIRESTORE_DATABASE
+            if settings.GOOGLE_APPLICATION_CREDENTIALS:
+                self._db = firestore.Client.from_service_account_json(
+                    json_credentials_path=settings.GOOGLE_APPLICATION_CREDENTIALS,
+                    project=project,
+                    database=database,
+                )
+            else:
+                self._db = firestore.Client(project=project, database=database)
+        return self._db
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        doc = self.db.collection(self.collection_name).document(key).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        if data.get("expires_at_epoch", 0) < time.time():
+            return None
+        return data.get("value")
+
+    def _set_sync(self, key: str, value: str, model_name: str) -> None:
+        now = time.time()
+        expires = now + self.ttl_seconds
+        self.db.collection(self.collection_name).document(key).set({
+            "value": value,
+            "model": model_name,
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "expires_at": _epoch_to_datetime(expires),
+            "expires_at_epoch": expires,
+        })
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: str, model_name: str) -> None:
+        await asyncio.to_thread(self._set_sync, key, value, model_name)
+
+
+def _epoch_to_datetime(epoch: float):
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+# =============================================================================
+# Layered cache
+# =============================================================================
+
+class LLMResponseCache:
+    """
+    Looks up tiers in order, promotes hits into faster tiers, writes through
+    to all tiers, and counts hits (per tier), misses, bypasses and writes.
+    """
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "bypasses": 0, "writes": 0, "errors": 0}
+        for tier in tiers:
+            self.stats[f"hits_{tier.name}"] = 0
+
+    async def get(self, key: str, bypass: bool = False) -> Optional[str]:
+        if bypass:
+            self.stats["bypasses"] += 1
+            return None
+
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = await tier.get(key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"LLM cache tier '{tier.name}' read failed (treated as miss): {e}")
+                continue
+            if value is None:
+                continue
+            self.stats["hits"] += 1
+            self.stats[f"hits_{tier.name}"] += 1
+            # Promote into the faster tiers we already missed in.
+            for faster in self.tiers[:index]:
+                await self._safe_set(faster, key, value, model_name="")
+            return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, model_name: str) -> None:
+        self.stats["writes"] += 1
+        for tier in self.tiers:
+            await self._safe_set(tier, key, value, model_name)
+
+    async def _safe_set(self, tier, key: str, value: str, model_name: str) -> None:
+        try:
+            await tier.set(key, value, model_name)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"LLM cache tier '{tier.name}' write failed: {e}")
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+
+def build_llm_response_cache() -> LLMResponseCache:
+    """Build the tier stack described by Settings.LLM_CACHE_*."""
+    ttl = settings.LLM_CACHE_TTL_SECONDS
+    tiers: list = [MemoryCacheTier(settings.LLM_CACHE_MEMORY_MAX_ENTRIES, ttl)]
+    if settings.LLM_CACHE_SQLITE_PATH:
+        tiers.append(SQLiteCacheTier(settings.LLM_CACHE_SQLITE_PATH, settings.LLM_CACHE_MAX_ENTRIES, ttl))
+    if settings.LLM_CACHE_FIRESTORE_ENABLED:
+        tiers.append(FirestoreCacheTier(settings.LLM_CACHE_FIRESTORE_COLLECTION, ttl))
+    logger.info(f"LLM response cache tiers: {[t.name for t in tiers]}")
+    return LLMResponseCache(tiers)
@@ -0,0 +1,135 @@
+"""
+Paragraph-level cache of synthesized speech, backed by the GCS bucket.
+
+WF4 used to re-synthesize the whole narration on every loop back to
+generate_audio and on every /generate-audio/{story_id} re-trigger, although
+the paragraphs (and therefore the audio) were byte-identical between
+attempts. Each synthesized paragraph is now cached under
+
+    tts-cache/<sha256(text, language, voice, encoding)>.wav
+
+as the LINEAR16 WAV chunk Google TTS returned, with its duration. Lookups go
+through two tiers:
+    1. an in-process LRU bounded by TTS_CACHE_MEMORY_MAX_BYTES (retries inside
+       one workflow run never leave the process)
+    2. the bucket, shared by every instance (re-triggers, other replicas)
+
+A hit in the bucket is promoted into memory. Objects are create-only, so a
+concurrent writer never clobbers a chunk. A failing tier is treated as a
+miss — the paragraph is simply synthesized again.
+
+Usage:
+    cache = get_tts_cache()
+    key = make_tts_cache_key(paragraph, lang, voice, "LINEAR16")
+    chunk = await cache.get(key)          # (wav_bytes, duration) or None
+    await cache.put(key, wav_bytes)
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional
+
+from .audio_encoding import wav_duration
+from .database.storage_bucket import StorageBucketService
+from ..utils.config import get_settings
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+TTS_CACHE_PREFIX = "tts-cache"
+
+
+def make_tts_cache_key(text: str, language: str, voice: str, encoding: str) -> str:
+    """Stable key for one paragraph synthesis: text + language + voice + encoding."""
+    payload = json.dumps(
+        {"text": text, "language": language, "voice": voice, "encoding": encoding}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Memory LRU + GCS cache of (WAV chunk, duration) per paragraph."""
+
+    def __init__(
+        self,
+        storage: Optional[StorageBucketService] = None,
+        memory_max_bytes: Optional[int] = None,
+    ):
+        self.storage = storage or StorageBucketService()
+        self.memory_max_bytes = (
+            settings.TTS_CACHE_MEMORY_MAX_BYTES if memory_max_bytes is None else memory_max_bytes
+        )
+        # key -> (wav_bytes, duration), LRU-ordered
+        self._memory: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._memory_bytes = 0
+        self.stats: dict[str, int] = {"memory_hits": 0, "storage_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def object_name(key: str) -> str:
+        return f"{TTS_CACHE_PREFIX}/{key}.wav"
+
+    async def get(self, key: str) -> Optional[tuple[bytes, float]]:
+        """(wav_bytes, duration) of the cached paragraph, or None on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return entry
+
+        wav_bytes = await self.storage.download_file(self.object_name(key))
+        if wav_bytes:
+            try:
+                entry = (wav_bytes, wav_duration(wav_bytes))
+            except Exception as e:
+                logger.warning(f"Unreadable TTS cache object {self.object_name(key)}: {e}")
+            else:
+                self._remember(key, entry)
+                self.stats["storage_hits"] += 1
+                return entry
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, wav_bytes: bytes) -> float:
+        """Cache a synthesized paragraph; returns its duration."""
+        entry = (wav_bytes, wav_duration(wav_bytes))
+        self._remember(key, entry)
+        url, created = await self.storage.upload_file_if_absent(
+            self.object_name(key), wav_bytes, content_type="audio/wav"
+        )
+        if created:
+            self.stats["writes"] += 1
+        elif url is None:
+            logger.warning(f"TTS cache write failed for {self.object_name(key)}; kept in memory only")
+        return entry[1]
+
+    def _remember(self, key: str, entry: tuple[bytes, float]) -> None:
+        if len(entry[0]) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = entry
+        self._memory_bytes += len(entry[0])
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+
+# Singleton instance for the process
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Get the singleton TTSCache instance."""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
+
+
+def reset_tts_cache() -> None:
+    """Drop the shared cache. Used by tests."""
+    global _tts_cache
+    _tts_cache = None
@@ -56,6 +56,35 @@ class Settings(BaseSettings):
     # FLUX.1-schnell: 4 inference steps (vs 50 for dev), ~10x cheaper, Apache-2.0
     FLUX_IMAGE_MODEL: str = "black-forest-labs/FLUX.1-schnell"
 
+    # FLUX request gate (see services/flux_gate.py). Together AI caps FLUX at
+    # ~12 RPM per API key; 5s spacing keeps us under it with margin. "local"
+    # paces one process; "firestore" shares the bucket across every instance
+    # so the whole fleet stays under the cap. A 429 pauses the gate for
+    # FLUX_RATE_LIMIT_PENALTY_SECONDS everywhere.
+    FLUX_GATE_BACKEND: str = "local"
+    FLUX_MIN_INTERVAL_SECONDS: float = 5.0
+    FLUX_GATE_BURST: int = 1
+    FLUX_GATE_COLLECTION: str = "rate_limit_leases"
+    FLUX_RATE_LIMIT_PENALTY_SECONDS: float = 60.0
+
+    # Image post-processing (see services/image_variants.py): every render is
+    # stored as a WebP master plus thumbnails (longest edge, px) for the story
+    # card and activity list, encoded in a process pool (0 = a worker thread).
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_THUMBNAIL_SIZES: dict[str, int] = {"card": 512, "list": 160}
+    IMAGE_PROCESS_POOL_WORKERS: int = 2
+
+    # GCS uploads (see services/database/storage_bucket.py): process-wide
+    # concurrency cap, resumable chunked uploads from the threshold up
+    # (chunk size must be a multiple of 256 KiB), retries on 429/5xx.
+    GCS_MAX_CONCURRENT_UPLOADS: int = 8
+    GCS_RESUMABLE_THRESHOLD_BYTES: int = 5 * 1024 * 1024
+    GCS_UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    GCS_UPLOAD_MAX_RETRIES: int = 3
+    GCS_UPLOAD_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    # Content-addressed / create-only media never changes under its name.
+    GCS_IMMUTABLE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+
     # Cost Optimization: Limits
     MAX_RETRIES: int = 3
     RETRY_DELAY_SECONDS: int = 2
@@ -64,6 +93,41 @@ class Settings(BaseSettings):
     RATE_LIMIT_TOKENS_PER_SECOND: float = 3.0
     RATE_LIMIT_BURST_CAPACITY: int = 6
 
+    # Per-model request budgets shared by every agent in the process (one
+    # bucket per upstream model). Models not listed use the two defaults above.
+    # Env format is JSON, e.g. MODEL_RATE_LIMITS='{"gemini-2.5-pro": 0.5}'
+    MODEL_RATE_LIMITS: dict[str, float] = {}
+    MODEL_BURST_CAPACITY: dict[str, int] = {}
+
+    # Gemini quotas are also enforced on tokens per minute. Each call is
+    # charged its estimated input+output tokens against a per-model budget
+    # that backs off multiplicatively on 429/503 and recovers additively
+    # (AIMD), never dropping below TPM_MIN_FRACTION of the configured TPM.
+    MODEL_TOKENS_PER_MINUTE: dict[str, int] = {}
+    DEFAULT_TOKENS_PER_MINUTE: int = 1_000_000
+    TPM_MIN_FRACTION: float = 0.1
+    TPM_DECREASE_FACTOR: float = 0.5
+
+    # LLM text response cache (see services/llm_cache.py). Memory tier is
+    # always on; SQLite survives restarts of one instance (set the path to ""
+    # to disable); Firestore is shared fleet-wide and off by default.
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MEMORY_MAX_ENTRIES: int = 256
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_SQLITE_PATH: str = "/tmp/rio_kutty_llm_cache.sqlite3"
+    LLM_CACHE_FIRESTORE_ENABLED: bool = False
+    LLM_CACHE_FIRESTORE_COLLECTION: str = "llm_response_cache"
+
+    # Opt-in hedging (see services/hedging.py): when a primary Gemini call
+    # outlives that model's observed p-LLM_HEDGE_PERCENTILE latency, race the
+    # fallback model and keep the first answer. Needs LLM_HEDGE_MIN_SAMPLES
+    # observed calls before it kicks in; capped per workflow run.
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_LATENCY_WINDOW: int = 200
+    LLM_HEDGE_MAX_PER_WORKFLOW: int = 3
+
     # Parallel workflow retries before escalating to human-in-the-loop.
     # Was 4; lowered to 2 because the score-filtered retry feedback now makes
     # retries genuinely corrective (vs. blind re-rolls). Two attempts is enough
@@ -77,6 +141,43 @@ class Settings(BaseSettings):
     TTS_LANGUAGE_CODE: str = "en-US"
     TTS_VOICE_NAME: str = "en-US-Standard-A"
     TTS_AUDIO_ENCODING: str = "MP3"
+    # Paragraphs synthesized at once per story; the request rate across all
+    # stories is the "google-tts" entry of MODEL_RATE_LIMITS.
+    TTS_MAX_CONCURRENT_REQUESTS: int = 4
+    # Paragraph TTS cache (see services/tts_cache.py): memory LRU + bucket.
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024
+    # Stored narration format (see services/audio_encoding.py): "wav" keeps
+    # the assembled LINEAR16; "opus" / "mp3" encode it in an ffmpeg worker
+    # process (falls back to WAV if ffmpeg is missing or fails).
+    NARRATION_FORMAT: str = "wav"
+    NARRATION_BITRATE_KBPS: int = 48
+    NARRATION_ENCODE_TIMEOUT_SECONDS: float = 120.0
+    FFMPEG_BINARY: str = "ffmpeg"
+
+    # LangGraph checkpoints in Firestore (see services/database/checkpoint_serde.py):
+    # typed msgpack, compressed with "zstd" (zlib if zstandard is missing),
+    # "zlib" or "none". Payloads under the minimum are stored uncompressed.
+    CHECKPOINT_COMPRESSION: str = "zstd"
+    CHECKPOINT_COMPRESSION_LEVEL: int = 3
+    CHECKPOINT_COMPRESSION_MIN_BYTES: int = 512
+    # Large bytes in checkpoint state (image_bytes, audio_bytes) are stored
+    # out of line (see services/database/checkpoint_blobs.py): "gcs", "local"
+    # (spool directory, dev) or "none" (inline).
+    CHECKPOINT_BLOB_STORE: str = "gcs"
+    CHECKPOINT_BLOB_SPOOL_DIR: str = "/tmp/rio_kutty_checkpoint_blobs"
+    CHECKPOINT_BLOB_THRESHOLD_BYTES: int = 64 * 1024
+    CHECKPOINT_BLOB_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024
+    # Write-behind checkpoints: buffer the newest checkpoint per thread and
+    # write it at most this many seconds later (and always before interrupts,
+    # on errors and at the end of a run). Off = one Firestore write per step.
+    CHECKPOINT_WRITE_BEHIND: bool = False
+    CHECKPOINT_WRITE_BEHIND_MAX_STALENESS_SECONDS: float = 2.0
+    # Retention: keep the newest N checkpoints per thread (0 = all); older
+    # ones are deleted on write. Documents carry expires_at = created + TTL
+    # for a Firestore TTL policy; POST /checkpoints/sweep enforces it too.
+    CHECKPOINT_KEEP_LAST: int = 5
+    CHECKPOINT_TTL_DAYS: int = 7
 
     # Prompt versioning (per agent)
     MCQ_PROMPT_VERSION: str = "latest"
@@ -1,5 +1,6 @@
 """
-Resilience utilities: Circuit Breaker, Retry with Backoff, Rate Limiter.
+Resilience utilities: Circuit Breaker, Retry with Backoff, Rate Limiter
+(fixed and AIMD-adaptive), Single-flight request coalescing.
 
 Usage:
     from src.utils.resilience import circuit_breaker, retry_with_backoff, RateLimiter
@@ -15,7 +16,7 @@ import functools
 import random
 import time
 from enum import Enum
-from typing import Callable, TypeVar, Any, Optional
+from typing import Awaitable, Callable, TypeVar, Any, Optional
 from collections import defaultdict
 
 from .logger import setup_logger
@@ -368,11 +369,167 @@ class RateLimiter:
         return False
 
 
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate is learned with AIMD (additive increase,
+    multiplicative decrease).
+
+    Callers charge an arbitrary cost per call (e.g. estimated LLM tokens), so
+    a large story prompt spends more budget than a small MCQ prompt. Every
+    upstream rate-limit error (429/503) multiplies the rate by
+    `decrease_factor` — at most once per `decrease_cooldown` seconds, so one
+    burst of 429s counts as one signal — and every success adds
+    `increase_step` back, up to `max_rate`.
+
+    Args:
+        max_rate: Ceiling (and starting) rate in cost units per second
+        min_rate: Floor the rate never drops below
+        capacity: Bucket size (burst); defaults to one minute of max_rate
+        increase_step: Units/second added per successful call
+        decrease_factor: Multiplier applied on a rate-limit error
+
+    Example:
+        limiter = AdaptiveRateLimiter(max_rate=250_000 / 60, min_rate=25_000 / 60)
+        await limiter.acquire(estimated_tokens)
+        try:
+            ...
+        except QuotaError:
+            limiter.on_rate_limited()
+            raise
+        limiter.on_success()
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        min_rate: float,
+        capacity: Optional[float] = None,
+        increase_step: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 5.0,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self.capacity = capacity if capacity is not None else max_rate * 60
+        self.increase_step = increase_step if increase_step is not None else max_rate * 0.02
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.tokens = self.capacity
+        self.last_refill = time.time()
+        self._last_decrease = 0.0
+        self._waiting = 0
+        self._lock = asyncio.Lock()
+        self.stats: dict[str, int] = {"acquired": 0, "throttled": 0, "decreases": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting for budget."""
+        return self._waiting
+
+    def _refill(self) -> None:
+        now = time.time()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    async def acquire(self, cost: float = 1) -> bool:
+        """
+        Charge `cost` units, blocking until the bucket can cover it. Costs
+        larger than the bucket are clamped so an oversized call still runs.
+        """
+        cost = min(cost, self.capacity)
+        self._waiting += 1
+        try:
+            async with self._lock:
+                throttled = False
+                while True:
+                    self._refill()
+                    if self.tokens >= cost:
+                        self.tokens -= cost
+                        self.stats["acquired"] += 1
+                        self.stats["throttled"] += int(throttled)
+                        return True
+                    throttled = True
+                    # Re-evaluated after each sleep: the rate may have moved.
+                    await asyncio.sleep((cost - self.tokens) / self.rate)
+        finally:
+            self._waiting -= 1
+
+    def adjust(self, delta: float) -> None:
+        """Correct a charge once the real cost is known (negative refunds)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_rate_limited(self) -> None:
+        now = time.time()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.stats["decreases"] += 1
+        logger.warning(f"AdaptiveRateLimiter: rate-limited upstream, rate cut to {self.rate:.1f}/s")
+
+
 class RateLimitExceeded(Exception):
     """Raised when rate limit is exceeded and not blocking."""
     pass
 
 
+# =============================================================================
+# Single-flight (in-flight request coalescing)
+# =============================================================================
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key (the leader) starts the call as a task; callers
+    arriving while it is in flight await the same task and get the same result
+    or exception. The key is released as soon as the call finishes, so this is
+    not a cache — it only removes duplicate work that overlaps in time.
+
+    The shared task is shielded: if the leader is cancelled, followers still
+    get the result.
+
+    Example:
+        flight = SingleFlight("gemini_text")
+        text = await flight.do(key, lambda: call_gemini(prompt))
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats: dict[str, int] = {"calls": 0, "coalesced": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            logger.debug(f"SingleFlight '{self.name}': joined in-flight call {key[:8]}")
+        else:
+            self.stats["calls"] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+
 # =============================================================================
 # Combined Decorator (Circuit Breaker + Retry + Rate Limit)
 # =============================================================================
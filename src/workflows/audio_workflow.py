@@ -2,25 +2,29 @@
 WF4 — Audio Generator Workflow (compiled subgraph)
 
 Flow:
+    [evaluate_text] → fail → retry_count < MAX? → yes: [evaluate_text]
+          ↓ pass                                 → no:  END (status="needs_human")
     [generate_audio] → [validate_audio] → [evaluate_audio]
                                                ↓
                                  pass → [save_audio] → END (status="completed")
-                                 fail → retry_count < 4?
+                                 fail → retry_count < MAX?
                                            ↓ yes           ↓ no
                                       [generate_audio]   END (status="needs_human")
 
 Single audio file per story in the story's requested language.
 Triggered by master_workflow via asyncio.gather alongside WF3 and WF5.
 
-Evaluation is hard-gated on coverage (every story paragraph must have a
-corresponding TTS timepoint) and duration plausibility (rendered duration must
-fall within a sensible band of the source word count). Soft GEval metrics judge
-TTS-friendliness of the source text (pacing, pronouncability, no inline SFX).
-On eval failure we regenerate the audio — TTS has no useful "self-correction"
-analog and re-rolling is cheap.
+Evaluation is split around synthesis. The soft metrics only judge the source
+text's TTS-friendliness (pacing, pronouncability, no inline SFX), so they run
+first in evaluate_text — a story that fails them never pays for TTS, and a
+passing verdict is cached per story text. After synthesis, evaluate_audio only
+runs the audio-dependent hard gates: coverage (every story paragraph must have
+a corresponding TTS timepoint) and duration plausibility (rendered duration
+must fall within a sensible band of the source word count). On audio eval
+failure we regenerate the audio — TTS has no useful "self-correction" analog
+and unchanged paragraphs come from the TTS cache.
 """
 
-import uuid
 from typing import Literal
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -29,6 +33,7 @@ from langchain_core.runnables import RunnableConfig
 from ..models.state import AudioWorkflowState
 from ..agents.media.audio_generator_agent import AudioGeneratorAgent
 from ..agents.validators.evaluation_agent import EvaluationAgent
+from ..services.audio_encoding import NARRATION_FORMATS
 from ..services.database.firestore_service import FirestoreService
 from ..services.database.storage_bucket import StorageBucketService
 from ..utils.logger import setup_logger
@@ -41,6 +46,7 @@ MAX_RETRIES = settings.PARALLEL_WORKFLOW_MAX_RETRIES
 
 # --- Component instances ---
 audio_agent = AudioGeneratorAgent()
+text_evaluator = EvaluationAgent(workflow_type="audio_text")
 evaluator = EvaluationAgent(workflow_type="audio")
 firestore = FirestoreService()
 storage = StorageBucketService()
@@ -71,6 +77,16 @@ async def check_existing_audio_node(state: AudioWorkflowState, config: RunnableC
     return {}
 
 
+async def evaluate_text_node(state: AudioWorkflowState, config: RunnableConfig) -> dict:
+    """Judge the story text's TTS suitability before any audio is synthesized."""
+    enriched = _unpack_config(state, config)
+    result = await text_evaluator.evaluate(enriched)
+    update = {"text_evaluation": result["evaluation"]}
+    if not result["evaluation"].get("passed"):
+        update["retry_count"] = state.get("retry_count", 0) + 1
+    return update
+
+
 async def generate_audio_node(state: AudioWorkflowState, config: RunnableConfig) -> dict:
     enriched = _unpack_config(state, config)
     result = await audio_agent.generate(enriched)
@@ -82,7 +98,7 @@ async def generate_audio_node(state: AudioWorkflowState, config: RunnableConfig)
 async def validate_audio_node(state: AudioWorkflowState, config: RunnableConfig) -> dict:
     """Structural validation: audio_bytes must be non-empty bytes."""
     audio_bytes = state.get("audio_bytes")
-    if not audio_bytes or not isinstance(audio_bytes, bytes):
+    if not audio_bytes or not isinstance(audio_bytes, (bytes, bytearray)):
         logger.warning("[WF4] Structural validation failed: audio_bytes missing or empty")
         return {"validated": False}
     logger.info(f"[WF4] Structural validation passed: {len(audio_bytes)} bytes")
@@ -90,7 +106,8 @@ async def validate_audio_node(state: AudioWorkflowState, config: RunnableConfig)
 
 
 async def evaluate_audio_node(state: AudioWorkflowState, config: RunnableConfig) -> dict:
-    """Evaluate the story text suitability for audio (not the audio bytes themselves)."""
+    """Audio-dependent checks (coverage, duration, integrity) on the synthesized
+    narration; the text verdict is carried over from evaluate_text."""
     enriched = _unpack_config(state, config)
     return await evaluator.evaluate(enriched)
 
@@ -104,9 +121,12 @@ async def save_audio_node(state: AudioWorkflowState, config: RunnableConfig) ->
     language = state.get("language", settings.TTS_LANGUAGE_CODE)
     voice = state.get("voice", settings.TTS_VOICE_NAME)
 
-    # Always WAV — paragraphs are combined as WAV regardless of TTS_AUDIO_ENCODING
-    filename = f"story-audio/{uuid.uuid4()}.wav"
-    audio_url = await storage.upload_file(filename, audio_bytes, content_type="audio/wav")
+    # WAV unless NARRATION_FORMAT encoded it (TTS_AUDIO_ENCODING is not used here).
+    # Named by content hash: a re-run that renders identical audio reuses the object.
+    content_type, extension = NARRATION_FORMATS[state.get("audio_format") or "wav"]
+    _, audio_url = await storage.upload_content_addressed(
+        "story-audio", audio_bytes, content_type=content_type, extension=extension
+    )
 
     if not audio_url:
         logger.error(f"[WF4] GCS upload failed for story_id={story_id}")
@@ -135,11 +155,23 @@ async def save_audio_node(state: AudioWorkflowState, config: RunnableConfig) ->
 
 # --- Routing ---
 
-def route_after_check_existing(state: AudioWorkflowState) -> Literal["generate_audio", "__end__"]:
+def route_after_check_existing(state: AudioWorkflowState) -> Literal["evaluate_text", "__end__"]:
     """If the entry gate marked us complete, skip straight to END."""
     if state.get("status") == "completed":
         return END
-    return "generate_audio"
+    return "evaluate_text"
+
+
+def route_after_evaluate_text(
+    state: AudioWorkflowState,
+) -> Literal["generate_audio", "evaluate_text", "__end__"]:
+    """TTS only runs on text that passed; a failed verdict is re-judged (it is
+    not cached) until the retry budget runs out."""
+    if (state.get("text_evaluation") or {}).get("passed"):
+        return "generate_audio"
+    if state.get("retry_count", 0) >= MAX_RETRIES:
+        return END
+    return "evaluate_text"
 
 
 def route_after_validate(state: AudioWorkflowState) -> Literal["evaluate_audio", "generate_audio", "__end__"]:
@@ -177,6 +209,7 @@ async def mark_needs_human_node(state: AudioWorkflowState, config: RunnableConfi
 workflow = StateGraph(AudioWorkflowState)
 
 workflow.add_node("check_existing_audio", check_existing_audio_node)
+workflow.add_node("evaluate_text", evaluate_text_node)
 workflow.add_node("generate_audio", generate_audio_node)
 workflow.add_node("validate_audio", validate_audio_node)
 workflow.add_node("evaluate_audio", evaluate_audio_node)
@@ -187,7 +220,16 @@ workflow.set_entry_point("check_existing_audio")
 workflow.add_conditional_edges(
     "check_existing_audio",
     route_after_check_existing,
-    {"generate_audio": "generate_audio", END: END},
+    {"evaluate_text": "evaluate_text", END: END},
+)
+workflow.add_conditional_edges(
+    "evaluate_text",
+    route_after_evaluate_text,
+    {
+        "generate_audio": "generate_audio",
+        "evaluate_text": "evaluate_text",
+        END: "mark_needs_human",
+    },
 )
 workflow.add_edge("generate_audio", "validate_audio")
 workflow.add_conditional_edges(
@@ -23,7 +23,6 @@ Why this is a compiled subgraph:
 Triggered by master_workflow via asyncio.gather alongside WF4 and WF5.
 """
 
-import uuid
 from typing import Literal
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -33,7 +32,7 @@ from ..models.state import ImageWorkflowState
 from ..agents.media.image_generator_agent import ImageGeneratorAgent
 from ..agents.validators.evaluation_agent import EvaluationAgent
 from ..services.database.firestore_service import FirestoreService
-from ..services.database.storage_bucket import StorageBucketService
+from ..services.image_cache import get_image_cache, make_image_cache_key
 from ..utils.logger import setup_logger
 from ..utils.config import get_settings
 
@@ -46,7 +45,6 @@ MAX_RETRIES = settings.PARALLEL_WORKFLOW_MAX_RETRIES
 image_agent = ImageGeneratorAgent()
 evaluator = EvaluationAgent(workflow_type="image")
 firestore = FirestoreService()
-storage = StorageBucketService()
 
 
 def _unpack_config(state: ImageWorkflowState, config: RunnableConfig) -> dict:
@@ -82,7 +80,8 @@ async def generate_image_node(state: ImageWorkflowState, config: RunnableConfig)
 
 
 async def validate_image_node(state: ImageWorkflowState, config: RunnableConfig) -> dict:
-    """Structural validation: image_bytes must be non-empty bytes."""
+    """Structural validation: image_bytes must be non-empty bytes (PNG or,
+    on an image cache hit, the WebP master — see image_format)."""
     image_bytes = state.get("image_bytes")
     if not image_bytes or not isinstance(image_bytes, bytes):
         logger.warning("[WF3] Structural validation failed: image_bytes missing or empty")
@@ -103,8 +102,23 @@ async def save_image_node(state: ImageWorkflowState, config: RunnableConfig) ->
     image_bytes = state.get("image_bytes")
     image_prompt = state.get("image_prompt", "")
 
-    filename = f"story-images/{uuid.uuid4()}.png"
-    image_url = await storage.upload_file(filename, image_bytes, content_type="image/png")
+    # Content-addressed upload: a render reused from the image cache is
+    # already in GCS; a new render becomes the cache entry for its prompt
+    # (a forced re-roll goes under story-images/<sha256> if one already exists).
+    # Only renders that passed evaluation are ever written to the cache, so
+    # store() only ever sees fresh PNG renders; cached WebP bytes are not re-encoded.
+    cache = get_image_cache()
+    cache_info = state.get("image_cache") or {}
+    filename = cache_info.get("object")
+    if not filename and image_bytes:
+        key = cache_info.get("key") or make_image_cache_key(image_prompt, settings.FLUX_IMAGE_MODEL)
+        filename = await cache.store(
+            key, image_bytes, forced=bool(cache_info.get("forced")), fallback_prefix="story-images"
+        )
+    image_url = cache.url_for(filename) if filename else None
+    image_variants = {
+        name: cache.url_for(thumbnail) for name, thumbnail in cache.variant_names(filename).items()
+    } if filename else {}
 
     if not image_url:
         logger.error(f"[WF3] GCS upload failed for story_id={story_id}")
@@ -114,7 +128,7 @@ async def save_image_node(state: ImageWorkflowState, config: RunnableConfig) ->
         }
 
     try:
-        await firestore.save_story_image(story_id, image_url, image_prompt, theme)
+        await firestore.save_story_image(story_id, image_url, image_prompt, theme, image_variants)
         logger.info(f"[WF3] Image saved: {image_url}")
         return {
             "image_url":   image_url,
@@ -33,6 +33,7 @@ from ..models.state import StoryCreatorState
 from ..agents.story.story_creator_agent import StoryCreatorAgent
 from ..agents.story.self_correction_agent import SelfCorrectionAgent
 from ..agents.validators.evaluation_agent import EvaluationAgent
+from ..agents.validators.validator_agent import record_validation
 from ..services.database.firestore_service import FirestoreService
 from ..services.database.checkpoint_service import FirestoreCheckpointer
 from ..utils.logger import setup_logger
@@ -79,18 +80,22 @@ async def validate_story_node(state: StoryCreatorState, config: RunnableConfig)
 
     if not story or not isinstance(story, dict):
         logger.warning("[WF2] Structural validation failed: story is missing or not a dict")
+        record_validation("story", passed=False)
         return {"validated": False, "correction_attempts": attempts + 1}
 
     if not required.issubset(story.keys()):
         missing = required - story.keys()
         logger.warning(f"[WF2] Structural validation failed: missing fields {missing}")
+        record_validation("story", passed=False)
         return {"validated": False, "correction_attempts": attempts + 1}
 
     if not story.get("story_text", "").strip():
         logger.warning("[WF2] Structural validation failed: story_text is empty")
+        record_validation("story", passed=False)
         return {"validated": False, "correction_attempts": attempts + 1}
 
     logger.info(f"[WF2] Structural validation passed: '{story.get('title')}'")
+    record_validation("story", passed=True)
     return {"validated": True}
 
 
@@ -36,6 +36,7 @@ from ..models.state import StoryTopicsState
 from ..agents.story.topics_creator_agent import TopicsCreatorAgent
 from ..agents.story.self_correction_agent import SelfCorrectionAgent
 from ..agents.validators.evaluation_agent import EvaluationAgent
+from ..agents.validators.validator_agent import record_validation
 from ..services.database.firestore_service import FirestoreService
 from ..utils.logger import setup_logger
 from ..utils.config import get_settings
@@ -92,13 +93,16 @@ async def validate_topics_node(state: StoryTopicsState, config: RunnableConfig)
 
     if not topics or not isinstance(topics, list) or len(topics) == 0:
         logger.warning("[WF1] Structural validation failed: empty or missing topics list")
+        record_validation("topics", passed=False)
         return {"validated": False, "correction_attempts": state.get("correction_attempts", 0) + 1}
 
     if not all(required.issubset(t.keys()) for t in topics):
         logger.warning("[WF1] Structural validation failed: missing required fields in topics")
+        record_validation("topics", passed=False)
         return {"validated": False, "correction_attempts": state.get("correction_attempts", 0) + 1}
 
     logger.info(f"[WF1] Structural validation passed: {len(topics)} topics")
+    record_validation("topics", passed=True)
     return {"validated": True}
 
 
@@ -57,6 +57,12 @@ def mock_ai_service():
             return json.dumps({"response": "test"})
         
         instance.generate_content = AsyncMock(side_effect=mock_generate_content)
+
+        # Schema-constrained calls return the parsed object
+        async def mock_generate_structured(prompt, response_schema=None, **kwargs):
+            return json.loads(await mock_generate_content(prompt))
+
+        instance.generate_structured = AsyncMock(side_effect=mock_generate_structured)
         
         # Mock generate_image to return fake image bytes
         instance.generate_image = AsyncMock(return_value=b"fake_image_bytes")
@@ -70,6 +76,7 @@ def mock_ai_service_failure():
     with patch("src.services.ai_service.AIService") as MockAIService:
         instance = MockAIService.return_value
         instance.generate_content = AsyncMock(side_effect=Exception("API Error"))
+        instance.generate_structured = AsyncMock(side_effect=Exception("API Error"))
         instance.generate_image = AsyncMock(side_effect=Exception("Image API Error"))
         yield instance
 
@@ -193,6 +200,200 @@ def reset_circuit_breakers():
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_ai_providers(tmp_path, monkeypatch):
+    """Fresh process-wide AI clients, rate limiters and response cache per test
+    (each pytest-asyncio test runs on its own event loop). The SQLite cache
+    tier points at a per-test file so no test reads another's responses."""
+    from src.services import llm_cache
+    from src.services.ai_providers import reset_provider_registry
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_SQLITE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_FIRESTORE_ENABLED", False)
+    reset_provider_registry()
+    yield
+
+
+def make_png(width: int = 64, height: int = 48, color=(200, 80, 40)) -> bytes:
+    """A real PNG render for tests that go through WebP post-processing."""
+    import io
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def sample_png():
+    return make_png()
+
+
+class InMemoryBucket:
+    """StorageBucketService stand-in that keeps objects in a dict."""
+
+    _bucket_name = "test-bucket"
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: list[str] = []
+
+    async def upload_file(self, filename, file_content, content_type=None):
+        self.objects[filename] = file_content
+        self.uploads.append(filename)
+        return f"https://storage.googleapis.com/{self._bucket_name}/{filename}"
+
+    async def upload_file_if_absent(self, filename, file_content, content_type=None):
+        url = f"https://storage.googleapis.com/{self._bucket_name}/{filename}"
+        if filename in self.objects:
+            return url, False
+        await self.upload_file(filename, file_content, content_type)
+        return url, True
+
+    async def download_file(self, filename):
+        return self.objects.get(filename)
+
+    async def file_exists(self, filename):
+        return filename in self.objects
+
+
+@pytest.fixture(autouse=True)
+def image_cache(monkeypatch):
+    """Per-test image cache over an in-memory bucket, so nothing reaches GCS.
+    WebP variants are encoded in a thread rather than a worker process."""
+    from src.services import image_cache as image_cache_module
+    from src.services import image_variants
+    monkeypatch.setattr(image_variants.settings, "IMAGE_PROCESS_POOL_WORKERS", 0)
+    cache = image_cache_module.ImageCache(storage=InMemoryBucket())
+    monkeypatch.setattr(image_cache_module, "_image_cache", cache)
+    yield cache
+
+
+@pytest.fixture(autouse=True)
+def tts_cache(monkeypatch):
+    """Per-test paragraph TTS cache over an in-memory bucket."""
+    from src.services import tts_cache as tts_cache_module
+    cache = tts_cache_module.TTSCache(storage=InMemoryBucket())
+    monkeypatch.setattr(tts_cache_module, "_tts_cache", cache)
+    yield cache
+
+
+class _FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class _FakeDocument:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    async def get(self):
+        return _FakeSnapshot(self, self._collection.docs.get(self.id))
+
+    async def set(self, data):
+        self._collection.db.writes += 1
+        self._collection.docs[self.id] = dict(data)
+
+    async def delete(self):
+        self._collection.db.writes += 1
+        self._collection.docs.pop(self.id, None)
+
+
+class _FakeQuery:
+    _OPS = {
+        "==": lambda a, b: a == b,
+        "<": lambda a, b: a is not None and a < b,
+        ">": lambda a, b: a is not None and a > b,
+        "in": lambda a, b: a in b,
+    }
+
+    def __init__(self, collection, filters=(), order=None, limit=None):
+        self._collection = collection
+        self._filters = list(filters)
+        self._order = order
+        self._limit = limit
+
+    def where(self, *, filter):
+        check = self._OPS[filter.op_string]
+        return _FakeQuery(
+            self._collection,
+            self._filters + [lambda d: check(d.get(filter.field_path), filter.value)],
+            self._order, self._limit,
+        )
+
+    def order_by(self, field, direction="ASCENDING"):
+        return _FakeQuery(self._collection, self._filters, (field, direction == "DESCENDING"), self._limit)
+
+    def limit(self, n):
+        return _FakeQuery(self._collection, self._filters, self._order, n)
+
+    async def get(self):
+        self._collection.db.queries += 1
+        matches = [
+            (doc_id, data) for doc_id, data in self._collection.docs.items()
+            if all(f(data) for f in self._filters)
+        ]
+        if self._order:
+            field, descending = self._order
+            matches.sort(key=lambda item: item[1].get(field), reverse=descending)
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        return [_FakeSnapshot(self._collection.document(doc_id), data) for doc_id, data in matches]
+
+
+class _FakeCollection(_FakeQuery):
+    def __init__(self, db, name):
+        self.db = db
+        self.docs: dict[str, dict] = {}
+        super().__init__(self)
+
+    def document(self, doc_id):
+        return _FakeDocument(self, doc_id)
+
+
+class _FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, reference, data):
+        self._ops.append(lambda: reference._collection.docs.__setitem__(reference.id, dict(data)))
+
+    def delete(self, reference):
+        self._ops.append(lambda: reference._collection.docs.pop(reference.id, None))
+
+    async def commit(self):
+        if len(self._ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._db.batch_sizes.append(len(self._ops))
+        self._db.writes += len(self._ops)
+        for op in self._ops:
+            op()
+
+
+class InMemoryFirestore:
+    """firestore.AsyncClient stand-in: collections of dicts, filters, ordering, batches."""
+
+    def __init__(self):
+        self.collections: dict[str, _FakeCollection] = {}
+        self.writes = 0
+        self.queries = 0
+        self.batch_sizes: list[int] = []
+
+    def collection(self, name):
+        if name not in self.collections:
+            self.collections[name] = _FakeCollection(self, name)
+        return self.collections[name]
+
+    def batch(self):
+        return _FakeBatch(self)
+
+
 def pytest_configure(config):
     """Configure pytest markers."""
     config.addinivalue_line("markers", "slow: marks tests as slow")
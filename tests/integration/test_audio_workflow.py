@@ -0,0 +1,110 @@
+"""
+Integration tests for WF4: the story text is judged before any TTS is paid for,
+and only the audio-dependent checks run after synthesis.
+"""
+
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+import src.workflows.audio_workflow as wf4
+from src.agents.validators import evaluation_agent
+
+STORY_TEXT = (
+    "Mira found a small red kite in the garden. She ran to show her brother.\n\n"
+    "They flew the kite high over the hill. The wind sang softly all afternoon."
+)
+
+GOOD_TIMEPOINTS = [
+    {"ParagraphNumber": 1, "StartTimestamp": 0.0, "EndTimestamp": 5.0, "Duration": 5.0},
+    {"ParagraphNumber": 2, "StartTimestamp": 5.0, "EndTimestamp": 10.0, "Duration": 5.0},
+]
+
+
+@pytest.fixture
+def geval():
+    """GEval stand-in returning a configurable score; counts judge calls."""
+    evaluation_agent._AUDIO_TEXT_EVAL_CACHE.clear()
+    judge = AsyncMock(side_effect=lambda name, **kwargs: (name, judge.score, judge.reason))
+    judge.score = 0.9
+    judge.reason = "ok"
+    with patch.object(evaluation_agent, "_run_geval_with_retry", judge):
+        yield judge
+    evaluation_agent._AUDIO_TEXT_EVAL_CACHE.clear()
+
+
+@pytest.fixture
+def services():
+    tts = AsyncMock(return_value={"audio_bytes": b"\0" * 4096, "audio_timepoints": GOOD_TIMEPOINTS})
+    storage = AsyncMock()
+    storage.upload_content_addressed = AsyncMock(return_value=("story-audio/x.wav", "https://gcs/x.wav"))
+    firestore = AsyncMock()
+    with patch.object(wf4.audio_agent, "generate", tts), \
+         patch.object(wf4, "storage", storage), \
+         patch.object(wf4, "firestore", firestore):
+        yield {"tts": tts, "storage": storage, "firestore": firestore}
+
+
+async def _run(story_text: str = STORY_TEXT) -> dict:
+    config = {"configurable": {"thread_id": str(uuid.uuid4()), "story_id": "story-1"}}
+    return await wf4.audio_workflow.ainvoke(
+        {"story_text": story_text, "retry_count": 0, "completed": [], "errors": {}}, config=config
+    )
+
+
+class TestAudioWorkflowOrdering:
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_failing_text_never_reaches_tts(self, geval, services):
+        geval.score = 0.1
+
+        result = await _run("# Chapter 1\n\n*Whoosh!* [thunder] The _kite_ flew away. 🌧️")
+
+        services["tts"].assert_not_awaited()
+        assert result["status"] == "needs_human"
+        assert result["text_evaluation"]["passed"] is False
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_passing_text_is_synthesized_and_saved(self, geval, services):
+        result = await _run()
+
+        services["tts"].assert_awaited_once()
+        services["storage"].upload_content_addressed.assert_awaited_once()
+        assert result["status"] == "completed"
+        assert result["evaluation"]["metrics"]["vocabulary_pronouncability"] == 0.9
+        assert result["evaluation"]["metrics"]["paragraph_coverage"] == 1.0
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_audio_retry_does_not_rejudge_text(self, geval, services):
+        truncated = {"audio_bytes": b"\0" * 4096, "audio_timepoints": GOOD_TIMEPOINTS[:1]}
+        good = {"audio_bytes": b"\0" * 4096, "audio_timepoints": GOOD_TIMEPOINTS}
+        services["tts"].side_effect = [truncated, good]
+
+        result = await _run()
+
+        assert services["tts"].await_count == 2
+        assert geval.await_count == len(evaluation_agent._AUDIO_CRITERIA)
+        assert result["status"] == "completed"
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_text_verdict_is_cached_per_story_text(self, geval, services):
+        await _run()
+        await _run()
+        assert geval.await_count == len(evaluation_agent._AUDIO_CRITERIA)
+
+        await _run(STORY_TEXT + "\n\nThe end.")
+        assert geval.await_count == 2 * len(evaluation_agent._AUDIO_CRITERIA)
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_pass_from_skipped_metrics_is_not_cached(self, geval, services):
+        geval.score, geval.reason = 1.0, "skipped-after-retries: 503 UNAVAILABLE"
+
+        await _run()
+        await _run()
+
+        assert geval.await_count == 2 * len(evaluation_agent._AUDIO_CRITERIA)
@@ -0,0 +1,156 @@
+"""
+Crash-injection tests for FirestoreCheckpointer recovery: a pod dying in the
+middle of WF5's parallel fan-out must only re-run the branches that had not
+finished when it died.
+"""
+
+import asyncio
+import operator
+from collections import Counter
+from typing import Annotated, Dict, List, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.models.state import merge_dicts
+from src.services.database.checkpoint_blobs import CheckpointBlobs, LocalBlobStore
+from src.services.database.checkpoint_service import FirestoreCheckpointer
+from tests.conftest import InMemoryFirestore
+
+BRANCHES = ("mcq", "art", "moral", "science")
+IMAGE_BRANCHES = ("art", "moral", "science")
+
+
+class PodKilled(Exception):
+    """Stands in for the process dying mid-superstep."""
+
+
+class _State(TypedDict):
+    activities: Annotated[Dict[str, str], merge_dicts]
+    images: Annotated[Dict[str, str], merge_dicts]
+    completed: Annotated[List[str], operator.add]
+
+
+class _Pipeline:
+    """WF5-shaped graph: start → 4 × (gen → eval → [img] → save) → done."""
+
+    def __init__(self, crash_branch: str | None = None):
+        self.calls: Counter[str] = Counter()
+        self.crash_branch = crash_branch
+        self._siblings_rendered = asyncio.Event()
+
+    def _gen(self, key):
+        async def node(state):
+            self.calls[f"gen_{key}"] += 1
+            return {"activities": {key: f"{key} activity"}}
+        return node
+
+    def _eval(self, key):
+        async def node(state):
+            self.calls[f"eval_{key}"] += 1  # GEval pass
+            return {"completed": [f"eval_{key}"]}
+        return node
+
+    def _img(self, key):
+        async def node(state):
+            self.calls[f"img_{key}"] += 1  # paid FLUX render
+            if sum(self.calls[f"img_{k}"] for k in IMAGE_BRANCHES) >= len(IMAGE_BRANCHES):
+                self._siblings_rendered.set()
+            if key == self.crash_branch:
+                self.crash_branch = None
+                await self._siblings_rendered.wait()
+                await asyncio.sleep(0.05)  # let the siblings' writes land
+                raise PodKilled(key)
+            return {"images": {key: f"https://gcs/{key}.webp"}}
+        return node
+
+    def _save(self, key):
+        async def node(state):
+            self.calls[f"save_{key}"] += 1
+            return {"completed": [f"save_{key}"]}
+        return node
+
+    def compile(self, checkpointer):
+        graph = StateGraph(_State)
+        graph.add_node("start", lambda state: {})
+        graph.add_node("done", lambda state: {"completed": ["done"]})
+        graph.set_entry_point("start")
+        for key in BRANCHES:
+            graph.add_node(f"gen_{key}", self._gen(key))
+            graph.add_node(f"eval_{key}", self._eval(key))
+            graph.add_node(f"save_{key}", self._save(key))
+            graph.add_edge("start", f"gen_{key}")
+            graph.add_edge(f"gen_{key}", f"eval_{key}")
+            if key in IMAGE_BRANCHES:
+                graph.add_node(f"img_{key}", self._img(key))
+                graph.add_edge(f"eval_{key}", f"img_{key}")
+                graph.add_edge(f"img_{key}", f"save_{key}")
+            else:
+                graph.add_edge(f"eval_{key}", f"save_{key}")
+        graph.add_edge([f"save_{key}" for key in BRANCHES], "done")
+        graph.add_edge("done", END)
+        return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return InMemoryFirestore(), LocalBlobStore(str(tmp_path / "spool"))
+
+
+def _checkpointer(stores) -> FirestoreCheckpointer:
+    """A checkpointer as a freshly started pod would build it."""
+    db, blob_store = stores
+    checkpointer = FirestoreCheckpointer(blobs=CheckpointBlobs(blob_store))
+    checkpointer._client = db
+    return checkpointer
+
+
+async def _crash_then_resume(stores) -> Counter:
+    config = {"configurable": {"thread_id": "story-1_wf5"}}
+    pipeline = _Pipeline(crash_branch="science")
+
+    with pytest.raises(PodKilled):
+        await pipeline.compile(_checkpointer(stores)).ainvoke(
+            {"activities": {}, "images": {}, "completed": []}, config=config
+        )
+
+    result = await pipeline.compile(_checkpointer(stores)).ainvoke(None, config=config)
+    assert set(result["images"]) == set(IMAGE_BRANCHES)
+    assert "done" in result["completed"]
+    return pipeline.calls
+
+
+class TestCrashRecovery:
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_resume_only_reruns_unfinished_branches(self, stores):
+        calls = await _crash_then_resume(stores)
+
+        assert calls["img_science"] == 2
+        assert calls["img_art"] == calls["img_moral"] == 1
+        assert all(calls[f"eval_{key}"] == 1 for key in BRANCHES)
+        assert all(calls[f"save_{key}"] == 1 for key in BRANCHES)
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_without_persisted_writes_the_whole_superstep_reruns(self, stores, monkeypatch):
+        async def _drop_writes(self, config, writes, task_id, task_path=""):
+            return None
+
+        monkeypatch.setattr(FirestoreCheckpointer, "aput_writes", _drop_writes)
+
+        calls = await _crash_then_resume(stores)
+
+        assert calls["img_art"] == calls["img_moral"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_thread_deletion_removes_pending_writes(self, stores):
+        await _crash_then_resume(stores)
+        db, _ = stores
+        assert db.collection("workflow_checkpoint_writes").docs
+
+        await _checkpointer(stores).adelete_thread("story-1_wf5")
+
+        assert not db.collection("workflow_checkpoint_writes").docs
+        assert not db.collection("workflow_checkpoints").docs
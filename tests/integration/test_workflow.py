@@ -32,9 +32,9 @@ class TestActivityWorkflow:
             # Configure AI mocks
             for mock_ai in [MockAI1, MockAI2, MockAI3, MockAI4]:
                 instance = mock_ai.return_value
-                instance.generate_content = AsyncMock(return_value=json.dumps([
+                instance.generate_structured = AsyncMock(return_value=[
                     {"question": "Test?", "options": ["A", "B"], "correct": "A"}
-                ]))
+                ])
                 instance.generate_image = AsyncMock(return_value=b"image_bytes")
 
             yield {
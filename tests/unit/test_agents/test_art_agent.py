@@ -3,22 +3,22 @@ Unit tests for Art Agent.
 """
 
 import pytest
-import json
 from unittest.mock import AsyncMock, patch
 
 from src.agents.activities.art_agent import ArtAgent
+from src.services.image_scheduler import ImagePriority
 
 
 class TestArtAgent:
     """Tests for ArtAgent class."""
     
     @pytest.fixture
-    def agent(self):
+    def agent(self, sample_png):
         """Create ArtAgent instance with mocked AI service."""
         with patch("src.agents.activities.art_agent.AIService") as MockAI:
             instance = MockAI.return_value
-            instance.generate_content = AsyncMock()
-            instance.generate_image = AsyncMock(return_value=b"fake_image")
+            instance.generate_structured = AsyncMock()
+            instance.generate_image = AsyncMock(return_value=sample_png)
             agent = ArtAgent()
             agent.ai_service = instance
             yield agent
@@ -38,14 +38,14 @@ class TestArtAgent:
     async def test_generate_returns_art_activity_without_image(self, agent, sample_state):
         """generate() returns activity JSON only — image is deferred to generate_image()
         so we don't burn FLUX credits on activities that fail eval."""
-        mock_response = json.dumps({
+        mock_response = {
             "title": "Butterfly Craft",
             "age_appropriateness": "Great for 6-year-olds",
             "materials": ["paper", "paint"],
             "steps": ["Fold paper", "Paint wings", "Add antennae"],
             "image_generation_prompt": "A colorful butterfly craft"
-        })
-        agent.ai_service.generate_content.return_value = mock_response
+        }
+        agent.ai_service.generate_structured.return_value = mock_response
 
         result = await agent.generate(sample_state)
 
@@ -58,10 +58,9 @@ class TestArtAgent:
         assert "art" in result["completed"]
 
     @pytest.mark.asyncio
-    async def test_generate_image_attaches_uploaded_filename(self, agent, sample_state):
+    async def test_generate_image_attaches_uploaded_filename(self, agent, sample_state, image_cache):
         """generate_image() uploads the PNG and stores the GCS filename on the
         activity. Called only after the eval pass succeeds."""
-        agent.storage.upload_file = AsyncMock()
         state_with_activity = {
             **sample_state,
             "activities": {
@@ -74,15 +73,47 @@ class TestArtAgent:
 
         result = await agent.generate_image(state_with_activity)
 
-        agent.ai_service.generate_image.assert_called_once_with("A colorful butterfly craft")
-        agent.storage.upload_file.assert_called_once()
-        assert result["activities"]["art"]["image"].startswith("images/")
-        assert result["activities"]["art"]["image"].endswith(".png")
+        agent.ai_service.generate_image.assert_called_once_with(
+            "A colorful butterfly craft", priority=ImagePriority.ACTIVITY
+        )
+        art = result["activities"]["art"]
+        assert art["image"].startswith("image-cache/")
+        assert art["image"].endswith(".webp")
+        assert set(image_cache.storage.uploads) == {art["image"], *art["image_variants"].values()}
+
+    @pytest.mark.asyncio
+    async def test_generate_image_reuses_cached_render(self, agent, sample_state, image_cache):
+        """An identical prompt drawn before skips FLUX and the upload."""
+        state = {**sample_state, "activities": {"art": {"image_generation_prompt": "A kite"}}}
+        first = await agent.generate_image(state)
+        state = {**sample_state, "activities": {"art": {"image_generation_prompt": "A kite"}}}
+
+        second = await agent.generate_image(state)
+
+        assert second["activities"]["art"]["image"] == first["activities"]["art"]["image"]
+        agent.ai_service.generate_image.assert_awaited_once()
+        assert len(image_cache.storage.uploads) == 3  # master + card + list
+
+    @pytest.mark.asyncio
+    async def test_force_fresh_image_draws_again(self, agent, sample_state, image_cache):
+        state = {**sample_state, "activities": {"art": {"image_generation_prompt": "A kite"}}}
+        first = await agent.generate_image(state)
+        state = {
+            **sample_state,
+            "force_fresh_image": True,
+            "activities": {"art": {"image_generation_prompt": "A kite"}},
+        }
+
+        second = await agent.generate_image(state)
+
+        assert agent.ai_service.generate_image.await_count == 2
+        assert second["activities"]["art"]["image"].startswith("images/")
+        assert second["activities"]["art"]["image_variants"]["card"].startswith("images/")
+        assert second["activities"]["art"]["image"] != first["activities"]["art"]["image"]
 
     @pytest.mark.asyncio
-    async def test_generate_image_sets_none_on_image_failure(self, agent, sample_state):
+    async def test_generate_image_sets_none_on_image_failure(self, agent, sample_state, image_cache):
         """If the image model returns no bytes, set image to None — don't error out."""
-        agent.storage.upload_file = AsyncMock()
         agent.ai_service.generate_image.return_value = None
         state_with_activity = {
             **sample_state,
@@ -92,12 +123,12 @@ class TestArtAgent:
         result = await agent.generate_image(state_with_activity)
 
         assert result["activities"]["art"]["image"] is None
-        agent.storage.upload_file.assert_not_called()
+        assert image_cache.storage.uploads == []
 
     @pytest.mark.asyncio
     async def test_generate_returns_error_on_ai_failure(self, agent, sample_state):
         """Test that generate() returns error on AI failure."""
-        agent.ai_service.generate_content.side_effect = Exception("AI Error")
+        agent.ai_service.generate_structured.side_effect = Exception("AI Error")
 
         result = await agent.generate(sample_state)
 
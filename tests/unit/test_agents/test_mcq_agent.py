@@ -3,10 +3,10 @@ Unit tests for MCQ Agent.
 """
 
 import pytest
-import json
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from src.agents.activities.mcq_agent import MCQAgent
+from src.models.response_schemas import MCQ_SCHEMA
 
 
 class TestMCQAgent:
@@ -17,7 +17,7 @@ class TestMCQAgent:
         """Create MCQAgent instance with mocked AI service."""
         with patch("src.agents.activities.mcq_agent.AIService") as MockAI:
             instance = MockAI.return_value
-            instance.generate_content = AsyncMock()
+            instance.generate_structured = AsyncMock()
             agent = MCQAgent()
             agent.ai_service = instance
             yield agent
@@ -37,12 +37,12 @@ class TestMCQAgent:
     @pytest.mark.asyncio
     async def test_generate_returns_mcq_activities(self, agent, sample_state):
         """Test that generate() returns properly structured MCQ data."""
-        mock_response = json.dumps([
+        mock_response = [
             {"question": "Who was brave?", "options": ["Rabbit", "Fox", "Bear"], "correct": "Rabbit"},
             {"question": "What did the rabbit save?", "options": ["Forest", "River", "Mountain"], "correct": "Forest"},
             {"question": "What happened?", "options": ["Adventure", "Sleep", "Eat"], "correct": "Adventure"}
-        ])
-        agent.ai_service.generate_content.return_value = mock_response
+        ]
+        agent.ai_service.generate_structured.return_value = mock_response
         
         result = await agent.generate(sample_state)
         
@@ -53,22 +53,20 @@ class TestMCQAgent:
         assert len(result["activities"]["mcq"]) == 3
     
     @pytest.mark.asyncio
-    async def test_generate_handles_json_with_markdown(self, agent, sample_state):
-        """Test that generate() handles JSON wrapped in markdown code blocks."""
-        mock_response = """```json
-        [{"question": "Test?", "options": ["A", "B", "C"], "correct": "A"}]
-        ```"""
-        agent.ai_service.generate_content.return_value = mock_response
-        
+    async def test_generate_requests_mcq_schema(self, agent, sample_state):
+        """Test that generate() asks for schema-constrained output and uses the parsed list as-is."""
+        parsed = [{"question": "Test?", "options": ["A", "B", "C"], "correct": "A", "fun_fact": "Fun."}]
+        agent.ai_service.generate_structured.return_value = parsed
+
         result = await agent.generate(sample_state)
-        
-        assert "activities" in result
-        assert "mcq" in result["activities"]
-    
+
+        assert agent.ai_service.generate_structured.call_args.args[1] is MCQ_SCHEMA
+        assert result["activities"]["mcq"] is parsed
+
     @pytest.mark.asyncio
     async def test_generate_returns_error_on_failure(self, agent, sample_state):
         """Test that generate() returns error dict on exception."""
-        agent.ai_service.generate_content.side_effect = Exception("API Error")
+        agent.ai_service.generate_structured.side_effect = Exception("API Error")
         
         result = await agent.generate(sample_state)
         
@@ -78,8 +76,8 @@ class TestMCQAgent:
     
     @pytest.mark.asyncio
     async def test_generate_handles_invalid_json(self, agent, sample_state):
-        """Test that generate() handles invalid JSON responses."""
-        agent.ai_service.generate_content.return_value = "not valid json at all"
+        """Test that generate() handles unparseable (e.g. truncated) responses."""
+        agent.ai_service.generate_structured.side_effect = ValueError("Structured response was not valid JSON")
         
         result = await agent.generate(sample_state)
         
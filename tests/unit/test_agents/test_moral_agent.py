@@ -0,0 +1,66 @@
+"""
+Unit tests for per-item image generation in the Moral and Science agents.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.agents.activities.moral_agent import MoralAgent
+from src.agents.activities.science_agent import ScienceAgent
+
+GENERATION_SECONDS = 0.1
+
+
+@pytest.fixture
+def slow_flux(sample_png):
+    async def _generate_image(prompt, priority=None):
+        await asyncio.sleep(GENERATION_SECONDS)
+        return sample_png
+    return AsyncMock(side_effect=_generate_image)
+
+
+def _items(count: int) -> list[dict]:
+    return [{"title": f"Item {i}", "image_generation_prompt": f"Prompt {i}"} for i in range(count)]
+
+
+class TestParallelItemImages:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("agent_cls,activity_type,module", [
+        (MoralAgent, "moral", "moral_agent"),
+        (ScienceAgent, "science", "science_agent"),
+    ])
+    async def test_items_render_concurrently(self, slow_flux, agent_cls, activity_type, module):
+        with patch(f"src.agents.activities.{module}.AIService"):
+            agent = agent_cls()
+        agent.ai_service.generate_image = slow_flux
+        state = {"activities": {activity_type: _items(3)}}
+
+        start = time.monotonic()
+        result = await agent.generate_image(state)
+        elapsed = time.monotonic() - start
+
+        items = result["activities"][activity_type]
+        assert all(item["image"].endswith(".webp") for item in items)
+        assert len({item["image"] for item in items}) == 3
+        assert elapsed < 2 * GENERATION_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_one_failure_does_not_cancel_siblings(self, sample_png, image_cache):
+        async def _generate_image(prompt, priority=None):
+            if prompt == "Prompt 0":
+                raise RuntimeError("FLUX down")
+            await asyncio.sleep(0.01)
+            return sample_png
+
+        with patch("src.agents.activities.moral_agent.AIService"):
+            agent = MoralAgent()
+        agent.ai_service.generate_image = AsyncMock(side_effect=_generate_image)
+        items = _items(2)
+
+        result = await agent.generate_image({"activities": {"moral": items}})
+
+        assert result["errors"]["moral"] == "FLUX down"
+        assert items[1]["image"] in image_cache.storage.objects
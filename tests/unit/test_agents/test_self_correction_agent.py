@@ -0,0 +1,52 @@
+"""
+Unit tests for SelfCorrectionAgent story corrections.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.agents.story.self_correction_agent import SelfCorrectionAgent
+from src.models.response_schemas import STORY_SCHEMA
+
+
+class TestStoryCorrection:
+
+    @pytest.fixture
+    def agent(self):
+        with patch("src.agents.story.self_correction_agent.AIService") as MockAI:
+            instance = MockAI.return_value
+            instance.generate_structured = AsyncMock()
+            agent = SelfCorrectionAgent()
+            agent.ai_service = instance
+            yield agent
+
+    @pytest.mark.asyncio
+    async def test_fields_outside_the_schema_survive_a_correction(self, agent):
+        original = {
+            "title": "The Kite That Flew Home",
+            "story_text": "A kite flew.",
+            "moral": "Be kind",
+            "age_group": "5-6",
+            "language": "English",
+            "science_angle": "wind",
+            "daily_life_application": "flying kites at the park",
+        }
+        agent.ai_service.generate_structured.return_value = {
+            "story": "A kite flew all the way home.",
+            "image_prompt": "a kite",
+            "mcq_seeds": ["wind"],
+            "art_seed": "kite",
+            "science_concepts": [],
+            "moral": "Be brave",
+        }
+
+        result = await agent.correct({"story": original, "evaluation": {"reason": "too short"}}, "story")
+
+        corrected = result["story"]
+        assert corrected["story_text"] == "A kite flew all the way home."
+        assert corrected["moral"] == "Be brave"
+        for key in ("title", "age_group", "language", "science_angle", "daily_life_application"):
+            assert corrected[key] == original[key]
+
+    def test_story_schema_leaves_the_title_to_the_topic(self):
+        assert "title" not in STORY_SCHEMA["properties"]
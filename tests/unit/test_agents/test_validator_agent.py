@@ -3,7 +3,11 @@ Unit tests for Validator Agent.
 """
 
 import pytest
-from src.agents.validators.validator_agent import ValidatorAgent
+from src.agents.validators.validator_agent import (
+    ValidatorAgent,
+    reset_validation_metrics,
+    validation_metrics,
+)
 
 
 class TestValidatorAgent:
@@ -140,3 +144,35 @@ class TestValidatorAgent:
 
         assert "completed" in result
         assert "moral" in result["completed"]
+
+
+class TestValidationMetrics:
+    """Regeneration-rate counters reported on /metrics."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_metrics(self):
+        reset_validation_metrics()
+        yield
+        reset_validation_metrics()
+
+    def test_counts_regenerations_per_100(self):
+        validator = ValidatorAgent()
+        good = {"activities": {"mcq": [{"question": "Q?"}]}, "retry_count": {}}
+        bad = {"activities": {}, "retry_count": {}}
+
+        for _ in range(3):
+            validator.validate_mcq(good)
+        validator.validate_mcq(bad)
+
+        assert validation_metrics()["mcq"] == {"checked": 4, "failed": 1, "regenerations_per_100": 25.0}
+
+    def test_schema_shaped_output_passes_validation(self):
+        """Every key a schema marks required is one the validator checks for."""
+        from src.models.response_schemas import ART_SCHEMA, MORAL_SCHEMA
+
+        art = {key: "x" for key in ART_SCHEMA["required"]}
+        moral = [{key: "x" for key in MORAL_SCHEMA["items"]["required"]}]
+        validator = ValidatorAgent()
+
+        assert "retry_count" not in validator.validate_art({"activities": {"art": art}})
+        assert "retry_count" not in validator.validate_moral({"activities": {"moral": moral}})
@@ -0,0 +1,109 @@
+"""
+Unit tests for the process-wide AI provider registry.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.ai_providers import get_provider_registry, reset_provider_registry, settings
+from src.services.ai_service import AIService
+
+
+class TestAIProviderRegistry:
+    def test_singleton_until_reset(self):
+        first = get_provider_registry()
+        assert get_provider_registry() is first
+
+        reset_provider_registry()
+
+        assert get_provider_registry() is not first
+
+    def test_one_rate_limiter_per_model(self):
+        providers = get_provider_registry()
+
+        assert providers.rate_limiter("model-a") is providers.rate_limiter("model-a")
+        assert providers.rate_limiter("model-a") is not providers.rate_limiter("model-b")
+
+    def test_quota_comes_from_settings(self, monkeypatch):
+        from src.services import ai_providers
+
+        monkeypatch.setattr(ai_providers.settings, "MODEL_RATE_LIMITS", {"slow-model": 0.5})
+        monkeypatch.setattr(ai_providers.settings, "MODEL_BURST_CAPACITY", {"slow-model": 2})
+        providers = get_provider_registry()
+
+        limiter = providers.rate_limiter("slow-model")
+        default_limiter = providers.rate_limiter("other-model")
+
+        assert (limiter.rate, limiter.capacity) == (0.5, 2)
+        assert default_limiter.rate == ai_providers.settings.RATE_LIMIT_TOKENS_PER_SECOND
+        assert default_limiter.capacity == ai_providers.settings.RATE_LIMIT_BURST_CAPACITY
+
+
+class TestTokenBudget:
+    def test_token_limiter_sized_from_tpm_settings(self, monkeypatch):
+        from src.services import ai_providers
+
+        monkeypatch.setattr(ai_providers.settings, "MODEL_TOKENS_PER_MINUTE", {"big-model": 60_000})
+        limiter = get_provider_registry().token_limiter("big-model")
+
+        assert limiter.max_rate == 1000
+        assert limiter.min_rate == 1000 * ai_providers.settings.TPM_MIN_FRACTION
+
+    def test_estimate_learns_output_size(self):
+        providers = get_provider_registry()
+        first = providers.estimate_tokens("m", "x" * 400)
+
+        providers.record_output_tokens("m", 200)
+
+        assert first == 100 + 1000
+        assert providers.estimate_tokens("m", "x" * 400) == 100 + 200
+
+    @pytest.mark.asyncio
+    async def test_quota_error_cuts_rate_and_success_settles_usage(self):
+        class QuotaError(Exception):
+            code = 429
+
+        providers = get_provider_registry()
+        providers._genai_client = MagicMock()
+        response = MagicMock()
+        response.text = "ok"
+        response.usage_metadata.total_token_count = 50
+        response.usage_metadata.candidates_token_count = 20
+        providers._genai_client.aio.models.generate_content = AsyncMock(
+            side_effect=[QuotaError("RESOURCE_EXHAUSTED"), response]
+        )
+        service = AIService()
+        limiter = providers.token_limiter(service.model_name)
+
+        with pytest.raises(QuotaError):
+            await service._generate_uncached("prompt", service.model_name)
+        assert limiter.rate == limiter.max_rate * settings.TPM_DECREASE_FACTOR
+
+        await service._generate_uncached("prompt", service.model_name)
+
+        assert limiter.rate > limiter.max_rate * settings.TPM_DECREASE_FACTOR
+        assert providers.estimate_tokens(service.model_name, "") == 20
+        assert providers.metrics()["token_budgets"][service.model_name]["queue_depth"] == 0
+
+
+class TestSharedAcrossAgents:
+    def test_services_share_client_and_limiters(self):
+        providers = get_provider_registry()
+        providers._genai_client = MagicMock()
+        mcq_service, art_service = AIService(), AIService()
+
+        assert mcq_service.client is art_service.client is providers._genai_client
+        assert mcq_service._rate_limiter("m") is art_service._rate_limiter("m")
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_works_across_agents(self):
+        response = MagicMock()
+        response.text = '{"ok": true}'
+        providers = get_provider_registry()
+        providers._genai_client = MagicMock()
+        providers._genai_client.aio.models.generate_content = AsyncMock(return_value=response)
+
+        await AIService().generate_content("identical prompt")
+        await AIService().generate_content("identical prompt")
+
+        providers._genai_client.aio.models.generate_content.assert_awaited_once()
@@ -2,12 +2,33 @@
 Unit tests for AIService fallback and resilience wiring.
 """
 
+import asyncio
+import time
+
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from src.services.ai_service import AIService
 
 
+def _fake_aio_client(latency: float = 0.0, text: str = '{"ok": true}') -> MagicMock:
+    """A stand-in genai.Client whose aio text call sleeps for `latency`
+    without blocking the event loop, like the real network round-trip."""
+    calls = []
+
+    async def _generate_content(*, model, contents, config=None):
+        calls.append((model, contents))
+        await asyncio.sleep(latency)
+        response = MagicMock()
+        response.text = text
+        return response
+
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(side_effect=_generate_content)
+    client.calls = calls
+    return client
+
+
 class TestAIServiceFallback:
     @pytest.mark.asyncio
     async def test_returns_primary_response_when_primary_succeeds(self):
@@ -43,3 +64,350 @@ class TestAIServiceFallback:
 
         with pytest.raises(RuntimeError, match="No distinct fallback model available"):
             await service.generate_content("test prompt")
+
+
+class TestAIServiceAsyncPath:
+    @pytest.mark.asyncio
+    async def test_primary_uses_aio_client_and_caches(self):
+        service = AIService()
+        service._client = _fake_aio_client(text='{"cached": true}')
+
+        first = await service.generate_content("same prompt")
+        second = await service.generate_content("same prompt")
+
+        assert first == second == '{"cached": true}'
+        service.client.aio.models.generate_content.assert_awaited_once()
+        service.client.models.generate_content.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_override_path_bypasses_cache_when_requested(self):
+        service = AIService()
+        service._client = _fake_aio_client()
+
+        await service.generate_content("p", model_override="m-1", use_cache=False)
+        await service.generate_content("p", model_override="m-1", use_cache=False)
+
+        assert service.client.aio.models.generate_content.await_count == 2
+        assert [model for model, _ in service.client.calls] == ["m-1", "m-1"]
+
+
+class TestAIServiceConcurrencyBenchmark:
+    """N concurrent generate_content calls must overlap on the event loop.
+
+    With the old sync client each call held the loop for its full latency, so
+    N calls took ~N x latency and a concurrent ticker could not run.
+    """
+
+    N_CALLS = 5
+    LATENCY = 0.2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_overlap_instead_of_serializing(self):
+        service = AIService()
+        service._client = _fake_aio_client(latency=self.LATENCY)
+
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def _ticker():
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[service.generate_content(f"prompt {i}") for i in range(self.N_CALLS)]
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await ticker
+
+        serial_time = self.N_CALLS * self.LATENCY
+        print(
+            f"\n[benchmark] {self.N_CALLS} concurrent calls @ {self.LATENCY}s: "
+            f"{elapsed:.3f}s (serial would be {serial_time:.2f}s), loop ticks={ticks}"
+        )
+        assert len(results) == self.N_CALLS
+        assert elapsed < serial_time / 2
+        # The loop stayed responsive while the calls were in flight.
+        assert ticks >= 5
+
+
+class TestAIServiceSingleFlight:
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_prompts_make_one_upstream_call(self):
+        from src.services.ai_providers import get_provider_registry
+
+        client = _fake_aio_client(latency=0.05)
+        providers = get_provider_registry()
+        providers._genai_client = client
+
+        results = await asyncio.gather(*[AIService().generate_content("same seed") for _ in range(4)])
+
+        assert len(set(results)) == 1
+        assert len(client.calls) == 1
+        assert providers.metrics()["text_single_flight"] == {"calls": 1, "coalesced": 3}
+
+    @pytest.mark.asyncio
+    async def test_different_prompt_versions_are_not_coalesced(self):
+        from src.services.ai_providers import get_provider_registry
+
+        client = _fake_aio_client(latency=0.05)
+        get_provider_registry()._genai_client = client
+
+        await asyncio.gather(
+            AIService().generate_content("same seed", prompt_version="v1"),
+            AIService().generate_content("same seed", prompt_version="v2"),
+        )
+
+        assert len(client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_image_prompts_make_one_flux_call(self):
+        from src.services.ai_providers import get_provider_registry
+
+        async def _slow_image(prompt, *args):
+            await asyncio.sleep(0.05)
+            return b"png"
+
+        service = AIService()
+        service._generate_image = AsyncMock(side_effect=_slow_image)
+
+        results = await asyncio.gather(*[service.generate_image("a red kite") for _ in range(3)])
+
+        assert results == [b"png"] * 3
+        service._generate_image.assert_awaited_once()
+        assert get_provider_registry().image_flight.stats["coalesced"] == 2
+
+
+class TestAIServiceStructuredOutput:
+    @pytest.mark.asyncio
+    async def test_schema_is_sent_and_parsed_object_returned(self):
+        from src.models.response_schemas import ART_SCHEMA
+        from src.services.ai_providers import get_provider_registry
+
+        client = _fake_aio_client(text='{"title": "Kite"}')
+        providers = get_provider_registry()
+        providers._genai_client = client
+
+        result = await AIService().generate_structured("prompt", ART_SCHEMA)
+
+        config = client.aio.models.generate_content.call_args.kwargs["config"]
+        assert config.response_schema == ART_SCHEMA
+        assert result == {"title": "Kite"}
+        assert providers.structured_output_stats == {"parsed": 1, "parse_failures": 0}
+
+    @pytest.mark.asyncio
+    async def test_schema_is_part_of_the_cache_key(self):
+        from src.models.response_schemas import ART_SCHEMA, MCQ_SCHEMA
+        from src.services.ai_providers import get_provider_registry
+
+        client = _fake_aio_client(text="[]")
+        get_provider_registry()._genai_client = client
+
+        await AIService().generate_structured("prompt", ART_SCHEMA)
+        await AIService().generate_structured("prompt", MCQ_SCHEMA)
+
+        assert len(client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_truncated_response_raises_value_error(self):
+        from src.services.ai_providers import get_provider_registry
+
+        get_provider_registry()._genai_client = _fake_aio_client(text='[{"question": "Wh')
+
+        with pytest.raises(ValueError):
+            await AIService().generate_structured("prompt", {"type": "ARRAY"})
+        assert get_provider_registry().structured_output_stats["parse_failures"] == 1
+
+
+def _chunk(*parts) -> MagicMock:
+    chunk = MagicMock()
+    chunk.candidates[0].content.parts = list(parts)
+    return chunk
+
+
+def _text_part(text: str) -> MagicMock:
+    part = MagicMock()
+    part.inline_data = None
+    part.text = text
+    return part
+
+
+def _image_part(data: bytes) -> MagicMock:
+    part = MagicMock()
+    part.inline_data.data = data
+    part.inline_data.mime_type = "image/png"
+    part.text = None
+    return part
+
+
+def _fake_stream_client(chunks, delay: float = 0.0) -> MagicMock:
+    """genai client whose aio generate_content_stream yields `chunks` with a
+    delay between them, like a response still arriving over the network."""
+    async def _stream():
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(side_effect=lambda **_: _stream())
+    return client
+
+
+class TestAIServiceMultimodalStreaming:
+    @pytest.mark.asyncio
+    async def test_parts_are_yielded_as_they_arrive(self):
+        service = AIService()
+        service._client = _fake_stream_client(
+            [_chunk(_image_part(b"img1")), _chunk(_text_part("caption")), _chunk(_image_part(b"img2"))],
+            delay=0.05,
+        )
+        start = time.monotonic()
+        arrivals = []
+
+        async for part in service.stream_multimodal_content("draw"):
+            arrivals.append((part["type"], time.monotonic() - start))
+
+        assert [kind for kind, _ in arrivals] == ["image", "text", "image"]
+        # The first image is available well before the stream finishes.
+        assert arrivals[0][1] < arrivals[-1][1] - 0.05
+
+    @pytest.mark.asyncio
+    async def test_every_part_of_a_chunk_is_yielded(self):
+        service = AIService()
+        service._client = _fake_stream_client([_chunk(_text_part("a"), _image_part(b"x"))])
+
+        parts = [part async for part in service.stream_multimodal_content("draw")]
+
+        assert [p["type"] for p in parts] == ["text", "image"]
+
+    @pytest.mark.asyncio
+    async def test_generate_multimodal_content_collects_stream(self):
+        service = AIService()
+        service._client = _fake_stream_client(
+            [_chunk(_text_part("Hello ")), _chunk(_image_part(b"img")), _chunk(_text_part("world"))]
+        )
+
+        result = await service.generate_multimodal_content("draw")
+
+        assert result == {"text": "Hello world", "images": [{"mime_type": "image/png", "data": b"img"}]}
+
+
+class _FakeImage:
+    def save(self, buffer, format, **params):
+        buffer.write(b"\x89PNG fake")
+
+
+class TestAIServicePooledImageClient:
+    """FLUX calls go through one keep-alive async client per provider and
+    never block the event loop (the old path built a fresh InferenceClient
+    per image and ran the sync text_to_image on the loop)."""
+
+    N_IMAGES = 4
+    LATENCY = 0.1
+
+    @pytest.fixture
+    def providers(self):
+        from src.services.ai_providers import get_provider_registry
+        from src.services.flux_gate import InProcessFluxGate
+
+        providers = get_provider_registry()
+        providers._flux_gate = InProcessFluxGate(rate=1000.0, capacity=10)
+        return providers
+
+    def test_image_client_is_reused_per_provider(self, providers):
+        assert providers.image_client("together") is providers.image_client("together")
+        assert providers.image_client("together") is not providers.image_client("fal-ai")
+
+    @pytest.mark.asyncio
+    async def test_image_generation_keeps_loop_responsive(self, providers):
+        async def _text_to_image(prompt, model=None):
+            await asyncio.sleep(self.LATENCY)
+            return _FakeImage()
+
+        client = MagicMock()
+        client.text_to_image = AsyncMock(side_effect=_text_to_image)
+        providers._image_clients["together"] = client
+
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def _ticker():
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        results = await asyncio.gather(
+            *[AIService().generate_image(f"kite {i}") for i in range(self.N_IMAGES)]
+        )
+        stop.set()
+        await ticker
+
+        assert results == [b"\x89PNG fake"] * self.N_IMAGES
+        assert client.text_to_image.await_count == self.N_IMAGES
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_benchmark_connection_reuse_per_image(self):
+        """Per-image connection overhead against a local keep-alive HTTP
+        server: a fresh client per image (old) vs one pooled client (new).
+        Plain TCP only — in production TLS makes the fresh-client cost larger."""
+        import httpx
+
+        connections = 0
+        body = b"\x89PNG fake"
+
+        async def _handle(reader, writer):
+            nonlocal connections
+            connections += 1
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: image/png\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+
+        async def _serve(reader, writer):
+            try:
+                await _handle(reader, writer)
+            except (asyncio.IncompleteReadError, ConnectionResetError):
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        n = 50
+        try:
+            start = time.perf_counter()
+            for _ in range(n):
+                async with httpx.AsyncClient() as fresh:
+                    await fresh.get(url)
+            per_image_fresh = (time.perf_counter() - start) / n
+            fresh_connections, connections = connections, 0
+
+            async with httpx.AsyncClient() as pooled:
+                start = time.perf_counter()
+                for _ in range(n):
+                    await pooled.get(url)
+                per_image_pooled = (time.perf_counter() - start) / n
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        print(
+            f"\n[benchmark] per-image client overhead: fresh={per_image_fresh * 1000:.2f}ms "
+            f"({fresh_connections} connections), pooled={per_image_pooled * 1000:.2f}ms "
+            f"({connections} connection)"
+        )
+        assert fresh_connections == n
+        assert connections == 1
+        assert per_image_pooled < per_image_fresh
@@ -0,0 +1,159 @@
+"""
+Unit tests for header-based WAV durations, single-buffer PCM assembly and
+optional compressed narration encoding.
+"""
+
+import io
+import os
+import stat
+import struct
+import sys
+import tracemalloc
+import wave
+
+import pytest
+
+from src.services import audio_encoding
+from src.services.audio_encoding import concat_wav, encode_narration, parse_wav_header, wav_duration
+
+
+def _wav(seconds: float, rate: int = 24000, channels: int = 1, fill: bytes = b"\x01\x02") -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(fill * channels * int(rate * seconds))
+    return buffer.getvalue()
+
+
+def _with_list_chunk(wav: bytes) -> bytes:
+    """Insert an odd-sized LIST chunk (plus pad byte) before the data chunk."""
+    payload = b"INFOISFT\x05\x00\x00\x00Lavf\x00"  # 17 bytes -> padded to 18
+    extra = b"LIST" + struct.pack("<I", len(payload)) + payload + b"\x00"
+    riff_size = struct.unpack_from("<I", wav, 4)[0] + len(extra)
+    return b"RIFF" + struct.pack("<I", riff_size) + wav[8:36] + extra + wav[36:]
+
+
+def _wave_combine(chunks: list[bytes]) -> bytes:
+    """The previous AudioService._combine_wav, kept as the benchmark baseline."""
+    with wave.open(io.BytesIO(chunks[0]), "rb") as first:
+        params = first.getparams()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setparams(params)
+        for chunk in chunks:
+            with wave.open(io.BytesIO(chunk), "rb") as wf:
+                out.writeframes(wf.readframes(wf.getnframes()))
+    return buf.getvalue()
+
+
+class TestParseWavHeader:
+    def test_reads_format_and_data_chunk(self):
+        layout = parse_wav_header(_wav(0.5, rate=16000, channels=2))
+
+        assert (layout.channels, layout.sample_width, layout.frame_rate) == (2, 2, 16000)
+        assert layout.data_offset == 44
+        assert layout.data_size == 0.5 * 16000 * 2 * 2
+
+    def test_skips_extra_chunks(self):
+        layout = parse_wav_header(_with_list_chunk(_wav(0.25)))
+
+        assert layout.data_offset == 44 + 26
+        assert layout.duration == pytest.approx(0.25)
+
+    def test_duration_matches_wave_module(self):
+        data = _wav(1.37)
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            expected = wf.getnframes() / wf.getframerate()
+
+        assert wav_duration(data) == pytest.approx(expected)
+
+    def test_rejects_non_wav(self):
+        with pytest.raises(ValueError):
+            parse_wav_header(b"ID3\x04 mp3 bytes")
+
+
+class TestConcatWav:
+    def test_matches_frame_by_frame_assembly(self):
+        chunks = [_wav(0.2, fill=b"\x01\x00"), _with_list_chunk(_wav(0.3, fill=b"\x02\x00")), _wav(0.1)]
+
+        combined = concat_wav(chunks)
+
+        assert isinstance(combined, bytearray)
+        assert bytes(combined) == _wave_combine(chunks)
+        assert wav_duration(combined) == pytest.approx(0.6)
+
+    def test_rejects_mixed_formats(self):
+        with pytest.raises(ValueError):
+            concat_wav([_wav(0.1, rate=24000), _wav(0.1, rate=16000)])
+
+    def test_empty(self):
+        assert concat_wav([]) == bytearray()
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """An 'ffmpeg' on PATH that records its argv and emits a marker + input size."""
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "data = sys.stdin.buffer.read()\n"
+        "open(sys.argv[0] + '.args', 'w').write(' '.join(sys.argv[1:]))\n"
+        "if 'libmp3lame' in sys.argv: sys.exit(1)\n"
+        "sys.stdout.buffer.write(b'OggS' + str(len(data)).encode())\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+class TestEncodeNarration:
+    @pytest.mark.asyncio
+    async def test_wav_is_passed_through(self):
+        wav = _wav(0.1)
+
+        assert await encode_narration(wav, "wav") == (wav, "wav")
+
+    @pytest.mark.asyncio
+    async def test_encodes_in_ffmpeg_worker(self, fake_ffmpeg):
+        wav = _wav(0.1)
+
+        encoded, fmt = await encode_narration(wav, "opus")
+
+        assert (encoded, fmt) == (b"OggS" + str(len(wav)).encode(), "opus")
+        args = (fake_ffmpeg.parent / "ffmpeg.args").read_text()
+        assert "libopus" in args and "pipe:0" in args
+
+    @pytest.mark.asyncio
+    async def test_failed_encode_keeps_wav(self, fake_ffmpeg):
+        wav = _wav(0.1)
+
+        assert await encode_narration(wav, "mp3") == (wav, "wav")
+
+    @pytest.mark.asyncio
+    async def test_missing_ffmpeg_keeps_wav(self, monkeypatch):
+        monkeypatch.setattr(audio_encoding.settings, "FFMPEG_BINARY", "no-such-ffmpeg-binary")
+        wav = _wav(0.1)
+
+        assert await encode_narration(wav, "opus") == (wav, "wav")
+
+
+class TestConcatMemory:
+    def test_preallocated_assembly_peaks_below_wave_module(self):
+        chunks = [_wav(15.0) for _ in range(12)]  # a 3-minute story, 24 kHz mono
+
+        def _peak(combine):
+            tracemalloc.start()
+            combine(chunks)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+
+        old_peak = _peak(_wave_combine)
+        new_peak = _peak(concat_wav)
+        output = len(concat_wav(chunks))
+
+        assert new_peak < old_peak
+        assert new_peak < output * 1.2
@@ -0,0 +1,201 @@
+"""
+Unit tests for paragraph-parallel TTS in AudioService, against a local fake
+of the Cloud Text-to-Speech REST endpoint (POST /v1/text:synthesize).
+"""
+
+import asyncio
+import base64
+import io
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import texttospeech
+
+from src.services import audio_service
+from src.services.audio_service import TTS_RATE_LIMIT_KEY, AudioService
+from src.utils import resilience
+
+SAMPLE_RATE = 24000
+
+
+def _wav(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(b"\0\0" * int(SAMPLE_RATE * seconds))
+    return buffer.getvalue()
+
+
+class FakeTTS:
+    """
+    Paragraph text "P<n>" renders n/10 seconds of silence. `latency` maps a
+    text to its response delay (default `default_latency`); texts in
+    `fail_once` answer 503 on their first request.
+    """
+
+    def __init__(self, default_latency: float = 0.02):
+        self.default_latency = default_latency
+        self.latency: dict[str, float] = {}
+        self.fail_once: set[str] = set()
+        self.requests: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, code, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                text = body["input"]["text"]
+                with fake._lock:
+                    fake.requests.append(text)
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    failing = text in fake.fail_once
+                    fake.fail_once.discard(text)
+                time.sleep(fake.latency.get(text, fake.default_latency))
+                with fake._lock:
+                    fake.in_flight -= 1
+                if failing:
+                    self._reply(503, {"error": {"code": 503, "message": "unavailable", "status": "UNAVAILABLE"}})
+                    return
+                audio = _wav(int(text[1:]) / 10)
+                self._reply(200, {"audioContent": base64.b64encode(audio).decode()})
+
+        return Handler
+
+
+@pytest.fixture
+def fake_tts():
+    fake = FakeTTS()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def service(fake_tts, monkeypatch):
+    # Plenty of budget: these tests are about concurrency, not the rate limit.
+    monkeypatch.setitem(audio_service.settings.MODEL_RATE_LIMITS, TTS_RATE_LIMIT_KEY, 1000.0)
+    monkeypatch.setitem(audio_service.settings.MODEL_BURST_CAPACITY, TTS_RATE_LIMIT_KEY, 100)
+    service = AudioService()
+    service._client = texttospeech.TextToSpeechClient(
+        transport="rest",
+        credentials=AnonymousCredentials(),
+        client_options={"api_endpoint": fake_tts.endpoint},
+    )
+    return service
+
+
+def _paragraphs(count: int) -> list[str]:
+    return [f"P{i}" for i in range(1, count + 1)]
+
+
+class TestSynthesizeParagraphs:
+    @pytest.mark.asyncio
+    async def test_reassembles_in_paragraph_order(self, service, fake_tts):
+        # The first paragraph finishes last.
+        fake_tts.latency["P1"] = 0.2
+
+        audio, timepoints = await service.synthesize_paragraphs(["P1", "", "P2", "P3"])
+
+        assert [tp["ParagraphNumber"] for tp in timepoints] == [1, 3, 4]
+        assert [tp["Duration"] for tp in timepoints] == [0.1, 0.2, 0.3]
+        assert [tp["StartTimestamp"] for tp in timepoints] == [0.0, 0.1, 0.3]
+        assert timepoints[-1]["EndTimestamp"] == 0.6
+        assert AudioService._wav_duration(audio) == pytest.approx(0.6)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, service, fake_tts, monkeypatch):
+        monkeypatch.setattr(audio_service.settings, "TTS_MAX_CONCURRENT_REQUESTS", 3)
+        fake_tts.default_latency = 0.05
+
+        audio, _ = await service.synthesize_paragraphs(_paragraphs(9))
+
+        assert audio is not None
+        assert fake_tts.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_shares_the_tts_rate_limit(self, service, monkeypatch):
+        monkeypatch.setitem(audio_service.settings.MODEL_RATE_LIMITS, TTS_RATE_LIMIT_KEY, 20.0)
+        monkeypatch.setitem(audio_service.settings.MODEL_BURST_CAPACITY, TTS_RATE_LIMIT_KEY, 1)
+
+        start = time.monotonic()
+        await service.synthesize_paragraphs(_paragraphs(5))
+
+        assert time.monotonic() - start >= 4 / 20 * 0.9
+
+    @pytest.mark.asyncio
+    async def test_failed_paragraph_is_retried_alone(self, service, fake_tts, monkeypatch):
+        monkeypatch.setattr(resilience, "random", SimpleNamespace(uniform=lambda a, b: 0.01))
+        fake_tts.fail_once.add("P2")
+
+        audio, timepoints = await service.synthesize_paragraphs(_paragraphs(3))
+
+        assert audio is not None
+        assert len(timepoints) == 3
+        assert fake_tts.requests.count("P1") == 1
+        assert fake_tts.requests.count("P2") >= 2
+        assert fake_tts.requests.count("P3") == 1
+
+    @pytest.mark.asyncio
+    async def test_unrecoverable_paragraph_fails_the_story(self, service, monkeypatch):
+        async def _broken(text, lang, voice):
+            raise RuntimeError("TTS down")
+
+        monkeypatch.setattr(service, "_synthesize_paragraph", _broken)
+
+        assert await service.synthesize_paragraphs(_paragraphs(3)) == (None, None)
+
+
+class TestSynthesizeParagraphsBenchmark:
+    @pytest.mark.asyncio
+    async def test_benchmark_sequential_vs_parallel(self, service, fake_tts, monkeypatch):
+        monkeypatch.setattr(audio_service.settings, "TTS_CACHE_ENABLED", False)
+        fake_tts.default_latency = 0.1
+        paragraphs = _paragraphs(12)
+
+        async def _run(concurrency: int) -> float:
+            monkeypatch.setattr(audio_service.settings, "TTS_MAX_CONCURRENT_REQUESTS", concurrency)
+            start = time.perf_counter()
+            audio, _ = await service.synthesize_paragraphs(paragraphs)
+            assert audio is not None
+            return time.perf_counter() - start
+
+        sequential = await _run(1)
+        parallel = await _run(4)
+
+        print(
+            f"\n[benchmark] {len(paragraphs)} paragraphs @ {fake_tts.default_latency * 1000:.0f}ms: "
+            f"sequential {sequential:.2f}s, 4-way {parallel:.2f}s ({sequential / parallel:.1f}x)"
+        )
+        assert parallel < sequential / 2
@@ -0,0 +1,162 @@
+"""
+Unit tests for out-of-line checkpoint blobs and their use in FirestoreCheckpointer.
+"""
+
+import asyncio
+import operator
+import random
+from typing import Annotated, List, Optional, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.services.database.checkpoint_blobs import (
+    BLOB_REF_KEY,
+    CheckpointBlobs,
+    GCSBlobStore,
+    LocalBlobStore,
+)
+from src.services.database.checkpoint_service import FirestoreCheckpointer
+from tests.conftest import InMemoryBucket, InMemoryFirestore
+from tests.unit.test_services.test_audio_service import _wav
+
+FIRESTORE_DOC_LIMIT = 1024 * 1024
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(str(tmp_path / "spool"))
+
+
+class TestCheckpointBlobs:
+    @pytest.mark.asyncio
+    async def test_spills_only_large_bytes_at_any_depth(self, store):
+        blobs = CheckpointBlobs(store, threshold_bytes=1024)
+        big = random.Random(1).randbytes(4096)
+        values = {"audio_bytes": big, "small": b"tiny", "nested": {"items": [big, "text"]}, "n": 3}
+
+        spilled = await blobs.spill(values)
+
+        assert spilled["audio_bytes"][BLOB_REF_KEY] == spilled["nested"]["items"][0][BLOB_REF_KEY]
+        assert spilled["small"] == b"tiny" and spilled["nested"]["items"][1] == "text"
+        assert values["audio_bytes"] is big  # the live state is not mutated
+        assert blobs.stats["uploaded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_values_are_returned_as_is(self, store):
+        values = {"story_text": "Once upon a time", "completed": ["a"]}
+
+        assert await CheckpointBlobs(store).spill(values) is values
+
+    @pytest.mark.asyncio
+    async def test_repeated_spills_upload_once(self, store):
+        blobs = CheckpointBlobs(store, threshold_bytes=1024)
+        big = bytes(8192)
+
+        for step in range(5):
+            await blobs.spill({"image_bytes": big, "retry_count": step})
+
+        assert blobs.stats == {"spilled": 5, "uploaded": 1, "fetched": 0, "bytes_uploaded": 8192}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_spills_share_one_upload(self, store):
+        blobs = CheckpointBlobs(store, threshold_bytes=1024)
+        big = bytes(8192)
+
+        await asyncio.gather(blobs.spill({"audio_bytes": big}), blobs.spill([big]))
+
+        assert blobs.stats["uploaded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rehydrates_in_another_process(self, store):
+        big = random.Random(2).randbytes(50_000)
+        spilled = await CheckpointBlobs(store, threshold_bytes=1024).spill({"image_bytes": big})
+        fresh = CheckpointBlobs(store, threshold_bytes=1024)
+
+        assert await fresh.rehydrate(spilled) == {"image_bytes": big}
+        assert await fresh.rehydrate(spilled) == {"image_bytes": big}
+        assert fresh.stats["fetched"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_blob_raises(self, store):
+        ref = {BLOB_REF_KEY: "0" * 64, "size": 10}
+
+        with pytest.raises(LookupError):
+            await CheckpointBlobs(store).rehydrate({"audio_bytes": ref})
+
+    @pytest.mark.asyncio
+    async def test_gcs_store_is_content_addressed_and_create_only(self):
+        bucket = InMemoryBucket()
+        blobs = CheckpointBlobs(GCSBlobStore(storage=bucket), threshold_bytes=1024)
+        big = bytes(2048)
+
+        spilled = await blobs.spill({"audio_bytes": big})
+        await CheckpointBlobs(GCSBlobStore(storage=bucket), threshold_bytes=1024).spill({"audio_bytes": big})
+
+        digest = spilled["audio_bytes"][BLOB_REF_KEY]
+        assert bucket.uploads == [f"checkpoint-blobs/{digest}"]
+
+
+class _AudioState(TypedDict):
+    story_text: str
+    audio_bytes: Optional[bytes]
+    validated: bool
+    completed: Annotated[List[str], operator.add]
+
+
+NARRATION = _wav(1.0)[:44] + random.Random(3).randbytes(3 * 1024 * 1024)  # ~3 MB WAV
+
+
+def _wf4_like_graph(checkpointer):
+    graph = StateGraph(_AudioState)
+    graph.add_node("generate_audio", lambda s: {"audio_bytes": NARRATION, "completed": ["generate_audio"]})
+    graph.add_node("validate", lambda s: {"validated": True, "completed": ["validate"]})
+    graph.add_node("evaluate", lambda s: {"completed": ["evaluate"]})
+    graph.set_entry_point("generate_audio")
+    graph.add_edge("generate_audio", "validate")
+    graph.add_edge("validate", "evaluate")
+    graph.add_edge("evaluate", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _doc_sizes(db: InMemoryFirestore) -> list[int]:
+    return [len(d["checkpoint"]) for d in db.collection("workflow_checkpoints").docs.values()]
+
+
+class TestCheckpointerSpilling:
+    @pytest.mark.asyncio
+    async def test_large_state_bytes_stay_out_of_documents(self, store):
+        db = InMemoryFirestore()
+        checkpointer = FirestoreCheckpointer(blobs=CheckpointBlobs(store))
+        checkpointer._client = db
+        config = {"configurable": {"thread_id": "story-1_wf4"}}
+
+        await _wf4_like_graph(checkpointer).ainvoke({"story_text": "Hi", "completed": []}, config=config)
+
+        assert max(_doc_sizes(db)) < 4096
+        assert checkpointer.blobs.stats["uploaded"] == 1
+
+        # A fresh process resumes from Firestore + the blob store.
+        restarted = FirestoreCheckpointer(blobs=CheckpointBlobs(store))
+        restarted._client = db
+        latest = await restarted.aget_tuple(config)
+        assert latest.checkpoint["channel_values"]["audio_bytes"] == NARRATION
+        history = [t async for t in restarted.alist(config)]
+        assert all(
+            t.checkpoint["channel_values"].get("audio_bytes") in (None, NARRATION) for t in history
+        )
+
+    @pytest.mark.asyncio
+    async def test_spilling_keeps_documents_under_the_firestore_limit(self, store):
+        sizes = {}
+        for label, blobs in (("inline", CheckpointBlobs(store, threshold_bytes=1 << 40)), ("spilled", CheckpointBlobs(store))):
+            db = InMemoryFirestore()
+            checkpointer = FirestoreCheckpointer(blobs=blobs)
+            checkpointer._client = db
+            await _wf4_like_graph(checkpointer).ainvoke(
+                {"story_text": "Hi", "completed": []}, config={"configurable": {"thread_id": label}}
+            )
+            sizes[label] = _doc_sizes(db)
+
+        assert max(sizes["inline"]) > FIRESTORE_DOC_LIMIT
+        assert max(sizes["spilled"]) < FIRESTORE_DOC_LIMIT
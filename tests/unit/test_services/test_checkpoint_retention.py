@@ -0,0 +1,168 @@
+"""
+Unit tests for checkpoint retention: keep-last trimming on write, TTL fields
+and the chunked cleanup sweep.
+"""
+
+import operator
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.services.database.checkpoint_blobs import CheckpointBlobs, LocalBlobStore
+from src.services.database.checkpoint_service import FirestoreCheckpointer
+from tests.conftest import InMemoryFirestore
+
+
+class _State(TypedDict):
+    completed: Annotated[List[str], operator.add]
+
+
+def _linear_graph(checkpointer, steps: int):
+    graph = StateGraph(_State)
+    names = [f"step_{i}" for i in range(steps)]
+    for name in names:
+        graph.add_node(name, lambda s, name=name: {"completed": [name]})
+    graph.set_entry_point(names[0])
+    for a, b in zip(names, names[1:]):
+        graph.add_edge(a, b)
+    graph.add_edge(names[-1], END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def db():
+    return InMemoryFirestore()
+
+
+@pytest.fixture
+def make_checkpointer(db, tmp_path):
+    def make(**kwargs) -> FirestoreCheckpointer:
+        checkpointer = FirestoreCheckpointer(
+            blobs=CheckpointBlobs(LocalBlobStore(str(tmp_path / "spool"))), **kwargs
+        )
+        checkpointer._client = db
+        return checkpointer
+    return make
+
+
+def _docs(db, collection="workflow_checkpoints") -> list[dict]:
+    return list(db.collection(collection).docs.values())
+
+
+class TestKeepLast:
+    @pytest.mark.asyncio
+    async def test_only_the_newest_checkpoints_are_kept(self, db, make_checkpointer):
+        config = {"configurable": {"thread_id": "story-1_wf2"}}
+        checkpointer = make_checkpointer(keep_last=3)
+
+        result = await _linear_graph(checkpointer, steps=8).ainvoke({"completed": []}, config=config)
+
+        stored = _docs(db)
+        assert len(stored) == 3
+        latest = await make_checkpointer(keep_last=3).aget_tuple(config)
+        assert latest.checkpoint["channel_values"]["completed"] == result["completed"]
+        assert latest.checkpoint["id"] in {d["checkpoint_id"] for d in stored}
+
+    @pytest.mark.asyncio
+    async def test_trimming_removes_pending_writes_of_deleted_checkpoints(self, db, make_checkpointer):
+        config = {"configurable": {"thread_id": "t"}}
+        await _linear_graph(make_checkpointer(keep_last=2), steps=6).ainvoke({"completed": []}, config=config)
+
+        kept = {d["checkpoint_id"] for d in _docs(db)}
+        assert {d["checkpoint_id"] for d in _docs(db, "workflow_checkpoint_writes")} <= kept
+
+    @pytest.mark.asyncio
+    async def test_picks_up_checkpoints_left_by_another_pod(self, db, make_checkpointer):
+        config = {"configurable": {"thread_id": "t"}}
+        await _linear_graph(make_checkpointer(keep_last=0), steps=6).ainvoke({"completed": []}, config=config)
+        assert len(_docs(db)) > 4
+
+        await _linear_graph(make_checkpointer(keep_last=2), steps=1).ainvoke({"completed": []}, config=config)
+
+        assert len(_docs(db)) == 2
+
+    @pytest.mark.asyncio
+    async def test_threads_are_trimmed_independently(self, db, make_checkpointer):
+        checkpointer = make_checkpointer(keep_last=2)
+        for thread_id in ("a", "b"):
+            await _linear_graph(checkpointer, steps=5).ainvoke(
+                {"completed": []}, config={"configurable": {"thread_id": thread_id}}
+            )
+
+        per_thread = [d["thread_id"] for d in _docs(db)]
+        assert per_thread.count("a") == per_thread.count("b") == 2
+
+    @pytest.mark.asyncio
+    async def test_write_behind_leaves_no_orphaned_writes(self, db, make_checkpointer):
+        config = {"configurable": {"thread_id": "t"}}
+        checkpointer = make_checkpointer(keep_last=3, write_behind=True, max_staleness_seconds=60.0)
+        for _ in range(3):
+            await _linear_graph(checkpointer, steps=10).ainvoke({"completed": []}, config=config)
+
+        kept = {d["checkpoint_id"] for d in _docs(db)}
+        assert len(kept) == 3
+        assert {d["checkpoint_id"] for d in _docs(db, "workflow_checkpoint_writes")} <= kept
+
+    @pytest.mark.asyncio
+    async def test_documents_carry_an_expiry(self, db, make_checkpointer):
+        await _linear_graph(make_checkpointer(ttl_days=3), steps=1).ainvoke(
+            {"completed": []}, config={"configurable": {"thread_id": "t"}}
+        )
+
+        for doc in _docs(db) + _docs(db, "workflow_checkpoint_writes"):
+            assert doc["expires_at"] - doc["created_at"] == timedelta(days=3)
+
+
+class TestCleanup:
+    @pytest.mark.asyncio
+    async def test_deletes_old_documents_in_bounded_batches(self, db, make_checkpointer):
+        now = datetime.now(timezone.utc)
+        for i in range(1200):
+            db.collection("workflow_checkpoints").docs[f"old-{i}"] = {"thread_id": f"t{i}", "created_at": now - timedelta(days=30)}
+        for i in range(300):
+            db.collection("workflow_checkpoint_writes").docs[f"old-w{i}"] = {"thread_id": f"t{i}", "created_at": now - timedelta(days=30)}
+        db.collection("workflow_checkpoints").docs["recent"] = {"thread_id": "t", "created_at": now}
+
+        deleted = await make_checkpointer().cleanup_old_checkpoints(days=7)
+
+        assert deleted == 1500
+        assert list(db.collection("workflow_checkpoints").docs) == ["recent"]
+        assert not db.collection("workflow_checkpoint_writes").docs
+        assert db.batch_sizes and max(db.batch_sizes) <= 500
+
+    @pytest.mark.asyncio
+    async def test_cutoff_spans_month_boundaries(self, db, make_checkpointer):
+        now = datetime.now(timezone.utc)
+        db.collection("workflow_checkpoints").docs["old"] = {"thread_id": "t", "created_at": now - timedelta(days=45)}
+        db.collection("workflow_checkpoints").docs["recent"] = {"thread_id": "t", "created_at": now - timedelta(days=20)}
+
+        assert await make_checkpointer().cleanup_old_checkpoints(days=40) == 1
+        assert list(db.collection("workflow_checkpoints").docs) == ["recent"]
+
+    @pytest.mark.asyncio
+    async def test_thread_deletion_is_chunked(self, db, make_checkpointer):
+        for i in range(700):
+            db.collection("workflow_checkpoints").docs[f"t_{i}"] = {"thread_id": "t", "created_at": datetime.now(timezone.utc)}
+
+        await make_checkpointer().adelete_thread("t")
+
+        assert not db.collection("workflow_checkpoints").docs
+        assert db.batch_sizes == [500, 200]
+
+
+class TestStorageStaysFlat:
+    @pytest.mark.asyncio
+    async def test_documents_per_thread_stay_bounded(self, make_checkpointer):
+        counts = {}
+        for label, keep_last in (("unbounded", 0), ("keep-last 5", 5)):
+            db = InMemoryFirestore()
+            checkpointer = make_checkpointer(keep_last=keep_last)
+            checkpointer._client = db
+            config = {"configurable": {"thread_id": "story-1_wf5"}}
+            for _ in range(3):  # three HITL-abandoned attempts on one thread
+                await _linear_graph(checkpointer, steps=10).ainvoke({"completed": []}, config=config)
+            counts[label] = len(_docs(db)) + len(_docs(db, "workflow_checkpoint_writes"))
+
+        assert counts["keep-last 5"] < counts["unbounded"]
@@ -0,0 +1,229 @@
+"""
+Unit tests for the versioned checkpoint format and its use in FirestoreCheckpointer.
+"""
+
+import base64
+import operator
+import pickle
+import random
+import time
+from datetime import datetime, timezone
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, StateGraph
+
+from src.services.database import checkpoint_serde
+from src.services.database.checkpoint_blobs import CheckpointBlobs, LocalBlobStore
+from src.services.database.checkpoint_serde import (
+    CODEC_NONE,
+    CODEC_ZLIB,
+    CODEC_ZSTD,
+    CheckpointCodec,
+)
+from src.services.database.checkpoint_service import FirestoreCheckpointer
+from tests.conftest import InMemoryFirestore
+from tests.unit.test_services.test_audio_service import _wav
+
+STORY = " ".join(
+    f"Mira and her brother flew the red kite over hill number {i}. The wind sang softly."
+    for i in range(60)
+)
+
+# Media payloads are already-compressed / noisy in practice; model them as
+# incompressible bytes so compression ratios are not flattered.
+_noise = random.Random(0).randbytes
+
+
+def _checkpoint(channel_values: dict) -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = channel_values
+    checkpoint["channel_versions"] = {name: f"{i:032}.0.1" for i, name in enumerate(channel_values)}
+    checkpoint["versions_seen"] = {"__input__": {}, "generate": {"story_text": "00000000000000000000000000000001.0.1"}}
+    return checkpoint
+
+
+def _wf3_checkpoint() -> dict:
+    return _checkpoint({
+        "story_text": STORY,
+        "story_title": "The Red Kite",
+        "image_bytes": _noise(300_000),  # FLUX PNG
+        "image_url": None,
+        "image_cache": {"key": "a" * 64, "object": None, "forced": False},
+        "validated": True,
+        "evaluation": {"passed": True, "score": 0.91, "metrics": {"relevance": 0.9, "safety": 1.0}},
+        "retry_count": 0,
+        "completed": ["generate_image", "validate"],
+        "errors": {},
+    })
+
+
+def _wf4_checkpoint() -> dict:
+    return _checkpoint({
+        "story_text": STORY,
+        "language": "en-US",
+        "voice": "en-US-Standard-A",
+        "audio_bytes": _wav(2.0)[:44] + _noise(96_000),
+        "audio_format": "wav",
+        "audio_timepoints": [
+            {"ParagraphNumber": i, "StartTimestamp": i * 5.0, "EndTimestamp": i * 5.0 + 5.0, "Duration": 5.0}
+            for i in range(1, 13)
+        ],
+        "validated": True,
+        "text_evaluation": {"passed": True, "score": 0.88, "checked_at": datetime(2026, 1, 1, tzinfo=timezone.utc)},
+        "retry_count": 1,
+        "completed": ["evaluate_text", "generate_audio"],
+        "errors": {},
+    })
+
+
+def _wf5_checkpoint() -> dict:
+    mcq = [
+        {"question": f"What colour was the kite in part {i}?", "options": ["Red", "Blue", "Green"], "correct": "Red"}
+        for i in range(10)
+    ]
+    craft = {
+        "title": "Make a paper kite",
+        "age_appropriateness": "Ages 4-6 with help",
+        "materials": ["paper", "string", "sticks", "glue"],
+        "steps": [f"Step {i}: fold, glue and decorate the kite carefully." for i in range(8)],
+        "image_generation_prompt": "A child's colourful paper kite on a table",
+    }
+    return _checkpoint({
+        "activities": {"mcq": mcq, "art": craft, "moral": [craft], "science": [craft]},
+        "images": {k: f"https://storage.googleapis.com/b/activity-images/{k}.webp" for k in ("art", "moral", "science")},
+        "completed": ["mcq", "art", "moral", "science"],
+        "errors": {},
+        "retry_count": {"mcq": 0, "art": 1, "moral": 0, "science": 0},
+        "status": "completed",
+    })
+
+
+def _legacy(checkpoint: dict) -> str:
+    return base64.b64encode(pickle.dumps(checkpoint)).decode("utf-8")
+
+
+@pytest.fixture
+def serde():
+    return FirestoreCheckpointer.serde
+
+
+class TestCheckpointCodec:
+    @pytest.mark.parametrize("compression", ["zstd", "zlib", "none"])
+    def test_round_trip(self, serde, compression):
+        codec = CheckpointCodec(serde, compression=compression)
+        for checkpoint in (_wf3_checkpoint(), _wf4_checkpoint(), _wf5_checkpoint()):
+            blob = codec.dumps(checkpoint)
+
+            assert isinstance(blob, bytes) and blob[:4] == b"RKCP"
+            assert codec.loads(blob) == checkpoint
+
+    def test_reads_legacy_base64_pickle(self, serde):
+        checkpoint = _wf4_checkpoint()
+
+        assert CheckpointCodec(serde).loads(_legacy(checkpoint)) == checkpoint
+
+    def test_header_records_codec(self, serde):
+        big = CheckpointCodec(serde, compression="zlib").dumps(_wf5_checkpoint())
+        small = CheckpointCodec(serde, compression="zlib").dumps(empty_checkpoint())
+
+        assert big[5] == CODEC_ZLIB
+        assert small[5] == CODEC_NONE
+
+    def test_blobs_from_any_codec_are_readable(self, serde):
+        checkpoint = _wf5_checkpoint()
+        zstd_blob = CheckpointCodec(serde, compression="zstd").dumps(checkpoint)
+
+        assert zstd_blob[5] == CODEC_ZSTD
+        assert CheckpointCodec(serde, compression="zlib").loads(zstd_blob) == checkpoint
+
+    def test_falls_back_to_zlib_without_zstandard(self, serde, monkeypatch):
+        monkeypatch.setattr(checkpoint_serde, "zstandard", None)
+
+        assert CheckpointCodec(serde, compression="zstd").codec == CODEC_ZLIB
+
+    def test_rejects_unknown_version(self, serde):
+        blob = bytearray(CheckpointCodec(serde).dumps(empty_checkpoint()))
+        blob[4] = 99
+
+        with pytest.raises(ValueError):
+            CheckpointCodec(serde).loads(bytes(blob))
+
+    def test_benchmark_bytes_and_time_per_checkpoint(self, serde):
+        codecs = {name: CheckpointCodec(serde, compression=name) for name in ("zstd", "zlib")}
+        rounds = 20
+        print()
+        for label, checkpoint in (("WF3", _wf3_checkpoint()), ("WF4", _wf4_checkpoint()), ("WF5", _wf5_checkpoint())):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                legacy = _legacy(checkpoint)
+                pickle.loads(base64.b64decode(legacy))
+            legacy_ms = (time.perf_counter() - start) / rounds * 1000
+            line = f"[benchmark] {label}: base64-pickle {len(legacy)} B {legacy_ms:.2f}ms"
+
+            for name, codec in codecs.items():
+                blob = codec.dumps(checkpoint)
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    codec.dumps(checkpoint)
+                encode_ms = (time.perf_counter() - start) / rounds * 1000
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    codec.loads(blob)
+                decode_ms = (time.perf_counter() - start) / rounds * 1000
+                line += f" | {name} {len(blob)} B enc {encode_ms:.2f}ms dec {decode_ms:.2f}ms"
+                assert len(blob) < len(legacy)
+            print(line)
+
+
+class _State(TypedDict):
+    story_text: str
+    audio_bytes: bytes
+    completed: Annotated[List[str], operator.add]
+
+
+def _graph(checkpointer):
+    graph = StateGraph(_State)
+    graph.add_node("synthesize", lambda s: {"audio_bytes": _wav(0.5), "completed": ["synthesize"]})
+    graph.add_node("save", lambda s: {"completed": ["save"]})
+    graph.set_entry_point("synthesize")
+    graph.add_edge("synthesize", "save")
+    graph.add_edge("save", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+class TestFirestoreCheckpointerFormat:
+    @pytest.fixture
+    def checkpointer(self, tmp_path):
+        checkpointer = FirestoreCheckpointer(blobs=CheckpointBlobs(LocalBlobStore(str(tmp_path))))
+        checkpointer._client = InMemoryFirestore()
+        return checkpointer
+
+    @pytest.mark.asyncio
+    async def test_graph_state_round_trips_as_bytes(self, checkpointer):
+        config = {"configurable": {"thread_id": "story-1_wf4"}}
+
+        await _graph(checkpointer).ainvoke({"story_text": STORY, "completed": []}, config=config)
+
+        docs = checkpointer._client.collection("workflow_checkpoints").docs.values()
+        assert all(isinstance(d["checkpoint"], bytes) and d["checkpoint"][:4] == b"RKCP" for d in docs)
+        latest = await checkpointer.aget_tuple(config)
+        assert latest.checkpoint["channel_values"]["completed"] == ["synthesize", "save"]
+        assert latest.checkpoint["channel_values"]["audio_bytes"] == _wav(0.5)
+
+    @pytest.mark.asyncio
+    async def test_reads_legacy_documents(self, checkpointer):
+        checkpoint = _wf5_checkpoint()
+        await checkpointer._get_collection().document(f"t1_{checkpoint['id']}").set({
+            "thread_id": "t1",
+            "checkpoint_id": checkpoint["id"],
+            "parent_checkpoint_id": None,
+            "checkpoint": _legacy(checkpoint),
+            "metadata": {"step": 3},
+            "created_at": datetime.now(timezone.utc),
+        })
+
+        latest = await checkpointer.aget_tuple({"configurable": {"thread_id": "t1"}})
+
+        assert latest.checkpoint == checkpoint
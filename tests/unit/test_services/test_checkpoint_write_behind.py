@@ -0,0 +1,176 @@
+"""
+Unit tests for write-behind checkpoint buffering in FirestoreCheckpointer.
+"""
+
+import asyncio
+import operator
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, StateGraph
+from langgraph.types import Command, interrupt
+
+from src.services.database import checkpoint_service
+from src.services.database.checkpoint_blobs import CheckpointBlobs, LocalBlobStore
+from src.services.database.checkpoint_service import FirestoreCheckpointer, flush_write_behind
+from tests.conftest import InMemoryFirestore
+from tests.integration.test_checkpoint_recovery import IMAGE_BRANCHES, PodKilled, _Pipeline
+
+INITIAL = {"activities": {}, "images": {}, "completed": []}
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return LocalBlobStore(str(tmp_path / "spool"))
+
+
+def _checkpointer(db, blob_store, write_behind=True, staleness=60.0) -> FirestoreCheckpointer:
+    checkpointer = FirestoreCheckpointer(
+        blobs=CheckpointBlobs(blob_store),
+        write_behind=write_behind,
+        max_staleness_seconds=staleness,
+    )
+    checkpointer._client = db
+    return checkpointer
+
+
+def _checkpoints(db) -> dict:
+    return {d["checkpoint_id"]: d for d in db.collection("workflow_checkpoints").docs.values()}
+
+
+class _ReviewState(TypedDict):
+    activity: str
+    approved: bool
+    completed: Annotated[List[str], operator.add]
+
+
+def _hitl_graph(checkpointer):
+    graph = StateGraph(_ReviewState)
+    graph.add_node("generate", lambda s: {"activity": "quiz", "completed": ["generate"]})
+    graph.add_node("review", lambda s: {"approved": interrupt({"activity": s["activity"]}), "completed": ["review"]})
+    graph.set_entry_point("generate")
+    graph.add_edge("generate", "review")
+    graph.add_edge("review", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+class TestWriteBehind:
+    @pytest.mark.asyncio
+    async def test_run_end_flushes_only_the_final_checkpoint(self, blob_store):
+        db = InMemoryFirestore()
+        config = {"configurable": {"thread_id": "story-1_wf5"}}
+        before = dict(checkpoint_service.checkpoint_write_stats)
+
+        result = await _Pipeline().compile(_checkpointer(db, blob_store)).ainvoke(INITIAL, config=config)
+
+        stored = _checkpoints(db)
+        assert len(stored) == 1
+        final = next(iter(stored.values()))
+        assert final["parent_checkpoint_id"] is None  # chained to the last durable one
+        assert checkpoint_service.checkpoint_write_stats["coalesced"] > before["coalesced"]
+
+        latest = await _checkpointer(db, blob_store).aget_tuple(config)
+        assert latest.checkpoint["channel_values"]["completed"] == result["completed"]
+
+    @pytest.mark.asyncio
+    async def test_interrupt_is_durable_and_resumable(self, blob_store):
+        db = InMemoryFirestore()
+        config = {"configurable": {"thread_id": "story-2_wf5"}}
+
+        await _hitl_graph(_checkpointer(db, blob_store)).ainvoke(
+            {"activity": "", "approved": False, "completed": []}, config=config
+        )
+        assert _checkpoints(db)
+
+        # A fresh pod picks the review decision up from Firestore.
+        resumed = await _hitl_graph(_checkpointer(db, blob_store)).ainvoke(Command(resume=True), config=config)
+
+        assert resumed["approved"] is True
+        assert resumed["completed"] == ["generate", "review"]
+
+    @pytest.mark.asyncio
+    async def test_staleness_bound_flushes_during_a_slow_step(self, blob_store):
+        db = InMemoryFirestore()
+        seen_while_running = []
+
+        async def slow_eval(state):
+            await asyncio.sleep(0.2)
+            seen_while_running.append(len(_checkpoints(db)))
+            return {"completed": ["eval"]}
+
+        graph = StateGraph(_ReviewState)
+        graph.add_node("generate", lambda s: {"activity": "quiz"})
+        graph.add_node("evaluate", slow_eval)
+        graph.set_entry_point("generate")
+        graph.add_edge("generate", "evaluate")
+        graph.add_edge("evaluate", END)
+        app = graph.compile(checkpointer=_checkpointer(db, blob_store, staleness=0.05))
+
+        await app.ainvoke({"activity": "", "approved": False, "completed": []}, config={"configurable": {"thread_id": "t"}})
+
+        assert seen_while_running[0] >= 1
+
+    @pytest.mark.asyncio
+    async def test_flushed_history_is_a_chain(self, blob_store):
+        db = InMemoryFirestore()
+
+        async def slow(state):
+            await asyncio.sleep(0.05)
+            return {"completed": ["step"]}
+
+        graph = StateGraph(_ReviewState)
+        for name in ("a", "b", "c"):
+            graph.add_node(name, slow)
+        graph.set_entry_point("a")
+        graph.add_edge("a", "b")
+        graph.add_edge("b", "c")
+        graph.add_edge("c", END)
+        app = graph.compile(checkpointer=_checkpointer(db, blob_store, staleness=0.02))
+
+        await app.ainvoke({"activity": "", "approved": False, "completed": []}, config={"configurable": {"thread_id": "t"}})
+
+        stored = _checkpoints(db)
+        assert len(stored) > 1
+        assert all(d["parent_checkpoint_id"] in stored for d in stored.values() if d["parent_checkpoint_id"])
+        assert sum(1 for d in stored.values() if d["parent_checkpoint_id"] is None) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_crash_recovery_still_skips_finished_branches(self, blob_store):
+        db = InMemoryFirestore()
+        config = {"configurable": {"thread_id": "story-3_wf5"}}
+        pipeline = _Pipeline(crash_branch="science")
+
+        with pytest.raises(PodKilled):
+            await pipeline.compile(_checkpointer(db, blob_store)).ainvoke(INITIAL, config=config)
+
+        result = await pipeline.compile(_checkpointer(db, blob_store)).ainvoke(None, config=config)
+
+        assert set(result["images"]) == set(IMAGE_BRANCHES)
+        assert pipeline.calls["img_art"] == pipeline.calls["img_moral"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_flushes_buffered_checkpoints(self, blob_store):
+        db = InMemoryFirestore()
+        checkpointer = _checkpointer(db, blob_store)
+        config = {"configurable": {"thread_id": "t"}}
+
+        checkpoint = {**empty_checkpoint(), "updated_channels": ["branch:to:next"]}
+        await checkpointer.aput(config, checkpoint, {"step": 0}, {})
+        assert not _checkpoints(db)
+
+        await flush_write_behind()
+
+        assert checkpoint["id"] in _checkpoints(db)
+
+    @pytest.mark.asyncio
+    async def test_write_behind_writes_fewer_checkpoints_than_write_through(self, blob_store):
+        written = {}
+        for label, write_behind in (("write-through", False), ("write-behind", True)):
+            db = InMemoryFirestore()
+            app = _Pipeline().compile(_checkpointer(db, blob_store, write_behind=write_behind))
+            await app.ainvoke(INITIAL, config={"configurable": {"thread_id": label}})
+            written[label] = len(_checkpoints(db))
+
+        assert written["write-behind"] < written["write-through"]
@@ -0,0 +1,83 @@
+"""
+Unit tests for pending-write persistence in FirestoreCheckpointer.
+"""
+
+import random
+
+import pytest
+from langgraph.checkpoint.base import ERROR, empty_checkpoint
+
+from src.services.database.checkpoint_blobs import CheckpointBlobs, LocalBlobStore
+from src.services.database.checkpoint_service import FirestoreCheckpointer
+from tests.conftest import InMemoryFirestore
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    checkpointer = FirestoreCheckpointer(
+        blobs=CheckpointBlobs(LocalBlobStore(str(tmp_path)), threshold_bytes=1024)
+    )
+    checkpointer._client = InMemoryFirestore()
+    return checkpointer
+
+
+async def _saved_config(checkpointer) -> dict:
+    return await checkpointer.aput(
+        {"configurable": {"thread_id": "t1"}}, empty_checkpoint(), {"step": 1}, {}
+    )
+
+
+class TestPendingWrites:
+    @pytest.mark.asyncio
+    async def test_writes_are_replayed_in_task_order(self, checkpointer):
+        config = await _saved_config(checkpointer)
+
+        await checkpointer.aput_writes(config, [("images", {"sci": "u3"})], "task-b", "~img_sci")
+        await checkpointer.aput_writes(config, [("images", {"art": "u1"}), ("completed", ["art"])], "task-a", "~img_art")
+
+        latest = await checkpointer.aget_tuple({"configurable": {"thread_id": "t1"}})
+
+        assert latest.pending_writes == [
+            ("task-a", "images", {"art": "u1"}),
+            ("task-a", "completed", ["art"]),
+            ("task-b", "images", {"sci": "u3"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_special_channels_do_not_clobber_task_output(self, checkpointer):
+        config = await _saved_config(checkpointer)
+
+        await checkpointer.aput_writes(config, [("images", {"art": "u1"})], "task-a")
+        await checkpointer.aput_writes(config, [(ERROR, ValueError("boom"))], "task-a")
+
+        latest = await checkpointer.aget_tuple({"configurable": {"thread_id": "t1"}})
+        channels = [channel for _, channel, _ in latest.pending_writes]
+
+        assert sorted(channels) == sorted(["images", ERROR])
+        assert len(checkpointer._client.collection("workflow_checkpoint_writes").docs) == 2
+
+    @pytest.mark.asyncio
+    async def test_large_write_values_are_spilled(self, checkpointer):
+        config = await _saved_config(checkpointer)
+        audio = random.Random(0).randbytes(50_000)
+
+        await checkpointer.aput_writes(config, [("audio_bytes", audio)], "task-a")
+
+        doc = next(iter(checkpointer._client.collection("workflow_checkpoint_writes").docs.values()))
+        assert len(doc["writes"][0]["value"]) < 1024
+        latest = await checkpointer.aget_tuple({"configurable": {"thread_id": "t1"}})
+        assert latest.pending_writes == [("task-a", "audio_bytes", audio)]
+
+    @pytest.mark.asyncio
+    async def test_write_failures_are_not_fatal(self, checkpointer, monkeypatch):
+        config = await _saved_config(checkpointer)
+
+        def _unavailable():
+            raise RuntimeError("firestore unavailable")
+
+        monkeypatch.setattr(checkpointer, "_get_writes_collection", _unavailable)
+
+        await checkpointer.aput_writes(config, [("images", {"art": "u1"})], "task-a")
+        latest = await checkpointer.aget_tuple({"configurable": {"thread_id": "t1"}})
+
+        assert latest is not None and latest.pending_writes == []
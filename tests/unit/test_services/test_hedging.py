@@ -0,0 +1,192 @@
+"""
+Unit tests for latency-based hedging to the fallback model.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.ai_providers import get_provider_registry
+from src.services.ai_service import AIService
+from src.services.hedging import HedgeBudget, HedgeFailed, LatencyTracker, hedged_call
+
+
+class TestLatencyTracker:
+    def test_no_percentile_until_min_samples(self):
+        tracker = LatencyTracker(window=10, min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+
+        assert tracker.percentile(0.95) is None
+
+    def test_percentile_over_rolling_window(self):
+        tracker = LatencyTracker(window=20, min_samples=1)
+        for i in range(1, 41):  # only 21..40 stay in the window
+            tracker.record(float(i))
+
+        assert len(tracker) == 20
+        assert tracker.percentile(0.95) == 39.0
+        assert tracker.percentile(0.5) == 30.0
+
+
+class TestHedgeBudget:
+    def test_budget_is_per_workflow(self):
+        budget = HedgeBudget(max_per_workflow=1)
+
+        assert budget.try_spend("wf-a") is True
+        assert budget.try_spend("wf-a") is False
+        assert budget.try_spend("wf-b") is True
+        assert budget.stats == {"fired": 2, "fallback_won": 0, "budget_exhausted": 1}
+
+
+class TestHedgedCall:
+    @staticmethod
+    def _slow(result, delay, started=None, cancelled=None):
+        async def call():
+            if started is not None:
+                started.append(result)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                if cancelled is not None:
+                    cancelled.append(result)
+                raise
+            return result
+        return call
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_does_not_hedge(self):
+        started = []
+        budget = HedgeBudget(3)
+
+        result = await hedged_call(
+            self._slow("primary", 0.01, started), self._slow("fallback", 0.01, started), 0.1, budget, "wf"
+        )
+
+        assert result == "primary"
+        assert started == ["primary"]
+        assert budget.stats["fired"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_fallback_and_is_cancelled(self):
+        cancelled = []
+        budget = HedgeBudget(3)
+
+        result = await hedged_call(
+            self._slow("primary", 1.0, cancelled=cancelled),
+            self._slow("fallback", 0.01),
+            0.02,
+            budget,
+            "wf",
+        )
+        await asyncio.sleep(0)
+
+        assert result == "fallback"
+        assert cancelled == ["primary"]
+        assert budget.stats == {"fired": 1, "fallback_won": 1, "budget_exhausted": 0}
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_waits_for_primary(self):
+        started = []
+        budget = HedgeBudget(0)
+
+        result = await hedged_call(
+            self._slow("primary", 0.05, started), self._slow("fallback", 0.0, started), 0.01, budget, "wf"
+        )
+
+        assert result == "primary"
+        assert started == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_failed_fallback_still_returns_primary(self):
+        async def broken():
+            raise RuntimeError("fallback down")
+
+        result = await hedged_call(self._slow("primary", 0.05), broken, 0.01, HedgeBudget(3), "wf")
+
+        assert result == "primary"
+
+    @pytest.mark.asyncio
+    async def test_both_failing_reports_the_fallback_as_tried(self):
+        async def slow_broken():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary down")
+
+        async def broken():
+            raise RuntimeError("fallback down")
+
+        with pytest.raises(HedgeFailed) as excinfo:
+            await hedged_call(slow_broken, broken, 0.01, HedgeBudget(3), "wf")
+
+        assert str(excinfo.value.primary_error) == "primary down"
+        assert str(excinfo.value.fallback_error) == "fallback down"
+
+
+class TestAIServiceHedging:
+    @pytest.mark.asyncio
+    async def test_generate_content_hedges_slow_primary(self, monkeypatch):
+        from src.services import ai_service
+
+        monkeypatch.setattr(ai_service.settings, "LLM_HEDGING_ENABLED", True)
+        monkeypatch.setattr(ai_service, "current_workflow_id", lambda: "story-1_wf5")
+
+        service = AIService()
+        service.model_name, service.fallback_model_name = "primary-model", "fallback-model"
+        tracker = get_provider_registry().latency("primary-model")
+        for _ in range(tracker.min_samples):
+            tracker.record(0.02)
+
+        async def _generate_content(*, model, contents, config=None):
+            await asyncio.sleep(1.0 if model == "primary-model" else 0.01)
+            response = MagicMock()
+            response.text = model
+            return response
+
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(side_effect=_generate_content)
+        get_provider_registry()._genai_client = client
+
+        result = await service.generate_content("slow prompt")
+
+        assert result == "fallback-model"
+        assert get_provider_registry().hedge_budget.used("story-1_wf5") == 1
+
+    @pytest.mark.asyncio
+    async def test_hedging_off_by_default(self):
+        service = AIService()
+        service.fallback_model_name = "fallback-model"
+        service._generate_with_primary = AsyncMock(return_value="primary")
+        service._generate_with_fallback = AsyncMock(return_value="fallback")
+
+        assert await service.generate_content("prompt") == "primary"
+        service._generate_with_fallback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_does_not_call_the_fallback_again(self, monkeypatch):
+        from src.services import ai_service
+
+        monkeypatch.setattr(ai_service.settings, "LLM_HEDGING_ENABLED", True)
+        monkeypatch.setattr(ai_service, "current_workflow_id", lambda: "story-2_wf5")
+        tracker = get_provider_registry().latency("primary-model")
+        for _ in range(tracker.min_samples):
+            tracker.record(0.02)
+
+        calls = []
+
+        async def _generate_content(*, model, contents, config=None):
+            calls.append(model)
+            if model == "primary-model":
+                await asyncio.sleep(0.2)
+            raise ValueError(f"{model} rejected the prompt")
+
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(side_effect=_generate_content)
+        get_provider_registry()._genai_client = client
+
+        with pytest.raises(HedgeFailed):
+            await AIService().generate_content(
+                "doomed prompt", model_override="primary-model", fallback_override="fallback-model"
+            )
+
+        assert calls.count("fallback-model") == 1
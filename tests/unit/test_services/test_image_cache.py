@@ -0,0 +1,111 @@
+"""
+Unit tests for the content-addressed image cache and its WF3 wiring.
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.agents.media.image_generator_agent import ImageGeneratorAgent
+from src.services.database.storage_bucket import content_object_name
+from src.services.image_cache import ImageCache, make_image_cache_key
+from tests.conftest import make_png
+
+
+class TestMakeImageCacheKey:
+    def test_key_depends_on_prompt_model_and_style(self):
+        base = make_image_cache_key("a kite", "flux")
+
+        assert base == make_image_cache_key("a kite", "flux")
+        assert base != make_image_cache_key("a kite", "flux-dev")
+        assert base != make_image_cache_key("a kite", "flux", "watercolor")
+        assert base != make_image_cache_key("a red kite", "flux")
+
+
+class TestImageCache:
+    @pytest.mark.asyncio
+    async def test_first_render_becomes_cache_object(self, image_cache, sample_png):
+        key = make_image_cache_key("a kite", "flux")
+
+        filename = await image_cache.store(key, sample_png)
+
+        assert filename == ImageCache.object_name(key)
+        assert await image_cache.lookup(key) == filename
+        assert image_cache.stats["writes"] == 1
+        assert set(image_cache.storage.objects) == {filename, *image_cache.variant_names(filename).values()}
+
+    @pytest.mark.asyncio
+    async def test_lookup_finds_objects_written_by_another_process(self, image_cache):
+        key = make_image_cache_key("a kite", "flux")
+        image_cache.storage.objects[ImageCache.object_name(key)] = b"webp"
+
+        assert await image_cache.load(key) == (ImageCache.object_name(key), b"webp")
+        assert image_cache.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_forced_render_never_replaces_cache_object(self, image_cache):
+        key = make_image_cache_key("a kite", "flux")
+        cached = await image_cache.store(key, make_png(color=(255, 0, 0)))
+        cached_bytes = image_cache.storage.objects[cached]
+
+        fresh = await image_cache.store(
+            key, make_png(color=(0, 0, 255)), forced=True, fallback_prefix="story-images"
+        )
+
+        assert fresh == content_object_name("story-images", image_cache.storage.objects[fresh], ".webp")
+        assert image_cache.storage.objects[cached] == cached_bytes
+        assert image_cache.storage.objects[fresh] != cached_bytes
+
+    @pytest.mark.asyncio
+    async def test_identical_forced_renders_are_stored_once(self, image_cache, sample_png):
+        key = make_image_cache_key("a kite", "flux")
+        await image_cache.store(key, sample_png)
+
+        first = await image_cache.store(key, make_png(color=(0, 0, 255)), forced=True)
+        second = await image_cache.store(key, make_png(color=(0, 0, 255)), forced=True)
+
+        assert first == second
+        assert image_cache.storage.uploads.count(first) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_index_entry_reports_a_miss(self, image_cache, sample_png):
+        key = make_image_cache_key("a kite", "flux")
+        filename = await image_cache.store(key, sample_png)
+        del image_cache.storage.objects[filename]
+
+        hits = image_cache.stats["hits"]
+
+        assert await image_cache.load(key) is None
+        assert image_cache.stats["hits"] == hits
+        assert await image_cache.lookup(key) is None
+
+
+class TestImageGeneratorCache:
+    @pytest.fixture
+    def agent(self, sample_png):
+        agent = ImageGeneratorAgent()
+        agent.ai_service = AsyncMock()
+        agent.ai_service.generate_image = AsyncMock(return_value=sample_png)
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_cover_reuses_cached_render_without_flux(self, agent, image_cache):
+        first = await agent.generate({"image_prompt": "A fox", "retry_count": 0})
+        await image_cache.store(first["image_cache"]["key"], first["image_bytes"])
+
+        second = await agent.generate({"image_prompt": "A fox", "retry_count": 0})
+
+        agent.ai_service.generate_image.assert_awaited_once()
+        assert first["image_format"] == "png"
+        assert second["image_bytes"][:4] == b"RIFF"  # the cached WebP master
+        assert second["image_format"] == "webp"
+        assert second["image_cache"]["object"] == ImageCache.object_name(first["image_cache"]["key"])
+
+    @pytest.mark.asyncio
+    async def test_retry_forces_a_fresh_draw(self, agent, image_cache):
+        first = await agent.generate({"image_prompt": "A fox", "retry_count": 0})
+        await image_cache.store(first["image_cache"]["key"], first["image_bytes"])
+
+        retry = await agent.generate({"image_prompt": "A fox", "retry_count": 1})
+
+        assert agent.ai_service.generate_image.await_count == 2
+        assert retry["image_cache"] == {"key": first["image_cache"]["key"], "object": None, "forced": True}
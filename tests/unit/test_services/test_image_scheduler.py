@@ -0,0 +1,84 @@
+"""
+Unit tests for the priority-aware FLUX image scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.ai_providers import get_provider_registry
+from src.services.image_scheduler import ImagePriority, ImageScheduler
+
+
+async def _run_in_order(scheduler: ImageScheduler, requests: list[tuple[ImagePriority, str, str]]) -> list[str]:
+    """Hold the first turn while every request queues, then record grant order."""
+    served = []
+
+    async def request(priority, story, label):
+        async with scheduler.turn(priority, story):
+            served.append(label)
+            await asyncio.sleep(0)
+
+    await scheduler.acquire(ImagePriority.ACTIVITY, "holder")
+    tasks = [asyncio.create_task(request(*r)) for r in requests]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return served
+
+
+class TestImageScheduler:
+    @pytest.mark.asyncio
+    async def test_cover_jumps_activity_and_regeneration(self):
+        served = await _run_in_order(ImageScheduler(), [
+            (ImagePriority.REGENERATION, "s1", "regen"),
+            (ImagePriority.ACTIVITY, "s1", "activity"),
+            (ImagePriority.COVER, "s2", "cover"),
+        ])
+
+        assert served == ["cover", "activity", "regen"]
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_stories_within_a_class(self):
+        served = await _run_in_order(ImageScheduler(), [
+            (ImagePriority.ACTIVITY, "s1", "s1-a"),
+            (ImagePriority.ACTIVITY, "s1", "s1-b"),
+            (ImagePriority.ACTIVITY, "s1", "s1-c"),
+            (ImagePriority.ACTIVITY, "s2", "s2-a"),
+        ])
+
+        assert served == ["s1-a", "s2-a", "s1-b", "s1-c"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = ImageScheduler()
+        await scheduler.acquire(ImagePriority.ACTIVITY, "holder")
+        waiter = asyncio.create_task(scheduler.acquire(ImagePriority.COVER, "s1"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        scheduler.release()
+
+        assert scheduler.queue_depth() == 0
+        await asyncio.wait_for(scheduler.acquire(ImagePriority.ACTIVITY, "s2"), timeout=0.1)
+
+    @pytest.mark.asyncio
+    async def test_wait_stats_per_class(self):
+        scheduler = ImageScheduler()
+        await _run_in_order(scheduler, [(ImagePriority.COVER, "s1", "cover")])
+
+        stats = scheduler.stats()
+
+        assert stats["cover"]["granted"] == 1
+        assert stats["activity"]["granted"] == 1  # the holder
+        assert stats["regeneration"] == {
+            "granted": 0, "waiting": 0, "avg_wait_seconds": 0.0, "max_wait_seconds": 0.0,
+        }
+
+
+class TestRegistryImageQueueMetrics:
+    def test_metrics_include_image_queue(self):
+        metrics = get_provider_registry().metrics()
+
+        assert set(metrics["image_queue"]) == {"cover", "activity", "regeneration"}
@@ -0,0 +1,60 @@
+"""
+Unit tests for WebP master + thumbnail post-processing.
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from src.services import image_variants
+from src.services.image_variants import encode_variants, render_variants, variant_names
+
+
+def _noisy_png(size: int = 512) -> bytes:
+    """A photo-like render (PNG compresses flat colour far too well)."""
+    image = Image.effect_noise((size, size), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestEncodeVariants:
+    def test_master_and_thumbnails_are_webp_at_requested_sizes(self):
+        variants = encode_variants(_noisy_png(512), quality=80, sizes={"card": 256, "list": 64})
+
+        assert set(variants) == {"master", "card", "list"}
+        sizes = {name: Image.open(io.BytesIO(data)).size for name, data in variants.items()}
+        assert sizes == {"master": (512, 512), "card": (256, 256), "list": (64, 64)}
+        assert all(Image.open(io.BytesIO(data)).format == "WEBP" for data in variants.values())
+
+    def test_thumbnails_keep_aspect_ratio(self, sample_png):
+        variants = encode_variants(sample_png, quality=80, sizes={"list": 32})  # 64x48 source
+
+        assert Image.open(io.BytesIO(variants["list"])).size == (32, 24)
+
+    def test_webp_master_is_much_smaller_than_png(self):
+        png = _noisy_png(512)
+
+        variants = encode_variants(png, quality=80, sizes={})
+
+        assert len(variants["master"]) < len(png) / 3
+
+
+class TestVariantNames:
+    def test_thumbnails_sit_next_to_master(self):
+        names = variant_names("image-cache/abc.webp", {"card": 512, "list": 160})
+
+        assert names == {"card": "image-cache/abc_card.webp", "list": "image-cache/abc_list.webp"}
+
+
+class TestRenderVariants:
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_process(self, monkeypatch, sample_png):
+        monkeypatch.setattr(image_variants.settings, "IMAGE_PROCESS_POOL_WORKERS", 1)
+        try:
+            variants = await render_variants(sample_png)
+        finally:
+            image_variants.shutdown_image_pool()
+
+        assert set(variants) == {"master", *image_variants.settings.IMAGE_THUMBNAIL_SIZES}
@@ -0,0 +1,181 @@
+"""
+Unit tests for the layered LLM response cache.
+"""
+
+import sqlite3
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.ai_providers import get_provider_registry
+from src.services.ai_service import AIService
+from src.services.llm_cache import (
+    LLMResponseCache,
+    MemoryCacheTier,
+    SQLiteCacheTier,
+    make_cache_key,
+)
+
+
+class TestCacheKey:
+    def test_key_covers_model_config_and_prompt_version(self):
+        base = make_cache_key("m", "prompt", "cfg", "v1")
+
+        assert make_cache_key("m", "prompt", "cfg", "v1") == base
+        assert make_cache_key("other", "prompt", "cfg", "v1") != base
+        assert make_cache_key("m", "prompt!", "cfg", "v1") != base
+        assert make_cache_key("m", "prompt", "cfg2", "v1") != base
+        assert make_cache_key("m", "prompt", "cfg", "v2") != base
+
+
+class TestTiers:
+    @pytest.mark.asyncio
+    async def test_memory_tier_evicts_least_recently_used(self):
+        tier = MemoryCacheTier(max_entries=2, ttl_seconds=60)
+        await tier.set("a", "A", "m")
+        await tier.set("b", "B", "m")
+        await tier.get("a")
+        await tier.set("c", "C", "m")
+
+        assert await tier.get("a") == "A"
+        assert await tier.get("b") is None
+        assert len(tier) == 2
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_expires_after_ttl(self, monkeypatch):
+        from src.services import llm_cache
+
+        tier = MemoryCacheTier(max_entries=10, ttl_seconds=5)
+        monkeypatch.setattr(llm_cache.time, "time", lambda: 1000.0)
+        await tier.set("k", "v", "m")
+        monkeypatch.setattr(llm_cache.time, "time", lambda: 1006.0)
+
+        assert await tier.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        await SQLiteCacheTier(path, max_entries=10, ttl_seconds=60).set("k", "v", "m")
+
+        assert await SQLiteCacheTier(path, max_entries=10, ttl_seconds=60).get("k") == "v"
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_creates_missing_directory(self, tmp_path):
+        tier = SQLiteCacheTier(str(tmp_path / "missing" / "dir" / "cache.sqlite3"), max_entries=10, ttl_seconds=60)
+
+        await tier.set("k", "v", "m")
+
+        assert await tier.get("k") == "v"
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_closes_its_connections(self, tmp_path):
+        tier = SQLiteCacheTier(str(tmp_path / "cache.sqlite3"), max_entries=10, ttl_seconds=60)
+        opened = []
+        connect = tier._connect
+        tier._connect = lambda: opened.append(connect()) or opened[-1]
+
+        await tier.set("k", "v", "m")
+        await tier.get("k")
+
+        assert len(opened) == 2
+        for conn in opened:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+
+    @pytest.mark.asyncio
+    async def test_sqlite_tier_is_size_bounded(self, tmp_path):
+        tier = SQLiteCacheTier(str(tmp_path / "cache.sqlite3"), max_entries=3, ttl_seconds=60)
+        for i in range(5):
+            await tier.set(f"k{i}", f"v{i}", "m")
+
+        remaining = [await tier.get(f"k{i}") for i in range(5)]
+
+        assert remaining == [None, None, "v2", "v3", "v4"]
+
+
+class TestLLMResponseCache:
+    @pytest.mark.asyncio
+    async def test_counts_hits_misses_and_bypasses(self):
+        cache = LLMResponseCache([MemoryCacheTier(10, 60)])
+
+        assert await cache.get("k") is None
+        await cache.set("k", "v", "m")
+        assert await cache.get("k") == "v"
+        assert await cache.get("k", bypass=True) is None
+
+        assert cache.stats["misses"] == 1
+        assert cache.stats["hits"] == 1
+        assert cache.stats["bypasses"] == 1
+        assert cache.stats["writes"] == 1
+        assert cache.hit_rate() == 0.5
+
+    @pytest.mark.asyncio
+    async def test_slower_tier_hit_is_promoted(self, tmp_path):
+        memory = MemoryCacheTier(10, 60)
+        sqlite_tier = SQLiteCacheTier(str(tmp_path / "c.sqlite3"), 10, 60)
+        await sqlite_tier.set("k", "v", "m")
+        cache = LLMResponseCache([memory, sqlite_tier])
+
+        assert await cache.get("k") == "v"
+        assert cache.stats["hits_sqlite"] == 1
+        assert await memory.get("k") == "v"
+
+    @pytest.mark.asyncio
+    async def test_failing_tier_is_treated_as_miss(self):
+        broken = MagicMock()
+        broken.name = "firestore"
+        broken.get = AsyncMock(side_effect=RuntimeError("unavailable"))
+        broken.set = AsyncMock(side_effect=RuntimeError("unavailable"))
+        cache = LLMResponseCache([MemoryCacheTier(10, 60), broken])
+
+        assert await cache.get("k") is None
+        await cache.set("k", "v", "m")
+
+        assert await cache.get("k") == "v"
+        assert cache.stats["errors"] == 2
+
+
+class TestAIServiceCacheIntegration:
+    @staticmethod
+    def _client():
+        response = MagicMock()
+        response.text = '{"ok": true}'
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=response)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_survives_process_restart_via_sqlite(self):
+        from src.services.ai_providers import reset_provider_registry
+
+        get_provider_registry()._genai_client = first_client = self._client()
+        await AIService().generate_content("prompt", prompt_version="v1")
+
+        reset_provider_registry()  # new process: memory tier is gone
+        get_provider_registry()._genai_client = second_client = self._client()
+        await AIService().generate_content("prompt", prompt_version="v1")
+
+        first_client.aio.models.generate_content.assert_awaited_once()
+        second_client.aio.models.generate_content.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_prompt_version_bump_misses(self):
+        get_provider_registry()._genai_client = client = self._client()
+
+        await AIService().generate_content("prompt", prompt_version="v1")
+        await AIService().generate_content("prompt", prompt_version="v2")
+
+        assert client.aio.models.generate_content.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_bypass_regenerates_and_writes_through(self):
+        providers = get_provider_registry()
+        providers._genai_client = client = self._client()
+
+        await AIService().generate_content("prompt")
+        await AIService().generate_content("prompt", bypass_cache=True)
+        await AIService().generate_content("prompt")
+
+        assert client.aio.models.generate_content.await_count == 2
+        assert providers.response_cache.stats["bypasses"] == 1
+        assert providers.response_cache.stats["writes"] == 2
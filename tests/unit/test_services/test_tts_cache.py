@@ -0,0 +1,97 @@
+"""
+Unit tests for the paragraph TTS cache and its use in synthesize_paragraphs.
+"""
+
+import pytest
+
+from src.services.audio_service import AudioService
+from src.services.tts_cache import TTSCache, make_tts_cache_key
+from tests.conftest import InMemoryBucket
+from tests.unit.test_services.test_audio_service import _wav
+
+
+class TestMakeTTSCacheKey:
+    def test_key_depends_on_text_language_voice_and_encoding(self):
+        base = make_tts_cache_key("Once upon a time", "en-US", "en-US-Standard-A", "LINEAR16")
+
+        assert base == make_tts_cache_key("Once upon a time", "en-US", "en-US-Standard-A", "LINEAR16")
+        assert base != make_tts_cache_key("Once upon a time.", "en-US", "en-US-Standard-A", "LINEAR16")
+        assert base != make_tts_cache_key("Once upon a time", "ta-IN", "en-US-Standard-A", "LINEAR16")
+        assert base != make_tts_cache_key("Once upon a time", "en-US", "en-US-Standard-B", "LINEAR16")
+        assert base != make_tts_cache_key("Once upon a time", "en-US", "en-US-Standard-A", "MP3")
+
+
+class TestTTSCache:
+    @pytest.mark.asyncio
+    async def test_put_then_get_returns_chunk_and_duration(self, tts_cache):
+        chunk = _wav(0.5)
+
+        assert await tts_cache.put("k", chunk) == pytest.approx(0.5)
+        assert await tts_cache.get("k") == (chunk, pytest.approx(0.5))
+        assert tts_cache.stats["memory_hits"] == 1
+        assert tts_cache.storage.objects[TTSCache.object_name("k")] == chunk
+
+    @pytest.mark.asyncio
+    async def test_other_instances_read_through_the_bucket(self):
+        bucket = InMemoryBucket()
+        await TTSCache(storage=bucket).put("k", _wav(0.2))
+        other = TTSCache(storage=bucket)
+
+        assert (await other.get("k"))[1] == pytest.approx(0.2)
+        assert await other.get("k") is not None
+        assert other.stats == {"memory_hits": 1, "storage_hits": 1, "misses": 0, "writes": 0}
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded_by_bytes(self):
+        chunk = _wav(0.1)  # ~4.8 KB
+        cache = TTSCache(storage=InMemoryBucket(), memory_max_bytes=len(chunk) * 2)
+
+        for key in ("a", "b", "c"):
+            await cache.put(key, chunk)
+
+        assert list(cache._memory) == ["b", "c"]
+        assert await cache.get("a") is not None  # still in the bucket
+        assert cache.stats["storage_hits"] == 1
+
+
+class TestSynthesizeParagraphsCache:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = AudioService()
+        service.tts_calls = []
+
+        async def _synthesize(text, lang, voice):
+            service.tts_calls.append((text, voice))
+            return _wav(0.1 * len(text.split()))
+
+        monkeypatch.setattr(service, "_synthesize_paragraph", _synthesize)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_retry_synthesizes_nothing(self, service):
+        paragraphs = ["One two.", "Three four five."]
+        first = await service.synthesize_paragraphs(paragraphs)
+        service.tts_calls.clear()
+
+        second = await service.synthesize_paragraphs(paragraphs)
+
+        assert service.tts_calls == []
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_only_changed_paragraphs_are_synthesized(self, service):
+        await service.synthesize_paragraphs(["One two.", "Three four five."])
+        service.tts_calls.clear()
+
+        _, timepoints = await service.synthesize_paragraphs(["One two.", "Three four five six."])
+
+        assert [text for text, _ in service.tts_calls] == ["Three four five six."]
+        assert timepoints[1]["Duration"] == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_new_voice_is_a_miss(self, service):
+        await service.synthesize_paragraphs(["One two."], voice_name="en-US-Standard-A")
+
+        await service.synthesize_paragraphs(["One two."], voice_name="en-US-Standard-B")
+
+        assert [voice for _, voice in service.tts_calls] == ["en-US-Standard-A", "en-US-Standard-B"]
@@ -7,12 +7,14 @@ import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 from src.utils.resilience import (
+    AdaptiveRateLimiter,
     CircuitBreaker,
     CircuitState,
     CircuitBreakerError,
     circuit_breaker,
     retry_with_backoff,
     RateLimiter,
+    SingleFlight,
     resilient,
 )
 
@@ -181,6 +183,131 @@ class TestRateLimiter:
         assert limiter.try_acquire() is True
 
 
+class TestAdaptiveRateLimiter:
+    """Tests for the AIMD cost-based limiter."""
+
+    @pytest.mark.asyncio
+    async def test_charges_cost_not_requests(self):
+        limiter = AdaptiveRateLimiter(max_rate=100, min_rate=10, capacity=100)
+
+        await limiter.acquire(80)
+
+        assert limiter.tokens == pytest.approx(20, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_oversized_cost_is_clamped_to_capacity(self):
+        limiter = AdaptiveRateLimiter(max_rate=1000, min_rate=10, capacity=50)
+
+        assert await asyncio.wait_for(limiter.acquire(500), timeout=0.5) is True
+
+    def test_multiplicative_decrease_with_floor_and_cooldown(self):
+        limiter = AdaptiveRateLimiter(max_rate=100, min_rate=30, decrease_factor=0.5, decrease_cooldown=60)
+
+        limiter.on_rate_limited()
+        limiter.on_rate_limited()  # same burst — ignored
+        assert limiter.rate == 50
+
+        limiter._last_decrease = 0.0
+        limiter.on_rate_limited()
+        assert limiter.rate == 30
+        assert limiter.stats["decreases"] == 2
+
+    def test_additive_increase_capped_at_max(self):
+        limiter = AdaptiveRateLimiter(max_rate=100, min_rate=10, increase_step=20)
+        limiter.rate = 50
+
+        limiter.on_success()
+        assert limiter.rate == 70
+        for _ in range(5):
+            limiter.on_success()
+        assert limiter.rate == 100
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_counts_waiters(self):
+        limiter = AdaptiveRateLimiter(max_rate=100, min_rate=10, capacity=10)
+        await limiter.acquire(10)
+
+        waiters = [asyncio.create_task(limiter.acquire(5)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert limiter.queue_depth == 3
+
+        await asyncio.gather(*waiters)
+        assert limiter.queue_depth == 0
+        assert limiter.stats["throttled"] >= 1
+
+    def test_adjust_settles_estimate_against_actual(self):
+        limiter = AdaptiveRateLimiter(max_rate=1, min_rate=1, capacity=100)
+        limiter.tokens = 50
+
+        limiter.adjust(30)   # call used 30 more than estimated
+        assert limiter.tokens == pytest.approx(20, abs=0.1)
+        limiter.adjust(-200)  # refund is capped at capacity
+        assert limiter.tokens == 100
+
+
+class TestSingleFlight:
+    """Tests for in-flight request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_same_key_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("k", upstream) for _ in range(5)])
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.stats == {"calls": 1, "coalesced": 4}
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_key_released_after_completion(self):
+        flight = SingleFlight("test")
+        upstream = AsyncMock(return_value="v")
+
+        await flight.do("k", upstream)
+        await flight.do("k", upstream)
+
+        assert upstream.await_count == 2
+        assert flight.stats["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        flight = SingleFlight("test")
+
+        async def upstream():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", upstream), flight.do("k", upstream), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_does_not_cancel_followers(self):
+        flight = SingleFlight("test")
+
+        async def upstream():
+            await asyncio.sleep(0.05)
+            return "v"
+
+        leader = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "v"
+
+
 class TestResilientDecorator:
     """Tests for combined @resilient decorator."""
     